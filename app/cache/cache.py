@@ -0,0 +1,284 @@
+import functools
+import hashlib
+import json
+import os
+import pickle
+import typing as t
+from pathlib import Path
+
+from loguru import logger
+from pydantic import BaseModel
+
+from app.config import config
+
+CHUNK_SIZE = 1024 * 1024
+CACHE_SUFFIX = ".pkl"
+
+
+def file_digest(file_path: Path) -> str:
+    """
+    Computes the SHA-256 digest of a file, read by chunks.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path of the file.
+
+    Returns
+    -------
+    str
+        The hexadecimal digest of the file's content.
+
+    Examples
+    --------
+    >>> file_digest(Path("drugs.csv"))
+    """
+    digest = hashlib.sha256()
+    with file_path.open("rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def schema_digest() -> str:
+    """
+    Computes a digest of the JSON schemas of every model of `config.REFERENCE_SCHEMA`.
+
+    Returns
+    -------
+    str
+        The hexadecimal digest, which changes whenever a schema definition changes.
+    """
+    schemas = {
+        type_of_schema: model.model_json_schema()
+        for type_of_schema, model in config.REFERENCE_SCHEMA.items()
+    }
+    return hashlib.sha256(json.dumps(schemas, sort_keys=True).encode()).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def code_digest() -> str:
+    """
+    Computes a digest of the source code of the `app` package.
+
+    Returns
+    -------
+    str
+        The hexadecimal digest, which changes whenever the code of the package changes.
+
+    Notes
+    -----
+    The source files are hashed rather than the package version, so that development
+    builds sharing the same version never reuse each other's results.
+    """
+    digest = hashlib.sha256()
+    package_path = Path(__file__).resolve().parents[1]
+    for source_path in sorted(package_path.rglob("*.py")):
+        digest.update(str(source_path.relative_to(package_path)).encode())
+        digest.update(source_path.read_bytes())
+
+    return digest.hexdigest()
+
+
+def canonical_value(value: t.Any) -> t.Any:
+    """
+    Converts a parameter that JSON cannot encode into a value with a canonical encoding.
+
+    Used as the `default` of `json.dumps`, so that equal parameters always give the
+    same key, whatever the process and its hash seed.
+
+    Parameters
+    ----------
+    value : Any
+        The value to convert.
+
+    Returns
+    -------
+    Any
+        The sorted items of a set, the path of a Path, or the JSON dump of a model.
+
+    Raises
+    ------
+    TypeError
+        If the value has no canonical encoding.
+    """
+    if isinstance(value, (set, frozenset)):
+        return sorted(
+            value,
+            key=lambda item: json.dumps(item, sort_keys=True, default=canonical_value),
+        )
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(
+        f"Parameter of type {type(value).__name__} cannot be part of a cache key"
+    )
+
+
+def cache_key(input_paths: t.Iterable[Path], **parameters) -> str:
+    """
+    Computes the content address of a pipeline run.
+
+    Parameters
+    ----------
+    input_paths : Iterable[Path]
+        The input files of the run. Their order matters.
+    **parameters
+        The options of the run; they must be JSON serializable, sets, paths or models
+        (see `canonical_value`).
+
+    Returns
+    -------
+    str
+        The hexadecimal key of the run.
+
+    Raises
+    ------
+    TypeError
+        If a parameter has no canonical encoding.
+
+    Examples
+    --------
+    >>> cache_key([Path("drugs.csv"), Path("pubmed.csv")], with_mentions=True)
+    """
+    content = {
+        "inputs": [file_digest(input_path) for input_path in input_paths],
+        "schema": schema_digest(),
+        "code": code_digest(),
+        "parameters": parameters,
+    }
+    encoded_content = json.dumps(content, sort_keys=True, default=canonical_value)
+    return hashlib.sha256(encoded_content.encode()).hexdigest()
+
+
+def load_entry(cache_dir: Path, key: str) -> t.Optional[t.Dict[str, t.Any]]:
+    """
+    Loads the artifacts stored under a key, and marks the entry as recently used.
+
+    Parameters
+    ----------
+    cache_dir : Path
+        The folder of the cache.
+    key : str
+        The key returned by `cache_key`.
+
+    Returns
+    -------
+    Dict[str, Any] or None
+        The stored artifacts, or None on a miss.
+    """
+    entry_path = cache_dir / f"{key}{CACHE_SUFFIX}"
+    if not entry_path.exists():
+        return None
+
+    with entry_path.open("rb") as file:
+        artifacts = pickle.load(file)
+
+    os.utime(entry_path)
+    return artifacts
+
+
+def store_entry(
+    cache_dir: Path,
+    key: str,
+    artifacts: t.Dict[str, t.Any],
+    max_entries: int = config.CACHE_MAX_ENTRIES,
+    max_bytes: int = config.CACHE_MAX_BYTES,
+) -> None:
+    """
+    Stores artifacts under a key, then evicts the least recently used entries.
+
+    The entry is written to a temporary file and renamed, so a reader never sees
+    a partially written entry.
+
+    Parameters
+    ----------
+    cache_dir : Path
+        The folder of the cache, created if needed.
+    key : str
+        The key returned by `cache_key`.
+    artifacts : Dict[str, Any]
+        The artifacts to store; they must be picklable.
+    max_entries : int, optional
+        The maximum number of entries kept. Default is `config.CACHE_MAX_ENTRIES`.
+    max_bytes : int, optional
+        The maximum total size of the entries kept. Default is `config.CACHE_MAX_BYTES`.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    Entries are pickles: the cache folder must only be writable by the pipeline itself.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    entry_path = cache_dir / f"{key}{CACHE_SUFFIX}"
+    temporary_path = entry_path.with_suffix(".tmp")
+    with temporary_path.open("wb") as file:
+        pickle.dump(artifacts, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_path, entry_path)
+
+    evict_entries(cache_dir, max_entries=max_entries, max_bytes=max_bytes)
+
+
+def evict_entries(cache_dir: Path, max_entries: int, max_bytes: int) -> t.List[Path]:
+    """
+    Removes the least recently used entries until both bounds are respected.
+
+    Parameters
+    ----------
+    cache_dir : Path
+        The folder of the cache.
+    max_entries : int
+        The maximum number of entries kept.
+    max_bytes : int
+        The maximum total size of the entries kept.
+
+    Returns
+    -------
+    List[Path]
+        The paths of the evicted entries.
+    """
+    entries = sorted(
+        cache_dir.glob(f"*{CACHE_SUFFIX}"),
+        key=lambda entry_path: entry_path.stat().st_mtime,
+        reverse=True,
+    )
+
+    evicted = []
+    total_bytes = 0
+    for position, entry_path in enumerate(entries):
+        total_bytes += entry_path.stat().st_size
+        if position >= max_entries or total_bytes > max_bytes:
+            entry_path.unlink()
+            evicted.append(entry_path)
+
+    if evicted:
+        logger.info(f"Cache evicted {len(evicted)} entries")
+    return evicted
+
+
+def restore_output(artifacts: t.Dict[str, t.Any], output_path: Path) -> None:
+    """
+    Writes the cached output file, unless the file on disk is already identical.
+
+    Parameters
+    ----------
+    artifacts : Dict[str, Any]
+        The artifacts returned by `load_entry`, with the raw output under 'output'.
+    output_path : Path
+        The path of the output file.
+
+    Returns
+    -------
+    None
+    """
+    if output_path.exists() and output_path.read_bytes() == artifacts["output"]:
+        return
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_bytes(artifacts["output"])
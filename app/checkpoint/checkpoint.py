@@ -0,0 +1,167 @@
+import json
+import os
+import typing as t
+from pathlib import Path
+
+from loguru import logger
+
+from app.config import config
+from app.schema import schema
+from app.utils import utils
+
+
+def load_journal(journal_path: Path, run_key: str) -> t.Dict[int, t.Dict[str, t.Any]]:
+    """
+    Loads the records completed by a previous attempt of the same run.
+
+    The journal is a JSON lines file: a header line holding the run key, then one line
+    per completed drug. A truncated last line (process killed while writing) is ignored.
+
+    Parameters
+    ----------
+    journal_path : Path
+        The path of the journal.
+    run_key : str
+        The key identifying the run (see `cache.cache_key`).
+
+    Returns
+    -------
+    Dict[int, Dict[str, Any]]
+        The completed reconciliation records by position of their drug. Empty if there is
+        no journal or if it belongs to another run.
+    """
+    completed = {}
+    if not journal_path.exists():
+        return completed
+
+    with journal_path.open("r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Truncated checkpoint line {line_number} ignored")
+                break
+
+            if line_number == 0 and entry.get("run_key") != run_key:
+                logger.info(
+                    f"Checkpoint {journal_path} belongs to another run, ignored"
+                )
+                return {}
+            if line_number > 0:
+                completed[entry["position"]] = entry["record"]
+
+    return completed
+
+
+def write_entries(
+    journal_path: Path, entries: t.List[t.Dict[str, t.Any]], mode: str
+) -> None:
+    """
+    Writes journal lines and forces them to disk.
+
+    Parameters
+    ----------
+    journal_path : Path
+        The path of the journal.
+    entries : List[Dict[str, Any]]
+        The lines to write.
+    mode : str
+        'w' to start a new journal, 'a' to append to it.
+
+    Returns
+    -------
+    None
+    """
+    with journal_path.open(mode, encoding="utf-8") as file:
+        file.writelines(
+            json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries
+        )
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def reconcile_with_checkpoint(
+    drugs: t.List[schema.Drugs],
+    elements_pubmed: t.List[schema.PubMed],
+    elements_clinical_trials: t.List[schema.ClinicalTrials],
+    *,
+    journal_path: Path,
+    run_key: str,
+    checkpoint_interval: int = config.CHECKPOINT_INTERVAL,
+    **kwargs,
+) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Runs `utils.reconciliation_data` for every drug, journaling completed records on disk.
+
+    Every `checkpoint_interval` drugs, the completed records are appended to the journal and
+    synced. When restarted with the same `run_key`, drugs already in the journal are not
+    reconciled again.
+
+    Parameters
+    ----------
+    drugs : List[schema.Drugs]
+        The validated drugs.
+    elements_pubmed : List[schema.PubMed]
+        The validated PubMed entries.
+    elements_clinical_trials : List[schema.ClinicalTrials]
+        The validated ClinicalTrials entries.
+    journal_path : Path
+        The path of the journal.
+    run_key : str
+        The key identifying the run (see `cache.cache_key`); a journal of another run is discarded.
+    checkpoint_interval : int, optional
+        The number of drugs reconciled between two checkpoints. Default is `config.CHECKPOINT_INTERVAL`.
+    **kwargs
+        Keyword arguments passed to `utils.reconciliation_data` (e.g. `with_mentions`).
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        One reconciliation record per drug, in the order of `drugs`, as an uninterrupted run returns them.
+
+    Examples
+    --------
+    >>> reconcile_with_checkpoint(drugs, elements_pubmed, elements_clinical_trials, journal_path=Path("run.jsonl"), run_key=key)
+
+    Notes
+    -----
+    The journal is rewritten without its truncated tail before new lines are appended.
+    It is left on disk; the caller removes it once the output is saved.
+    """
+    completed = load_journal(journal_path, run_key)
+    if completed:
+        logger.info(
+            f"Resuming from checkpoint, {len(completed)} drugs already reconciled"
+        )
+
+    journal_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = journal_path.with_suffix(".tmp")
+    write_entries(
+        temporary_path,
+        [{"run_key": run_key}]
+        + [
+            {"position": position, "record": record}
+            for position, record in completed.items()
+        ],
+        mode="w",
+    )
+    os.replace(temporary_path, journal_path)
+
+    pending = []
+    for position, drug in enumerate(drugs):
+        if position in completed:
+            continue
+
+        completed[position] = utils.reconciliation_data(
+            drug=drug,
+            elements_pubmed=elements_pubmed,
+            elements_clinical_trials=elements_clinical_trials,
+            **kwargs,
+        )
+        pending.append({"position": position, "record": completed[position]})
+        if len(pending) >= checkpoint_interval:
+            write_entries(journal_path, pending, mode="a")
+            pending = []
+
+    write_entries(journal_path, pending, mode="a")
+    return [completed[position] for position in range(len(drugs))]
@@ -0,0 +1,310 @@
+import heapq
+import json
+import os
+import struct
+import typing as t
+from collections import defaultdict
+from itertools import combinations
+from pathlib import Path
+
+from app.config import config
+from app.utils import utils
+
+MATRIX_MAGIC = b"SRVCOMAT"
+MATRIX_VERSION = 1
+MATRIX_SUFFIX = ".comat"
+MATRIX_SOURCES = ("pubmed", "clinical_trials", "journals")
+
+HEADER_FORMAT = "<8sHI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ENTRY_SIZE = struct.calcsize("<3I")
+
+
+class CoMentionMatrix(t.NamedTuple):
+    """
+    A sparse and symmetric drug × drug co-mention matrix.
+
+    Attributes
+    ----------
+    drugs : List[str]
+        The names of the drugs, indexed by their row.
+    rows : Dict[str, Dict[int, Dict[int, int]]]
+        For every source of `MATRIX_SOURCES`, the non-zero counts of every row: the number
+        of publications of the source (or of journals) shared by the two drugs.
+    """
+
+    drugs: t.List[str]
+    rows: t.Dict[str, t.Dict[int, t.Dict[int, int]]]
+
+
+def build_comention_matrix(
+    drugs_reconcilation: t.List[t.Dict[str, t.Any]],
+) -> CoMentionMatrix:
+    """
+    Builds the co-mention matrix of the drugs in one pass over the drugs of each publication.
+
+    Parameters
+    ----------
+    drugs_reconcilation : List[Dict[str, Any]]
+        The reconciliation records of every drug, as `utils.read_trusted_output` returns them.
+
+    Returns
+    -------
+    CoMentionMatrix
+        The counts of the publications of each source, and of the journals, shared by
+        every pair of drugs.
+
+    Examples
+    --------
+    >>> matrix = build_comention_matrix(drugs_reconcilation)
+    >>> top_neighbors(matrix, "ATROPINE")
+
+    Notes
+    -----
+    The records are first inverted into the drugs of each publication (and journal), so
+    only the pairs of drugs mentioned together are visited instead of every pair of drugs.
+    """
+    drugs = list(
+        dict.fromkeys(record["drug"]["drug"] for record in drugs_reconcilation)
+    )
+    drug_ids = {drug: drug_id for drug_id, drug in enumerate(drugs)}
+
+    hits = {source: defaultdict(set) for source in MATRIX_SOURCES}
+    for record in drugs_reconcilation:
+        drug_id = drug_ids[record["drug"]["drug"]]
+        for source in MATRIX_SOURCES:
+            for key in record[source]:
+                hits[source][key].add(drug_id)
+
+    return CoMentionMatrix(
+        drugs=drugs,
+        rows={source: count_pairs(hits[source]) for source in MATRIX_SOURCES},
+    )
+
+
+def count_pairs(hits: t.Dict[t.Hashable, t.Set[int]]) -> t.Dict[int, t.Dict[int, int]]:
+    """
+    Counts the publications (or journals) shared by every pair of drugs of one source.
+
+    Parameters
+    ----------
+    hits : Dict[Hashable, Set[int]]
+        The ids of the drugs of each publication (or journal).
+
+    Returns
+    -------
+    Dict[int, Dict[int, int]]
+        The non-zero counts of every row, in both triangles.
+    """
+    rows = defaultdict(lambda: defaultdict(int))
+    for drug_ids_hit in hits.values():
+        for first, second in combinations(sorted(drug_ids_hit), 2):
+            rows[first][second] += 1
+            rows[second][first] += 1
+    return {row: dict(counts) for row, counts in rows.items()}
+
+
+def top_neighbors(
+    matrix: CoMentionMatrix,
+    drug: str,
+    n: int = config.COMENTION_TOP_N,
+    source: t.Optional[str] = None,
+) -> t.List[t.Tuple[str, int]]:
+    """
+    Returns the drugs most often mentioned with a drug.
+
+    Parameters
+    ----------
+    matrix : CoMentionMatrix
+        The matrix returned by `build_comention_matrix` or `load_matrix`.
+    drug : str
+        The name of the drug.
+    n : int, optional
+        The number of neighbors. Default is `config.COMENTION_TOP_N`.
+    source : str, optional
+        The source of `MATRIX_SOURCES` to count. Default is None (the sum of every source).
+
+    Returns
+    -------
+    List[Tuple[str, int]]
+        The neighbors and their counts, by decreasing count then by name. Empty for an
+        unknown drug.
+
+    Examples
+    --------
+    >>> top_neighbors(matrix, "ATROPINE", n=3, source="pubmed")
+    [('EPINEPHRINE', 2)]
+    """
+    if drug not in matrix.drugs:
+        return []
+
+    drug_id = matrix.drugs.index(drug)
+    counts = defaultdict(int)
+    for source_counted in (source,) if source is not None else MATRIX_SOURCES:
+        for neighbor, count in matrix.rows[source_counted].get(drug_id, {}).items():
+            counts[neighbor] += count
+
+    return heapq.nsmallest(
+        n,
+        ((matrix.drugs[neighbor], count) for neighbor, count in counts.items()),
+        key=lambda neighbor: (-neighbor[1], neighbor[0]),
+    )
+
+
+def write_matrix(matrix: CoMentionMatrix, file_path: Path) -> None:
+    """
+    Writes the upper triangle of the matrix in a compact binary file.
+
+    The file holds a fixed header, the JSON list of the drugs and of the number of
+    non-zero counts per source, then the row, column and count of every non-zero count
+    as little-endian 32-bit integers, one block per source.
+
+    Parameters
+    ----------
+    matrix : CoMentionMatrix
+        The matrix to write.
+    file_path : Path
+        The path of the file, replaced atomically.
+
+    Returns
+    -------
+    None
+    """
+    blocks = {}
+    for source in MATRIX_SOURCES:
+        entries = [
+            (row, column, count)
+            for row, counts in sorted(matrix.rows[source].items())
+            for column, count in sorted(counts.items())
+            if row < column
+        ]
+        blocks[source] = struct.pack(
+            f"<{3 * len(entries)}I", *(value for entry in entries for value in entry)
+        )
+
+    encoded_header = json.dumps(
+        {
+            "drugs": matrix.drugs,
+            "sources": {
+                source: len(blocks[source]) // ENTRY_SIZE for source in MATRIX_SOURCES
+            },
+        }
+    ).encode("utf-8")
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = file_path.with_suffix(".tmp")
+    with temporary_path.open("wb") as file:
+        file.write(
+            struct.pack(
+                HEADER_FORMAT, MATRIX_MAGIC, MATRIX_VERSION, len(encoded_header)
+            )
+        )
+        file.write(encoded_header)
+        for source in MATRIX_SOURCES:
+            file.write(blocks[source])
+    os.replace(temporary_path, file_path)
+
+
+def decode_header(
+    content: bytes, file_path: Path
+) -> t.Tuple[t.List[str], t.Dict[str, int], int]:
+    """
+    Decodes and checks the header of a matrix file against the size of the file.
+
+    Parameters
+    ----------
+    content : bytes
+        The content of the file.
+    file_path : Path
+        The path of the file, used in the errors.
+
+    Returns
+    -------
+    tuple
+        The names of the drugs, the number of non-zero counts of each source, and the
+        offset of the first block of counts.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a co-mention matrix of the current version, or is truncated.
+    """
+    if len(content) < HEADER_SIZE:
+        raise ValueError(f"{file_path} is truncated")
+    magic, version, header_size = struct.unpack_from(HEADER_FORMAT, content)
+    if magic != MATRIX_MAGIC or version != MATRIX_VERSION:
+        raise ValueError(f"{file_path} is not a co-mention matrix")
+
+    offset = HEADER_SIZE + header_size
+    try:
+        header = json.loads(content[HEADER_SIZE:offset])
+        n_entries = {
+            source: int(header["sources"][source]) for source in MATRIX_SOURCES
+        }
+        drugs = list(header["drugs"])
+    except (KeyError, TypeError, ValueError) as err:
+        raise ValueError(f"{file_path} has an invalid header : {err}") from err
+
+    if len(content) != offset + ENTRY_SIZE * sum(n_entries.values()):
+        raise ValueError(f"{file_path} is truncated")
+    return drugs, n_entries, offset
+
+
+def load_matrix(file_path: Path) -> CoMentionMatrix:
+    """
+    Reads a matrix written by `write_matrix`.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path of the file.
+
+    Returns
+    -------
+    CoMentionMatrix
+        The matrix, with both triangles restored.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a co-mention matrix of the current version, or is truncated.
+    """
+    content = file_path.read_bytes()
+    drugs, n_entries, offset = decode_header(content, file_path)
+    rows = {}
+    for source in MATRIX_SOURCES:
+        values = struct.unpack_from(f"<{3 * n_entries[source]}I", content, offset)
+        offset += ENTRY_SIZE * n_entries[source]
+        rows[source] = defaultdict(dict)
+        for row, column, count in zip(values[::3], values[1::3], values[2::3]):
+            rows[source][row][column] = count
+            rows[source][column][row] = count
+        rows[source] = dict(rows[source])
+
+    return CoMentionMatrix(drugs=drugs, rows=rows)
+
+
+def comention_stage(file_path: Path, matrix_path: Path) -> CoMentionMatrix:
+    """
+    Builds the co-mention matrix of a reconciliation output and writes it.
+
+    Parameters
+    ----------
+    file_path : Path
+        The JSON output of the pipeline, read with `utils.read_trusted_output`.
+    matrix_path : Path
+        The path of the matrix file (see `write_matrix`).
+
+    Returns
+    -------
+    CoMentionMatrix
+        The matrix written.
+
+    Examples
+    --------
+    >>> matrix = comention_stage(Path("drugs_reconcilation.json"), Path("drugs.comat"))
+    """
+    drugs_reconcilation = utils.read_trusted_output(file_path)
+    matrix = build_comention_matrix(drugs_reconcilation)
+    write_matrix(matrix, matrix_path)
+    return matrix
@@ -0,0 +1,67 @@
+import bz2
+import gzip
+import lzma
+import typing as t
+from pathlib import Path
+
+REFERENCE_COMPRESSION = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def file_format(file_path: t.Union[str, Path]) -> t.Tuple[str, t.Optional[str]]:
+    """
+    Splits the name of a file into its format and its compression.
+
+    Parameters
+    ----------
+    file_path : str or Path
+        The path or the name of the file (e.g. 'pubmed.csv', 'pubmed.json.gz').
+
+    Returns
+    -------
+    tuple
+        The extention of the format (e.g. '.json') and the extention of the
+        compression in `REFERENCE_COMPRESSION`, or None if the file is not compressed.
+
+    Examples
+    --------
+    >>> file_format(Path("pubmed.json.gz"))
+    ('.json', '.gz')
+    """
+    suffixes = Path(file_path).suffixes or [""]
+    if suffixes[-1] in REFERENCE_COMPRESSION:
+        return (suffixes[-2] if len(suffixes) > 1 else ""), suffixes[-1]
+    return suffixes[-1], None
+
+
+def open_binary(
+    file: t.Union[Path, t.BinaryIO], file_name: t.Optional[str] = None, mode: str = "rb"
+) -> t.BinaryIO:
+    """
+    Opens a file, or wraps a binary stream, so that it reads or writes decompressed bytes.
+
+    Parameters
+    ----------
+    file : Path or BinaryIO
+        The path of the file, or an open binary stream (e.g. a blob opened for reading).
+    file_name : str, optional
+        The name giving the compression of a stream. Default is None (the name of `file`).
+    mode : str, optional
+        'rb' for reading or 'wb' for writing. Default is 'rb'.
+
+    Returns
+    -------
+    BinaryIO
+        The decompressed stream. Closing it closes the file opened from a path, but not
+        the stream given in `file`.
+
+    Examples
+    --------
+    >>> with open_binary(Path("pubmed.csv.gz")) as file:
+    ...     header = file.readline()
+    """
+    _, compression = file_format(file_name or file)
+    if isinstance(file, Path):
+        return REFERENCE_COMPRESSION.get(compression, open)(file, mode)
+    if compression is None:
+        return file
+    return REFERENCE_COMPRESSION[compression](file, mode)
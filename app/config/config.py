@@ -8,3 +8,31 @@ REFERENCE_SCHEMA = {
 }
 
 EXTENTIONS = {".json", ".csv"}
+
+CACHE_MAX_ENTRIES = 32
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+CHECKPOINT_INTERVAL = 10
+
+EXTERNAL_MEMORY_BUDGET = 64 * 1024 * 1024
+
+STORE_SHARDS = 16
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+
+WATCH_SCHEMAS = ("clinical_trials", "pubmed", "drugs")
+WATCH_POLL_INTERVAL = 1.0
+WATCH_DEBOUNCE = 2.0
+
+COMENTION_TOP_N = 10
+
+GCS_CHUNK_SIZE = 8 * 256 * 1024
+
+PROFILE_MODE = "stacks"
+PROFILE_TOP_N = 30
+PROFILE_SAMPLE_INTERVAL = 0.001
+
+MAPREDUCE_LEASE = 600.0
+MAPREDUCE_POLL_INTERVAL = 1.0
+MAPREDUCE_MAX_POLL_INTERVAL = 30.0
@@ -10,3 +10,118 @@ class ExtentionError(Exception):
     def __init__(self, message: str):
         self.message = message
         super().__init__(self.message)
+
+
+class DateFormatError(ValueError):
+    """Exception raised when a date does not match any known format
+
+    Subclass of ValueError so that pydantic validators turn it into a
+    ValidationError and the row is sent to the invalid items.
+
+    Attributes
+    ----------
+    message: str
+        explanation of the date that could not be parsed
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+
+class MentionIndexError(Exception):
+    """Exception raised when reconciliation data has no dated mentions to index
+
+    Attributes
+    ----------
+    message: str
+        explanation of the record missing its mentions
+    """
+
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
+
+class ErrorBudgetExceeded(Exception):
+    """Exception raised when too many items of a file fail validation
+
+    Attributes
+    ----------
+    message: str
+        explanation of the budget exceeded
+    file_path: str
+        path of the file whose reading was aborted
+    rows_read: int
+        number of items read before aborting
+    invalid_rows: int
+        number of items that failed validation
+    consecutive_failures: int
+        number of consecutive items that failed validation before aborting
+    """
+
+    def __init__(
+        self,
+        message: str,
+        file_path: str,
+        rows_read: int,
+        invalid_rows: int,
+        consecutive_failures: int,
+    ):
+        self.message = message
+        self.file_path = file_path
+        self.rows_read = rows_read
+        self.invalid_rows = invalid_rows
+        self.consecutive_failures = consecutive_failures
+        super().__init__(self.message)
+
+
+class IncompleteJobError(Exception):
+    """Exception raised when a map-reduce job is reduced before all its tasks are done
+
+    Attributes
+    ----------
+    message: str
+        explanation of the tasks missing their fragment
+    missing_tasks: list
+        identifiers of the tasks without a fragment
+    """
+
+    def __init__(self, message: str, missing_tasks: list):
+        self.message = message
+        self.missing_tasks = missing_tasks
+        super().__init__(self.message)
+
+
+class DuplicateRecordError(Exception):
+    """Exception raised when records to store share an ATC code
+
+    Attributes
+    ----------
+    message: str
+        explanation of the duplicated records
+    atccodes: list
+        ATC codes held by more than one record
+    """
+
+    def __init__(self, message: str, atccodes: list):
+        self.message = message
+        self.atccodes = atccodes
+        super().__init__(self.message)
+
+
+class WorkerError(Exception):
+    """Exception raised when a worker process of a map-reduce job fails
+
+    Attributes
+    ----------
+    message: str
+        explanation of the failed workers
+    exit_codes: list
+        exit codes of the worker processes
+    """
+
+    def __init__(self, message: str, exit_codes: list):
+        self.message = message
+        self.exit_codes = exit_codes
+        super().__init__(self.message)
@@ -0,0 +1,268 @@
+import heapq
+import itertools
+import json
+import sys
+import tempfile
+import typing as t
+from operator import itemgetter
+from pathlib import Path
+
+from loguru import logger
+
+from app.config import config
+from app.error import custom_error
+from app.schema import schema
+from app.utils import utils
+
+REFERENCE_TITLE_FIELD = {
+    "pubmed": "title_normalized",
+    "clinical_trials": "scientific_title_normalized",
+}
+
+
+def iter_mentions(
+    drugs: t.List[schema.Drugs], file_path: Path, type_of_schema: str
+) -> t.Iterator[t.Tuple[int, str, t.Union[int, str], int, str]]:
+    """
+    Streams the mention tuples of the publications of a file.
+
+    Parameters
+    ----------
+    drugs : List[schema.Drugs]
+        The validated drugs.
+    file_path : Path
+        Path of a PubMed or ClinicalTrials file.
+    type_of_schema : str
+        'pubmed' or 'clinical_trials'.
+
+    Yields
+    ------
+    tuple
+        (position of the drug, source, id, date ordinal, journal) for every drug
+        whose name appears in the title of a valid publication.
+    """
+    title_field = REFERENCE_TITLE_FIELD[type_of_schema]
+    for element, _ in utils.iter_file(file_path, type_of_schema):
+        if element is None:
+            continue
+
+        title_normalized = getattr(element, title_field)
+        for position, drug in enumerate(drugs):
+            if drug.drug_normalized in title_normalized:
+                yield position, type_of_schema, element.id, element.date_ordinal, element.journal
+
+
+def within_error_budget(
+    file_path: Path, type_of_schema: str, error_budget: t.Optional[schema.ErrorBudget]
+) -> bool:
+    """
+    Checks that a file does not exceed an error budget, without keeping its items.
+
+    A file exceeding the budget is logged and skipped, as `pipeline.ingest` does, so it must
+    be rejected before any of its mentions is spilled.
+
+    Parameters
+    ----------
+    file_path : Path
+        Path of a PubMed or ClinicalTrials file.
+    type_of_schema : str
+        'pubmed' or 'clinical_trials'.
+    error_budget : schema.ErrorBudget, optional
+        The error budget of the file. If None, every file is accepted without being read.
+
+    Returns
+    -------
+    bool
+        True if the file may be reconciled.
+    """
+    if error_budget is None:
+        return True
+
+    try:
+        for _ in utils.iter_file(file_path, type_of_schema, error_budget):
+            pass
+    except custom_error.ErrorBudgetExceeded as err:
+        logger.error(f"File skipped : {err.message}")
+        return False
+    return True
+
+
+def spill_run(mentions: t.List[tuple], spill_dir: Path) -> Path:
+    """
+    Sorts a buffer of mention tuples and writes it to a spill file, one JSON array per line.
+
+    Parameters
+    ----------
+    mentions : List[tuple]
+        The buffered mention tuples.
+    spill_dir : Path
+        The folder of the spill files.
+
+    Returns
+    -------
+    Path
+        The path of the sorted run.
+    """
+    mentions.sort()
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=spill_dir, suffix=".jsonl", delete=False
+    ) as file:
+        file.writelines(
+            json.dumps(mention, ensure_ascii=False) + "\n" for mention in mentions
+        )
+
+    return Path(file.name)
+
+
+def read_run(run_path: Path) -> t.Iterator[tuple]:
+    """
+    Streams the mention tuples of a spill file.
+
+    Parameters
+    ----------
+    run_path : Path
+        The path of a run written by `spill_run`.
+
+    Yields
+    ------
+    tuple
+        The mention tuples, in the order of the run.
+    """
+    with run_path.open("r", encoding="utf-8") as file:
+        for line in file:
+            yield tuple(json.loads(line))
+
+
+def build_record(
+    drug: schema.Drugs, mentions: t.Iterable[tuple], with_mentions: bool
+) -> t.Dict[str, t.Any]:
+    """
+    Builds the reconciliation record of a drug from its mention tuples.
+
+    Parameters
+    ----------
+    drug : schema.Drugs
+        The drug.
+    mentions : Iterable[tuple]
+        The mention tuples of the drug.
+    with_mentions : bool
+        If True, also keeps the mentions sorted by date, as `utils.reconciliation_data` does.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The record, as `utils.reconciliation_data` returns it.
+    """
+    mentions = list(mentions)
+    drug_reconciliation = schema.DrugsReconcilation(
+        drug=drug,
+        pubmed={id_ for _, source, id_, _, _ in mentions if source == "pubmed"},
+        clinical_trials={
+            id_ for _, source, id_, _, _ in mentions if source == "clinical_trials"
+        },
+        journals={journal for *_, journal in mentions},
+        mentions=(
+            sorted(
+                (
+                    schema.Mention(
+                        source=source,
+                        id=id_,
+                        date_ordinal=date_ordinal,
+                        journal=journal,
+                    )
+                    for _, source, id_, date_ordinal, journal in mentions
+                ),
+                key=lambda mention: mention.date_ordinal,
+            )
+            if with_mentions
+            else None
+        ),
+    )
+    return drug_reconciliation.model_dump(exclude_none=True)
+
+
+def reconcile_out_of_core(
+    drugs: t.List[schema.Drugs],
+    paths_pubmed: t.List[Path],
+    paths_clinical_trials: t.List[Path],
+    *,
+    memory_budget: int = config.EXTERNAL_MEMORY_BUDGET,
+    spill_dir: t.Optional[Path] = None,
+    error_budget: t.Optional[schema.ErrorBudget] = None,
+    with_mentions: bool = False,
+) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Reconciles drugs with publications streamed from disk, under a memory budget.
+
+    Publications are never held in memory: each one is validated, matched against the
+    drugs and dropped, and only its (drug, publication, journal) mention tuples are buffered.
+    When the buffer reaches `memory_budget`, it is sorted and spilled to disk. The sorted
+    runs are finally merged, and each drug's record is built from its group of tuples.
+
+    Parameters
+    ----------
+    drugs : List[schema.Drugs]
+        The validated drugs, which stay in memory.
+    paths_pubmed : List[Path]
+        Paths of the PubMed files.
+    paths_clinical_trials : List[Path]
+        Paths of the ClinicalTrials files.
+    memory_budget : int, optional
+        The approximate size in bytes of the buffered tuples before a spill.
+        Default is `config.EXTERNAL_MEMORY_BUDGET`.
+    spill_dir : Path, optional
+        The folder in which the temporary spill files are created. Default is the system temporary folder.
+    error_budget : schema.ErrorBudget, optional
+        The error budget of each publication file; a file exceeding it is skipped, as
+        `pipeline.ingest` does. Each file is then read twice: once to check the budget
+        (see `within_error_budget`), once to stream its mentions. Default is None.
+    with_mentions : bool, optional
+        If True, also keeps the mentions sorted by date. Default is False.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        One reconciliation record per drug, in the order of `drugs`, as `utils.reconciliation_data` returns them.
+
+    Examples
+    --------
+    >>> reconcile_out_of_core(drugs, [Path("pubmed.csv")], [Path("clinical_trials.csv")], memory_budget=2**20)
+
+    Notes
+    -----
+    Fuzzy matching is not available in this mode, since it needs an index over every title.
+    The budget is an estimate based on `sys.getsizeof` of the tuples and their values.
+    """
+    sources = [
+        (file_path, type_of_schema)
+        for file_path, type_of_schema in (
+            [(file_path, "pubmed") for file_path in paths_pubmed]
+            + [(file_path, "clinical_trials") for file_path in paths_clinical_trials]
+        )
+        if within_error_budget(file_path, type_of_schema, error_budget)
+    ]
+
+    with tempfile.TemporaryDirectory(dir=spill_dir) as temporary_dir:
+        run_paths = []
+        buffer = []
+        buffer_size = 0
+        for file_path, type_of_schema in sources:
+            for mention in iter_mentions(drugs, file_path, type_of_schema):
+                buffer.append(mention)
+                buffer_size += sys.getsizeof(mention) + sum(map(sys.getsizeof, mention))
+                if buffer_size >= memory_budget:
+                    run_paths.append(spill_run(buffer, Path(temporary_dir)))
+                    buffer, buffer_size = [], 0
+
+        buffer.sort()
+        logger.info(f"Merging {len(run_paths)} spilled runs")
+        merged = heapq.merge(buffer, *(read_run(run_path) for run_path in run_paths))
+        records = {
+            position: build_record(drugs[position], group, with_mentions)
+            for position, group in itertools.groupby(merged, key=itemgetter(0))
+        }
+
+    return [
+        records.get(position) or build_record(drug, [], with_mentions)
+        for position, drug in enumerate(drugs)
+    ]
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import typing as t
+from pathlib import Path
+
+from loguru import logger
+
+from app.cache import cache
+
+MANIFEST_FORMAT = "save_file/json"
+MANIFEST_VERSION = 3
+MANIFEST_SUFFIX = ".manifest"
+
+
+def manifest_path(file_path: Path) -> Path:
+    """
+    Returns the path of the manifest of an output file.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path of the output file.
+
+    Returns
+    -------
+    Path
+        The path of the manifest, next to the output file.
+    """
+    return file_path.with_name(file_path.name + MANIFEST_SUFFIX)
+
+
+def write_manifest(file_path: Path, type_of_schema: str) -> None:
+    """
+    Records the format, schema, size and SHA-256 digest of an output file written by this package.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path of the output file, already written.
+    type_of_schema : str
+        The type of schema of the records of the file, a key of `config.REFERENCE_SCHEMA`.
+
+    Returns
+    -------
+    None
+    """
+    path_manifest = manifest_path(file_path)
+    temporary_path = path_manifest.with_suffix(".tmp")
+    temporary_path.write_text(
+        json.dumps(
+            {
+                "format": MANIFEST_FORMAT,
+                "version": MANIFEST_VERSION,
+                "type_of_schema": type_of_schema,
+                "schema": cache.schema_digest(),
+                "size": file_path.stat().st_size,
+                "sha256": cache.file_digest(file_path),
+            }
+        )
+    )
+    os.replace(temporary_path, path_manifest)
+
+
+def load_manifest(
+    file_path: Path, type_of_schema: str
+) -> t.Optional[t.Dict[str, t.Any]]:
+    """
+    Loads the manifest of an output file if it has the current format, version and schema.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path of the output file.
+    type_of_schema : str
+        The type of schema expected for the records of the file.
+
+    Returns
+    -------
+    Dict[str, Any] or None
+        The manifest, or None if it is missing, unreadable, or written for another format,
+        version, type of schema or schema definition.
+    """
+    try:
+        manifest = json.loads(manifest_path(file_path).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    expected = {
+        "format": MANIFEST_FORMAT,
+        "version": MANIFEST_VERSION,
+        "type_of_schema": type_of_schema,
+        "schema": cache.schema_digest(),
+    }
+    if not isinstance(manifest, dict) or any(
+        manifest.get(key) != value for key, value in expected.items()
+    ):
+        return None
+    return manifest
+
+
+def read_verified(file_path: Path, type_of_schema: str) -> t.Optional[bytes]:
+    """
+    Reads an output file if it matches its manifest.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path of the output file.
+    type_of_schema : str
+        The type of schema expected for the records of the file.
+
+    Returns
+    -------
+    bytes or None
+        The content of the file, or None if the file has no manifest of the current
+        version and of `type_of_schema`, or was modified since the manifest was written.
+
+    Examples
+    --------
+    >>> content = read_verified(Path("output/drugs_reconcilation.json"), "drugs_reconcilation")
+    """
+    manifest = load_manifest(file_path, type_of_schema)
+    if manifest is None:
+        return None
+
+    content = file_path.read_bytes()
+    if len(content) != manifest.get("size") or hashlib.sha256(
+        content
+    ).hexdigest() != manifest.get("sha256"):
+        logger.warning(f"{file_path} does not match its manifest")
+        return None
+    return content
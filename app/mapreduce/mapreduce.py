@@ -0,0 +1,660 @@
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+import typing as t
+import uuid
+from operator import itemgetter
+from pathlib import Path
+
+from loguru import logger
+
+from app.config import config
+from app.error import custom_error
+from app.pipeline import pipeline
+from app.schema import schema
+from app.utils import utils
+
+JOB_FILE = "job.json"
+TASKS_DIR = "tasks"
+FRAGMENTS_DIR = "fragments"
+LOCK_SUFFIX = ".lock"
+
+
+def write_json_atomic(data: t.Any, file_path: Path) -> None:
+    """
+    Writes a JSON file through a unique temporary file, so readers never see it partially written.
+
+    Parameters
+    ----------
+    data : Any
+        The data to write.
+    file_path : Path
+        The path of the file.
+
+    Returns
+    -------
+    None
+    """
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=file_path.parent, suffix=".tmp", delete=False
+    ) as file:
+        json.dump(data, file, ensure_ascii=False)
+    os.replace(file.name, file_path)
+
+
+def create_job(
+    work_dir: Path,
+    path_drugs: Path,
+    paths_pubmed: t.List[Path],
+    paths_clinical_trials: t.List[Path],
+    **kwargs,
+) -> t.List[Path]:
+    """
+    Splits the reconciliation into one task file per publication file in a shared folder.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The folder shared by the coordinator and the workers.
+    path_drugs : Path
+        Path of the drugs file, read by every worker.
+    paths_pubmed : List[Path]
+        Paths of the PubMed files, one task each.
+    paths_clinical_trials : List[Path]
+        Paths of the ClinicalTrials files, one task each.
+    **kwargs
+        JSON-serializable keyword arguments passed to `utils.reconciliation_data`
+        (e.g. `with_mentions`).
+
+    Returns
+    -------
+    List[Path]
+        The paths of the task files.
+
+    Notes
+    -----
+    The job gets a new identifier, stamped in the job file, and its tasks, locks and
+    fragments are kept in a folder of their own (see `job_dir`), so nothing left in
+    `work_dir` by a previous job is reused.
+
+    Examples
+    --------
+    >>> create_job(Path("/shared/job"), Path("drugs.csv"), [Path("pubmed.csv")], [Path("clinical_trials.csv")])
+    """
+    job_id = uuid.uuid4().hex
+    (job_dir(work_dir, job_id) / TASKS_DIR).mkdir(parents=True, exist_ok=True)
+    (job_dir(work_dir, job_id) / FRAGMENTS_DIR).mkdir(parents=True, exist_ok=True)
+    write_json_atomic(
+        {"job_id": job_id, "path_drugs": str(path_drugs.resolve()), "kwargs": kwargs},
+        work_dir / JOB_FILE,
+    )
+
+    shards = [("pubmed", file_path) for file_path in paths_pubmed] + [
+        ("clinical_trials", file_path) for file_path in paths_clinical_trials
+    ]
+    task_paths = []
+    for position, (type_of_schema, file_path) in enumerate(shards):
+        task_id = f"{position:05d}"
+        task_path = job_dir(work_dir, job_id) / TASKS_DIR / f"{task_id}.json"
+        write_json_atomic(
+            {
+                "job_id": job_id,
+                "task_id": task_id,
+                "type_of_schema": type_of_schema,
+                "file_path": str(file_path.resolve()),
+            },
+            task_path,
+        )
+        task_paths.append(task_path)
+
+    logger.info(f"Job created in {work_dir} with {len(task_paths)} tasks")
+    return task_paths
+
+
+def job_dir(work_dir: Path, job_id: str) -> Path:
+    """
+    Returns the folder of the tasks, locks and fragments of a job.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The folder shared by the coordinator and the workers (see `create_job`).
+    job_id : str
+        The identifier of the job.
+
+    Returns
+    -------
+    Path
+        The folder of the job in `work_dir`.
+    """
+    return work_dir / job_id
+
+
+def job_tasks(work_dir: Path, job_id: str) -> t.Dict[Path, t.Dict[str, str]]:
+    """
+    Returns the tasks of a job.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The folder shared by the coordinator and the workers (see `create_job`).
+    job_id : str
+        The identifier of the job.
+
+    Returns
+    -------
+    Dict[Path, Dict[str, str]]
+        The content of each task file of the job, by path, in the order of the tasks.
+    """
+    return {
+        task_path: json.loads(task_path.read_text(encoding="utf-8"))
+        for task_path in sorted((job_dir(work_dir, job_id) / TASKS_DIR).glob("*.json"))
+    }
+
+
+def fragment_path(work_dir: Path, job_id: str, task_path: Path) -> Path:
+    """
+    Returns the path of the fragment of a task.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The folder shared by the coordinator and the workers (see `create_job`).
+    job_id : str
+        The identifier of the job.
+    task_path : Path
+        The path of the task file.
+
+    Returns
+    -------
+    Path
+        The path of the fragment, in the folder of the fragments of the job.
+    """
+    return job_dir(work_dir, job_id) / FRAGMENTS_DIR / task_path.name
+
+
+def read_lock(lock_path: Path) -> t.Tuple[str, int]:
+    """
+    Reads the owner and the modification time of a lock.
+
+    Parameters
+    ----------
+    lock_path : Path
+        The path of the lock file.
+
+    Returns
+    -------
+    Tuple[str, int]
+        The identifier of the worker holding the lock, and its modification time in
+        nanoseconds.
+    """
+    return lock_path.read_text(encoding="utf-8"), lock_path.stat().st_mtime_ns
+
+
+def create_lock(lock_path: Path, worker_id: str) -> bool:
+    """
+    Creates a lock file atomically, with `O_CREAT | O_EXCL`.
+
+    Parameters
+    ----------
+    lock_path : Path
+        The path of the lock file.
+    worker_id : str
+        The identifier of the worker, written in the lock.
+
+    Returns
+    -------
+    bool
+        False if the lock already exists.
+    """
+    try:
+        descriptor = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+
+    with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+        file.write(worker_id)
+    return True
+
+
+def break_abandoned_lock(lock_path: Path, worker_id: str, lease: float) -> bool:
+    """
+    Removes a lock older than its lease, checking it was not renewed meanwhile.
+
+    The lock is first renamed to a name private to the worker, then its owner and
+    modification time are compared with those read before: if another worker broke and
+    took the lock in between, its lock is put back instead.
+
+    Parameters
+    ----------
+    lock_path : Path
+        The path of the lock file.
+    worker_id : str
+        The identifier of the worker breaking the lock.
+    lease : float
+        The number of seconds after which a lock is abandoned.
+
+    Returns
+    -------
+    bool
+        True if an abandoned lock was removed.
+    """
+    abandoned_path = lock_path.with_name(f"{lock_path.name}.{worker_id}")
+    try:
+        lock = read_lock(lock_path)
+        if time.time_ns() - lock[1] < lease * 1e9:
+            return False
+        os.rename(lock_path, abandoned_path)
+        broken = read_lock(abandoned_path) == lock
+    except FileNotFoundError:
+        return False
+
+    if not broken:
+        try:
+            os.link(abandoned_path, lock_path)
+        except FileExistsError:
+            logger.warning(f"Lock {lock_path.name} renewed while it was broken")
+    abandoned_path.unlink()
+    return broken
+
+
+def claim_task(task_path: Path, worker_id: str, lease: float) -> bool:
+    """
+    Claims a task with a lock file created atomically.
+
+    Parameters
+    ----------
+    task_path : Path
+        The path of the task file.
+    worker_id : str
+        The identifier of the worker, written in the lock.
+    lease : float
+        The number of seconds after which the lock of a task that is still not done is
+        considered abandoned by a crashed worker, and can be claimed again.
+
+    Returns
+    -------
+    bool
+        True if the worker holds the lock of the task.
+
+    Notes
+    -----
+    The lock is created with `O_CREAT | O_EXCL`, which succeeds for a single process on a
+    local file system or on a shared one with atomic exclusive creation (e.g. NFSv3+).
+    `lease` must be much longer than a task: a live worker does not renew its lock.
+    """
+    lock_path = task_path.with_suffix(LOCK_SUFFIX)
+    if create_lock(lock_path, worker_id):
+        return True
+    if not break_abandoned_lock(lock_path, worker_id, lease):
+        return False
+    logger.warning(f"Abandoned lock of {task_path.name} broken by {worker_id}")
+    return create_lock(lock_path, worker_id)
+
+
+def release_task(task_path: Path, worker_id: str) -> None:
+    """
+    Removes the lock of a task if the worker still holds it.
+
+    Parameters
+    ----------
+    task_path : Path
+        The path of the task file.
+    worker_id : str
+        The identifier of the worker.
+
+    Returns
+    -------
+    None
+    """
+    lock_path = task_path.with_suffix(LOCK_SUFFIX)
+    try:
+        owner, _ = read_lock(lock_path)
+    except FileNotFoundError:
+        return
+    if owner == worker_id:
+        lock_path.unlink(missing_ok=True)
+    else:
+        logger.warning(f"Lock of {task_path.name} taken over by {owner}")
+
+
+def run_task(
+    drugs: t.List[schema.Drugs], task: t.Dict[str, str], **kwargs
+) -> t.Dict[str, t.Any]:
+    """
+    Reconciles every drug with the publications of one task.
+
+    Parameters
+    ----------
+    drugs : List[schema.Drugs]
+        The validated drugs.
+    task : Dict[str, str]
+        The content of the task file (see `create_job`).
+    **kwargs
+        Keyword arguments passed to `utils.reconciliation_data` (e.g. `with_mentions`).
+
+    Returns
+    -------
+    Dict[str, Any]
+        The fragment of the task: the partial record of every drug mentioned in the
+        publications, with the position of the drug instead of the drug itself.
+    """
+    elements, _ = pipeline.ingest([Path(task["file_path"])], task["type_of_schema"])
+    publications = {"pubmed": [], "clinical_trials": []}
+    publications[task["type_of_schema"]] = elements
+
+    records = pipeline.reconcile(
+        drugs, publications["pubmed"], publications["clinical_trials"], **kwargs
+    )
+    return {
+        "job_id": task["job_id"],
+        "task_id": task["task_id"],
+        "records": [
+            {"position": position, **{k: v for k, v in record.items() if k != "drug"}}
+            for position, record in enumerate(records)
+            if record["pubmed"] or record["clinical_trials"]
+        ],
+    }
+
+
+def run_pass(
+    work_dir: Path,
+    job: t.Dict[str, t.Any],
+    drugs: t.List[schema.Drugs],
+    worker_id: str,
+    lease: float,
+) -> int:
+    """
+    Claims and runs, once each, the tasks of a job that have no fragment and no live lock.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The folder shared by the coordinator and the workers (see `create_job`).
+    job : Dict[str, Any]
+        The content of the job file.
+    drugs : List[schema.Drugs]
+        The validated drugs.
+    worker_id : str
+        The identifier of the worker.
+    lease : float
+        The lease of the locks (see `claim_task`).
+
+    Returns
+    -------
+    int
+        The number of tasks run.
+    """
+    tasks_done = 0
+    for task_path, task in job_tasks(work_dir, job["job_id"]).items():
+        path_fragment = fragment_path(work_dir, job["job_id"], task_path)
+        if path_fragment.exists() or not claim_task(task_path, worker_id, lease):
+            continue
+        if not path_fragment.exists():
+            write_json_atomic(run_task(drugs, task, **job["kwargs"]), path_fragment)
+            tasks_done += 1
+        release_task(task_path, worker_id)
+    return tasks_done
+
+
+def pending_tasks(work_dir: Path, job_id: str) -> t.List[str]:
+    """
+    Returns the tasks of a job that have no fragment yet.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The folder shared by the coordinator and the workers (see `create_job`).
+    job_id : str
+        The identifier of the job.
+
+    Returns
+    -------
+    List[str]
+        The identifiers of the pending tasks.
+    """
+    return [
+        task_path.stem
+        for task_path in job_tasks(work_dir, job_id)
+        if not fragment_path(work_dir, job_id, task_path).exists()
+    ]
+
+
+def run_worker(
+    work_dir: Path,
+    worker_id: t.Optional[str] = None,
+    lease: float = config.MAPREDUCE_LEASE,
+    *,
+    poll_interval: float = config.MAPREDUCE_POLL_INTERVAL,
+    max_passes: t.Optional[int] = None,
+) -> int:
+    """
+    Claims and runs the tasks of a job until every task has a fragment.
+
+    Tasks locked by other workers are claimed again on the next passes, so a worker stays
+    until they are done, or takes them over once their lock is abandoned (see `claim_task`).
+    The wait between two passes starts at `poll_interval` and doubles up to
+    `config.MAPREDUCE_MAX_POLL_INTERVAL`.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The folder shared by the coordinator and the workers (see `create_job`).
+    worker_id : str, optional
+        The identifier of the worker. Default is None (host name and process id).
+    lease : float, optional
+        The lease of the locks (see `claim_task`). Default is `config.MAPREDUCE_LEASE`.
+    poll_interval : float, optional
+        The first wait in seconds between two passes. Default is `config.MAPREDUCE_POLL_INTERVAL`.
+    max_passes : int, optional
+        If given, the worker stops after this number of passes, even if tasks are still
+        pending. Default is None (until every task is done).
+
+    Returns
+    -------
+    int
+        The number of tasks run by this worker.
+
+    Examples
+    --------
+    >>> run_worker(Path("/shared/job"))
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    job = json.loads((work_dir / JOB_FILE).read_text(encoding="utf-8"))
+    drugs, _ = pipeline.ingest([Path(job["path_drugs"])], "drugs")
+
+    tasks_done = 0
+    for passes in itertools.count(1):
+        tasks_done += run_pass(work_dir, job, drugs, worker_id, lease)
+        missing_tasks = pending_tasks(work_dir, job["job_id"])
+        if not missing_tasks or passes == max_passes:
+            break
+        logger.info(
+            f"Worker {worker_id} waiting for {len(missing_tasks)} tasks locked by other workers"
+        )
+        time.sleep(
+            min(poll_interval * 2 ** (passes - 1), config.MAPREDUCE_MAX_POLL_INTERVAL)
+        )
+
+    logger.info(f"Worker {worker_id} ran {tasks_done} tasks")
+    return tasks_done
+
+
+def read_fragments(work_dir: Path, job_id: str) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Reads the fragments of every task of a job.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The folder of the job (see `create_job`).
+    job_id : str
+        The identifier of the job.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The fragments, in the order of the tasks.
+
+    Raises
+    ------
+    custom_error.IncompleteJobError
+        If a task of the job has no fragment, or a fragment stamped with another job.
+    """
+    task_paths = list(job_tasks(work_dir, job_id))
+    fragments = {}
+    for task_path in task_paths:
+        path_fragment = fragment_path(work_dir, job_id, task_path)
+        if path_fragment.exists():
+            fragments[task_path] = json.loads(path_fragment.read_text(encoding="utf-8"))
+
+    missing_tasks = [
+        task_path.stem
+        for task_path in task_paths
+        if fragments.get(task_path, {}).get("job_id") != job_id
+    ]
+    if missing_tasks:
+        message = f"{len(missing_tasks)}/{len(task_paths)} tasks are not done"
+        logger.error(message)
+        raise custom_error.IncompleteJobError(message, missing_tasks)
+    return list(fragments.values())
+
+
+def reduce_job(
+    work_dir: Path, output_path: Path, report_path: t.Optional[Path] = None
+) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Merges the fragments of a job into the reconciliation output and the journal counts.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The folder of the job (see `create_job`).
+    output_path : Path
+        Path of the JSON output (see `utils.save_file`).
+    report_path : Path, optional
+        If given, the most cited journals are written to this JSON file (see
+        `utils.journal_most_cited`). Default is None.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        One reconciliation record per drug, as `pipeline.reconcile` returns them for all
+        the publications at once.
+
+    Raises
+    ------
+    custom_error.IncompleteJobError
+        If a task of the job has no fragment of the job yet (see `read_fragments`).
+    """
+    job = json.loads((work_dir / JOB_FILE).read_text(encoding="utf-8"))
+    drugs, _ = pipeline.ingest([Path(job["path_drugs"])], "drugs")
+
+    fragments = read_fragments(work_dir, job["job_id"])
+
+    merged = [
+        {"pubmed": {}, "clinical_trials": {}, "journals": {}, "mentions": []}
+        for _ in drugs
+    ]
+    for fragment in fragments:
+        for record in fragment["records"]:
+            partial = merged[record["position"]]
+            for field in ("pubmed", "clinical_trials", "journals"):
+                partial[field].update(dict.fromkeys(record[field]))
+            partial["mentions"].extend(record.get("mentions", []))
+
+    drugs_reconcilation = [
+        schema.DrugsReconcilation(
+            drug=drug,
+            pubmed=list(partial["pubmed"]),
+            clinical_trials=list(partial["clinical_trials"]),
+            journals=list(partial["journals"]),
+            mentions=(
+                sorted(partial["mentions"], key=itemgetter("date_ordinal"))
+                if job["kwargs"].get("with_mentions")
+                else None
+            ),
+        ).model_dump(exclude_none=True)
+        for drug, partial in zip(drugs, merged)
+    ]
+
+    utils.save_file(
+        drugs_reconcilation, output_path, type_of_schema="drugs_reconcilation"
+    )
+    if report_path is not None:
+        utils.write_top_journals(drugs_reconcilation, report_path)
+    return drugs_reconcilation
+
+
+def run_job(
+    work_dir: Path,
+    path_drugs: Path,
+    paths_pubmed: t.List[Path],
+    paths_clinical_trials: t.List[Path],
+    output_path: Path,
+    *,
+    n_workers: int = 2,
+    report_path: t.Optional[Path] = None,
+    **kwargs,
+) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Runs a whole job on this machine: creates the tasks, runs `n_workers` worker processes, then reduces.
+
+    On several machines, the coordinator calls `create_job` then `reduce_job` once the
+    workers, started on every machine with `run_worker` over the shared folder, are done.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The folder of the job.
+    path_drugs : Path
+        Path of the drugs file.
+    paths_pubmed : List[Path]
+        Paths of the PubMed files.
+    paths_clinical_trials : List[Path]
+        Paths of the ClinicalTrials files.
+    output_path : Path
+        Path of the JSON output.
+    n_workers : int, optional
+        The number of worker processes. Default is 2.
+    report_path : Path, optional
+        Path of the report of the most cited journals (see `reduce_job`). Default is None.
+    **kwargs
+        JSON-serializable keyword arguments passed to `utils.reconciliation_data`.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The reconciliation records (see `reduce_job`).
+
+    Raises
+    ------
+    custom_error.WorkerError
+        If a worker process exited with an error.
+
+    Examples
+    --------
+    >>> run_job(Path("job"), Path("drugs.csv"), [Path("pubmed.csv")], [Path("clinical_trials.csv")], Path("output.json"))
+    """
+    create_job(work_dir, path_drugs, paths_pubmed, paths_clinical_trials, **kwargs)
+
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(work_dir,))
+        for _ in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    exit_codes = [worker.exitcode for worker in workers]
+    if any(exit_codes):
+        message = f"Workers of {work_dir} failed with exit codes {exit_codes}"
+        logger.error(message)
+        raise custom_error.WorkerError(message, exit_codes)
+
+    return reduce_job(work_dir, output_path, report_path)
@@ -0,0 +1,305 @@
+import re
+import time
+import typing as t
+from collections import Counter, defaultdict
+
+from loguru import logger
+
+from app.schema import schema
+
+TOKEN_PATTERN = re.compile(r"\w+")
+TRIGRAM_SIZE = 3
+DEFAULT_MAX_DISTANCE = 1
+
+
+class TrigramIndex(t.NamedTuple):
+    """
+    A character-trigram index over the tokens of normalized titles.
+
+    Attributes
+    ----------
+    trigrams : Dict[str, Set[str]]
+        For each trigram, the tokens containing it.
+    titles : Dict[str, Set[str]]
+        For each token, the normalized titles containing it.
+    """
+
+    trigrams: t.Dict[str, t.Set[str]]
+    titles: t.Dict[str, t.Set[str]]
+
+
+def token_trigrams(token: str) -> t.Set[str]:
+    """
+    Returns the distinct trigrams of a token padded with '$' on both sides.
+
+    Parameters
+    ----------
+    token : str
+        A normalized token.
+
+    Returns
+    -------
+    Set[str]
+        The distinct trigrams of the padded token.
+
+    Examples
+    --------
+    >>> sorted(token_trigrams("abc"))
+    ['$$a', '$ab', 'abc', 'bc$', 'c$$']
+    """
+    padded_token = f"$${token}$$"
+    return {
+        padded_token[position : position + TRIGRAM_SIZE]
+        for position in range(len(padded_token) - TRIGRAM_SIZE + 1)
+    }
+
+
+def build_trigram_index(titles_normalized: t.Iterable[str]) -> TrigramIndex:
+    """
+    Builds a trigram index over the tokens of normalized titles.
+
+    Parameters
+    ----------
+    titles_normalized : Iterable[str]
+        Normalized titles (e.g. `PubMed.title_normalized`, `ClinicalTrials.scientific_title_normalized`).
+
+    Returns
+    -------
+    TrigramIndex
+        The index, built in one pass over the titles.
+
+    Examples
+    --------
+    >>> trigram_index = build_trigram_index(element.title_normalized for element in elements_pubmed)
+    """
+    titles = defaultdict(set)
+    for title_normalized in titles_normalized:
+        for token in TOKEN_PATTERN.findall(title_normalized):
+            titles[token].add(title_normalized)
+
+    trigrams = defaultdict(set)
+    for token in titles:
+        for trigram in token_trigrams(token):
+            trigrams[trigram].add(token)
+
+    return TrigramIndex(trigrams=dict(trigrams), titles=dict(titles))
+
+
+def bounded_edit_distance(source: str, target: str, max_distance: int) -> int:
+    """
+    Computes the Levenshtein distance between two strings, bounded by `max_distance`.
+
+    The computation stops as soon as every cell of a row exceeds `max_distance`.
+
+    Parameters
+    ----------
+    source : str
+        The first string.
+    target : str
+        The second string.
+    max_distance : int
+        The largest distance worth computing exactly.
+
+    Returns
+    -------
+    int
+        The edit distance, or `max_distance + 1` if it exceeds `max_distance`.
+
+    Examples
+    --------
+    >>> bounded_edit_distance("ethanol", "etanol", 1)
+    1
+    >>> bounded_edit_distance("ethanol", "atropine", 1)
+    2
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+
+    previous_row = list(range(len(target) + 1))
+    for position_source, character_source in enumerate(source, start=1):
+        current_row = [position_source]
+        for position_target, character_target in enumerate(target, start=1):
+            current_row.append(
+                min(
+                    previous_row[position_target] + 1,
+                    current_row[position_target - 1] + 1,
+                    previous_row[position_target - 1]
+                    + (character_source != character_target),
+                )
+            )
+        if min(current_row) > max_distance:
+            return max_distance + 1
+        previous_row = current_row
+
+    return min(previous_row[-1], max_distance + 1)
+
+
+def candidate_tokens(
+    trigram_index: TrigramIndex, token: str, max_distance: int
+) -> t.Set[str]:
+    """
+    Returns the indexed tokens that may be within `max_distance` edits of `token`.
+
+    One edit changes at most three trigrams, so a token within `max_distance` edits
+    shares at least `len(token_trigrams(token)) - 3 * max_distance` trigrams with `token`.
+
+    Parameters
+    ----------
+    trigram_index : TrigramIndex
+        The index returned by `build_trigram_index`.
+    token : str
+        The normalized token to look up.
+    max_distance : int
+        The maximum edit distance.
+
+    Returns
+    -------
+    Set[str]
+        The candidate tokens, to be verified with `bounded_edit_distance`.
+
+    Notes
+    -----
+    When the trigram filter cannot prune anything (very short tokens), every indexed
+    token of compatible length is a candidate.
+    """
+    trigrams = token_trigrams(token)
+    min_shared = len(trigrams) - TRIGRAM_SIZE * max_distance
+    if min_shared <= 0:
+        return {
+            indexed_token
+            for indexed_token in trigram_index.titles
+            if abs(len(indexed_token) - len(token)) <= max_distance
+        }
+
+    shared_trigrams = Counter(
+        indexed_token
+        for trigram in trigrams
+        for indexed_token in trigram_index.trigrams.get(trigram, ())
+    )
+    return {
+        indexed_token
+        for indexed_token, count in shared_trigrams.items()
+        if count >= min_shared
+    }
+
+
+def fuzzy_titles(
+    trigram_index: TrigramIndex,
+    drug_normalized: str,
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+) -> t.Set[str]:
+    """
+    Returns the normalized titles containing a token within `max_distance` edits of the drug name.
+
+    Parameters
+    ----------
+    trigram_index : TrigramIndex
+        The index returned by `build_trigram_index`.
+    drug_normalized : str
+        The normalized drug name (`Drugs.drug_normalized`).
+    max_distance : int, optional
+        The maximum edit distance. Default is `DEFAULT_MAX_DISTANCE`.
+
+    Returns
+    -------
+    Set[str]
+        The matching normalized titles.
+
+    Examples
+    --------
+    >>> fuzzy_titles(trigram_index, "diphenhydramine")
+
+    Notes
+    -----
+    Only single-token drug names are matched fuzzily; names made of several tokens
+    return an empty set and rely on exact matching only.
+    """
+    tokens = TOKEN_PATTERN.findall(drug_normalized)
+    if len(tokens) != 1:
+        return set()
+
+    titles = set()
+    for indexed_token in candidate_tokens(trigram_index, tokens[0], max_distance):
+        if (
+            bounded_edit_distance(tokens[0], indexed_token, max_distance)
+            <= max_distance
+        ):
+            titles |= trigram_index.titles[indexed_token]
+
+    return titles
+
+
+def benchmark_fuzzy_matching(
+    drugs: t.List[schema.Drugs],
+    elements_pubmed: t.List[schema.PubMed],
+    elements_clinical_trials: t.List[schema.ClinicalTrials],
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+) -> t.Dict[str, float]:
+    """
+    Compares fuzzy matching against exact substring matching and measures its throughput.
+
+    Parameters
+    ----------
+    drugs : List[schema.Drugs]
+        The drugs to look up.
+    elements_pubmed : List[schema.PubMed]
+        A list of PubMed data entries.
+    elements_clinical_trials : List[schema.ClinicalTrials]
+        A list of ClinicalTrials data entries.
+    max_distance : int, optional
+        The maximum edit distance. Default is `DEFAULT_MAX_DISTANCE`.
+
+    Returns
+    -------
+    Dict[str, float]
+        The benchmark report:
+        - exact_matches / fuzzy_matches: number of (drug, title) pairs found by each mode,
+        - exact_recall: share of the exact pairs also found by fuzzy matching,
+        - fuzzy_only_matches: pairs found by fuzzy matching only (misspellings and variants),
+        - index_seconds / query_seconds: time spent building the index and matching,
+        - drugs_per_second / titles_per_second: matching throughput.
+
+    Examples
+    --------
+    >>> report = benchmark_fuzzy_matching(drugs, elements_pubmed, elements_clinical_trials)
+    >>> report["fuzzy_only_matches"]
+    """
+    titles_normalized = {element.title_normalized for element in elements_pubmed} | {
+        element.scientific_title_normalized for element in elements_clinical_trials
+    }
+
+    start = time.perf_counter()
+    trigram_index = build_trigram_index(titles_normalized)
+    index_seconds = time.perf_counter() - start
+
+    exact_pairs = {
+        (drug.drug_normalized, title)
+        for drug in drugs
+        for title in titles_normalized
+        if drug.drug_normalized in title
+    }
+
+    start = time.perf_counter()
+    fuzzy_pairs = {
+        (drug.drug_normalized, title)
+        for drug in drugs
+        for title in fuzzy_titles(trigram_index, drug.drug_normalized, max_distance)
+    }
+    query_seconds = time.perf_counter() - start
+
+    report = {
+        "exact_matches": len(exact_pairs),
+        "fuzzy_matches": len(fuzzy_pairs),
+        "exact_recall": len(exact_pairs & fuzzy_pairs) / len(exact_pairs)
+        if exact_pairs
+        else 1.0,
+        "fuzzy_only_matches": len(fuzzy_pairs - exact_pairs),
+        "index_seconds": index_seconds,
+        "query_seconds": query_seconds,
+        "drugs_per_second": len(drugs) / query_seconds if query_seconds else 0.0,
+        "titles_per_second": len(titles_normalized) / index_seconds
+        if index_seconds
+        else 0.0,
+    }
+    logger.info(f"Fuzzy matching benchmark : {report}")
+    return report
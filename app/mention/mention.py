@@ -0,0 +1,173 @@
+import bisect
+import datetime
+import typing as t
+from operator import itemgetter
+
+from loguru import logger
+
+from app.error import custom_error
+from app.store import store
+from app.utils import utils
+
+
+def build_mention_index(
+    drugs_reconcilation: t.List[t.Dict[str, t.Any]],
+) -> t.Dict[str, t.Tuple[t.List[int], t.List[t.Dict[str, t.Any]]]]:
+    """
+    Builds a per-drug index of mentions sorted by date.
+
+    Parameters
+    ----------
+    drugs_reconcilation : List[Dict[str, Any]]
+        Reconciliation records produced with `with_mentions=True`, as
+        `utils.read_trusted_output` returns them.
+
+    Returns
+    -------
+    Dict[str, Tuple[List[int], List[Dict[str, Any]]]]
+        For each drug ATC code, the sorted date ordinals and the mentions in the same order.
+
+    Raises
+    ------
+    custom_error.MentionIndexError
+        If a record was produced without its mentions.
+    custom_error.DuplicateRecordError
+        If several records share an ATC code (see `store.check_unique`).
+
+    Examples
+    --------
+    >>> mention_index = build_mention_index(drugs_reconcilation)
+    >>> mention_index["A04AD"][0]
+
+    Notes
+    -----
+    The ordinals are extracted once here so that every query afterwards is a bisect
+    on a plain list of integers.
+    """
+    store.check_unique(drugs_reconcilation)
+
+    mention_index = {}
+    for element in drugs_reconcilation:
+        if element.get("mentions") is None:
+            message = f"No mentions for drug {element['drug']['drug']}, reconciliation must run with_mentions"
+            logger.error(message)
+            raise custom_error.MentionIndexError(message=message)
+
+        mentions = sorted(element["mentions"], key=itemgetter("date_ordinal"))
+        mention_index[element["drug"]["atccode"]] = (
+            [mention["date_ordinal"] for mention in mentions],
+            mentions,
+        )
+
+    return mention_index
+
+
+def mentions_between(
+    mention_index: t.Dict[str, t.Tuple[t.List[int], t.List[t.Dict[str, t.Any]]]],
+    atccode: str,
+    start: datetime.date,
+    end: datetime.date,
+) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Returns the publications and trials mentioning a drug between two dates, bounds included.
+
+    Parameters
+    ----------
+    mention_index : Dict[str, Tuple[List[int], List[Dict[str, Any]]]]
+        The index returned by `build_mention_index`.
+    atccode : str
+        The ATC code of the drug.
+    start : datetime.date
+        The first date of the window.
+    end : datetime.date
+        The last date of the window.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The mentions of the drug within the window, sorted by date. Empty for an unknown drug.
+
+    Examples
+    --------
+    >>> mentions_between(mention_index, "A04AD", datetime.date(2019, 1, 1), datetime.date(2019, 12, 31))
+    """
+    ordinals, mentions = mention_index.get(atccode, ([], []))
+    lower = bisect.bisect_left(ordinals, start.toordinal())
+    upper = bisect.bisect_right(ordinals, end.toordinal())
+    return mentions[lower:upper]
+
+
+def journal_most_cited_between(
+    mention_index: t.Dict[str, t.Tuple[t.List[int], t.List[t.Dict[str, t.Any]]]],
+    start: datetime.date,
+    end: datetime.date,
+) -> t.List[str]:
+    """
+    Identifies the most cited journals among the mentions between two dates, bounds included.
+
+    As in `journal_most_cited`, a journal counts once per drug mentioning it.
+
+    Parameters
+    ----------
+    mention_index : Dict[str, Tuple[List[int], List[Dict[str, Any]]]]
+        The index returned by `build_mention_index`.
+    start : datetime.date
+        The first date of the window.
+    end : datetime.date
+        The last date of the window.
+
+    Returns
+    -------
+    List[str]
+        The names of the journals cited the most within the window.
+
+    Examples
+    --------
+    >>> journal_most_cited_between(mention_index, datetime.date(2020, 1, 1), datetime.date(2020, 12, 31))
+    """
+    all_journal = []
+    for atccode in mention_index:
+        mentions = mentions_between(mention_index, atccode, start, end)
+        all_journal.extend(dict.fromkeys(mention["journal"] for mention in mentions))
+
+    return utils.top_journals(all_journal)
+
+
+def journal_most_cited_by_year(
+    mention_index: t.Dict[str, t.Tuple[t.List[int], t.List[t.Dict[str, t.Any]]]],
+) -> t.Dict[int, t.List[str]]:
+    """
+    Identifies the most cited journals for each year covered by the mentions.
+
+    Parameters
+    ----------
+    mention_index : Dict[str, Tuple[List[int], List[Dict[str, Any]]]]
+        The index returned by `build_mention_index`.
+
+    Returns
+    -------
+    Dict[int, List[str]]
+        For each year with at least one mention, the names of the journals cited the most.
+
+    Examples
+    --------
+    >>> journal_most_cited_by_year(mention_index)
+    {2019: ['Journal of emergency nursing'], 2020: [...]}
+    """
+    years = {
+        datetime.date.fromordinal(ordinal).year
+        for ordinals, _ in mention_index.values()
+        for ordinal in (ordinals[:1] + ordinals[-1:])
+    }
+    if not years:
+        return {}
+
+    journals_by_year = {}
+    for year in range(min(years), max(years) + 1):
+        top_journal = journal_most_cited_between(
+            mention_index, datetime.date(year, 1, 1), datetime.date(year, 12, 31)
+        )
+        if top_journal:
+            journals_by_year[year] = top_journal
+
+    return journals_by_year
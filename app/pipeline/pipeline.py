@@ -0,0 +1,330 @@
+import contextlib
+import typing as t
+from pathlib import Path
+
+from loguru import logger
+
+from app.cache import cache
+from app.checkpoint import checkpoint
+from app.error import custom_error
+from app.external_memory import external_memory
+from app.manifest import manifest
+from app.profiling import profiling
+from app.schema import schema
+from app.utils import utils
+
+
+def ingest(
+    file_paths: t.List[Path],
+    type_of_schema: str,
+    snapshot_dir: t.Optional[Path] = None,
+    error_budget: t.Optional[schema.ErrorBudget] = None,
+) -> t.Tuple[t.List[t.Any], t.List[t.Any]]:
+    """
+    Reads and validates several files of the same schema.
+
+    Parameters
+    ----------
+    file_paths : List[Path]
+        Paths of the files to read (see `utils.read_file`).
+    type_of_schema : str
+        Type of schema to use for validating the files' items.
+    snapshot_dir : Path, optional
+        Folder of the binary snapshots of the files (see `utils.read_file`). Default is None.
+    error_budget : schema.ErrorBudget, optional
+        The error budget of each file (see `utils.read_file`). A file exceeding it is
+        logged and skipped, and the other files are still read. Default is None.
+
+    Returns
+    -------
+    tuple
+        A tuple of two lists: the validated items of every file, and the items that failed validation.
+
+    Examples
+    --------
+    >>> elements_pubmed, _ = ingest([Path("pubmed.csv"), Path("pubmed.json")], "pubmed")
+    """
+    valid_items = []
+    invalid_items = []
+    for file_path in file_paths:
+        try:
+            valid_items_file, invalid_items_file = utils.read_file(
+                file_path=file_path,
+                type_of_schema=type_of_schema,
+                snapshot_dir=snapshot_dir,
+                error_budget=error_budget,
+            )
+        except custom_error.ErrorBudgetExceeded as err:
+            logger.error(f"File skipped : {err.message}")
+            continue
+        valid_items.extend(valid_items_file)
+        invalid_items.extend(invalid_items_file)
+
+    return valid_items, invalid_items
+
+
+def reconcile(
+    drugs: t.List[t.Any],
+    elements_pubmed: t.List[t.Any],
+    elements_clinical_trials: t.List[t.Any],
+    **kwargs,
+) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Runs `utils.reconciliation_data` for every drug.
+
+    Parameters
+    ----------
+    drugs : List[schema.Drugs]
+        The validated drugs.
+    elements_pubmed : List[schema.PubMed]
+        The validated PubMed entries.
+    elements_clinical_trials : List[schema.ClinicalTrials]
+        The validated ClinicalTrials entries.
+    **kwargs
+        Keyword arguments passed to `utils.reconciliation_data` (e.g. `with_mentions`).
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        One reconciliation record per drug, in the order of `drugs`.
+    """
+    return [
+        utils.reconciliation_data(
+            drug=drug,
+            elements_pubmed=elements_pubmed,
+            elements_clinical_trials=elements_clinical_trials,
+            **kwargs,
+        )
+        for drug in drugs
+    ]
+
+
+def run_stages(
+    path_drugs: Path,
+    paths_pubmed: t.List[Path],
+    paths_clinical_trials: t.List[Path],
+    *,
+    snapshot_dir: t.Optional[Path] = None,
+    journal_path: t.Optional[Path] = None,
+    run_key: t.Optional[str] = None,
+    memory_budget: t.Optional[int] = None,
+    error_budget: t.Optional[schema.ErrorBudget] = None,
+    profiler: t.Optional[profiling.Profiler] = None,
+    **kwargs,
+) -> t.Dict[str, t.Any]:
+    """
+    Runs the ingest and reconciliation stages of the pipeline.
+
+    Parameters
+    ----------
+    path_drugs : Path
+        Path of the drugs file.
+    paths_pubmed : List[Path]
+        Paths of the PubMed files.
+    paths_clinical_trials : List[Path]
+        Paths of the ClinicalTrials files.
+    snapshot_dir : Path, optional
+        Folder of the binary snapshots of the input files (see `utils.read_file`). Default is None.
+    journal_path : Path, optional
+        If given, reconciliation is checkpointed in this journal (see `checkpoint`). Default is None.
+    run_key : str, optional
+        The key identifying the run, required with `journal_path`. Default is None.
+    memory_budget : int, optional
+        If given, publications are streamed from disk and reconciled out of core under this
+        budget in bytes (see `external_memory`), with `error_budget` but without snapshots,
+        which hold whole files in memory. Default is None.
+    error_budget : schema.ErrorBudget, optional
+        The error budget of each input file (see `ingest`). Default is None.
+    profiler : profiling.Profiler, optional
+        If given, every stage is recorded by the profiler (see `profiling.stage`). Default is None.
+    **kwargs
+        Keyword arguments passed to `utils.reconciliation_data` (e.g. `with_mentions`).
+
+    Returns
+    -------
+    Dict[str, Any]
+        The artifacts of the run: validated 'drugs', 'pubmed' and 'clinical_trials' (left empty
+        out of core, where publications are never held in memory) and the 'reconciliation' records.
+    """
+    with profiling.stage(profiler, "ingest_drugs"):
+        drugs, _ = ingest([path_drugs], "drugs", snapshot_dir, error_budget)
+    if memory_budget is not None:
+        with profiling.stage(profiler, "reconcile_out_of_core"):
+            drugs_reconcilation = external_memory.reconcile_out_of_core(
+                drugs,
+                paths_pubmed,
+                paths_clinical_trials,
+                memory_budget=memory_budget,
+                error_budget=error_budget,
+                **kwargs,
+            )
+        return {
+            "drugs": drugs,
+            "pubmed": [],
+            "clinical_trials": [],
+            "reconciliation": drugs_reconcilation,
+        }
+
+    with profiling.stage(profiler, "ingest_pubmed"):
+        elements_pubmed, _ = ingest(paths_pubmed, "pubmed", snapshot_dir, error_budget)
+    with profiling.stage(profiler, "ingest_clinical_trials"):
+        elements_clinical_trials, _ = ingest(
+            paths_clinical_trials, "clinical_trials", snapshot_dir, error_budget
+        )
+
+    with profiling.stage(profiler, "reconcile"):
+        if journal_path is not None:
+            drugs_reconcilation = checkpoint.reconcile_with_checkpoint(
+                drugs,
+                elements_pubmed,
+                elements_clinical_trials,
+                journal_path=journal_path,
+                run_key=run_key,
+                **kwargs,
+            )
+        else:
+            drugs_reconcilation = reconcile(
+                drugs, elements_pubmed, elements_clinical_trials, **kwargs
+            )
+
+    return {
+        "drugs": drugs,
+        "pubmed": elements_pubmed,
+        "clinical_trials": elements_clinical_trials,
+        "reconciliation": drugs_reconcilation,
+    }
+
+
+def restore_cached_output(
+    cache_dir: Path, key: str, output_path: Path
+) -> t.Optional[t.List[t.Dict[str, t.Any]]]:
+    """
+    Restores the output of a run from the cache, with the manifest `utils.save_file` writes.
+
+    Parameters
+    ----------
+    cache_dir : Path
+        The folder of the cache (see `cache`).
+    key : str
+        The key of the run (see `cache.cache_key`).
+    output_path : Path
+        Path of the JSON output.
+
+    Returns
+    -------
+    List[Dict[str, Any]] or None
+        The reconciliation records of the cached run, or None on a cache miss.
+    """
+    artifacts = cache.load_entry(cache_dir, key)
+    if artifacts is None:
+        return None
+
+    logger.info(f"Cache hit {key}, pipeline skipped")
+    cache.restore_output(artifacts, output_path)
+    manifest.write_manifest(output_path, "drugs_reconcilation")
+    return artifacts["reconciliation"]
+
+
+def run_pipeline(
+    path_drugs: Path,
+    paths_pubmed: t.List[Path],
+    paths_clinical_trials: t.List[Path],
+    output_path: Path,
+    *,
+    cache_dir: t.Optional[Path] = None,
+    snapshot_dir: t.Optional[Path] = None,
+    checkpoint_dir: t.Optional[Path] = None,
+    memory_budget: t.Optional[int] = None,
+    error_budget: t.Optional[schema.ErrorBudget] = None,
+    profiler: t.Optional[profiling.Profiler] = None,
+    **kwargs,
+) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Runs the whole pipeline: ingest, reconciliation and save of the output.
+
+    Parameters
+    ----------
+    path_drugs : Path
+        Path of the drugs file.
+    paths_pubmed : List[Path]
+        Paths of the PubMed files.
+    paths_clinical_trials : List[Path]
+        Paths of the ClinicalTrials files.
+    output_path : Path
+        Path of the JSON output.
+    cache_dir : Path, optional
+        If given, results are stored in a content-addressed cache in this folder, and a run
+        whose inputs, options (budgets included), schemas and code did not change is answered
+        from the cache (see `cache`).
+        Default is None (no cache).
+    snapshot_dir : Path, optional
+        Folder of the binary snapshots of the input files (see `utils.read_file`). Default is None.
+    checkpoint_dir : Path, optional
+        If given, completed drugs are journaled in this folder while reconciling, and a run
+        restarted after a crash resumes from its last checkpoint (see `checkpoint`). The journal
+        is removed once the output is saved. Default is None.
+    memory_budget : int, optional
+        If given, publications are reconciled out of core under this budget in bytes
+        (see `external_memory`); `checkpoint_dir` is then ignored. Default is None.
+    error_budget : schema.ErrorBudget, optional
+        The error budget of each input file; a file exceeding it is skipped (see `ingest`).
+        Default is None.
+    profiler : profiling.Profiler, optional
+        If given, the run is profiled in the mode of the profiler, and its report is written
+        when the run ends (see `profiling.Profiler`). Default is None (no profiling, and no
+        overhead).
+    **kwargs
+        Keyword arguments passed to `utils.reconciliation_data` (e.g. `with_mentions`).
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The reconciliation records, as written to `output_path`.
+
+    Examples
+    --------
+    >>> run_pipeline(Path("drugs.csv"), [Path("pubmed.csv")], [Path("clinical_trials.csv")], Path("output.json"))
+    """
+    with profiler or contextlib.nullcontext():
+        key = None
+        if cache_dir is not None or checkpoint_dir is not None:
+            key = cache.cache_key(
+                [path_drugs, *paths_pubmed, *paths_clinical_trials],
+                memory_budget=memory_budget,
+                error_budget=error_budget,
+                **kwargs,
+            )
+
+        if cache_dir is not None:
+            drugs_reconcilation = restore_cached_output(cache_dir, key, output_path)
+            if drugs_reconcilation is not None:
+                return drugs_reconcilation
+
+        journal_path = checkpoint_dir / f"{key}.jsonl" if checkpoint_dir else None
+        artifacts = run_stages(
+            path_drugs,
+            paths_pubmed,
+            paths_clinical_trials,
+            snapshot_dir=snapshot_dir,
+            journal_path=journal_path,
+            run_key=key,
+            memory_budget=memory_budget,
+            error_budget=error_budget,
+            profiler=profiler,
+            **kwargs,
+        )
+        with profiling.stage(profiler, "save"):
+            utils.save_file(
+                artifacts["reconciliation"],
+                output_path,
+                type_of_schema="drugs_reconcilation",
+            )
+
+        if journal_path is not None and journal_path.exists():
+            journal_path.unlink()
+
+        if cache_dir is not None:
+            artifacts["output"] = output_path.read_bytes()
+            cache.store_entry(cache_dir, key, artifacts)
+
+        return artifacts["reconciliation"]
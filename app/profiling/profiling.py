@@ -0,0 +1,241 @@
+import contextlib
+import cProfile
+import pstats
+import sys
+import threading
+import tracemalloc
+import typing as t
+from collections import Counter
+from pathlib import Path
+
+from loguru import logger
+
+from app.config import config
+
+HOT_FUNCTIONS_FILE = "hot_functions.txt"
+PROFILE_STATS_FILE = "profile.pstats"
+COLLAPSED_STACKS_FILE = "profile.collapsed"
+ALLOCATIONS_FILE = "allocations.txt"
+PROFILE_MODES = ("stacks", "functions", "allocations")
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stack of a thread at a regular interval, in the collapsed format of flame graphs.
+
+    Attributes
+    ----------
+    thread_id : int
+        The identifier of the sampled thread.
+    interval : float
+        The number of seconds between two samples.
+    samples : Counter
+        The number of samples of every collapsed stack.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        """
+        Samples the stack of the thread until `stop` is called.
+
+        Returns
+        -------
+        None
+        """
+        while not self.stopped.wait(self.interval):
+            # sys._current_frames is public despite its name, and the only way to read
+            # the stack of another thread.
+            frame = sys._current_frames().get(  # pylint: disable=protected-access
+                self.thread_id
+            )
+            stack = []
+            while frame is not None:
+                stack.append(
+                    f"{frame.f_globals.get('__name__')}.{frame.f_code.co_name}"
+                )
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        """
+        Stops the sampling and waits for the last sample.
+
+        Returns
+        -------
+        None
+        """
+        self.stopped.set()
+        self.join()
+
+
+class Profiler:
+    """
+    Profiles a run of the pipeline and writes its report when the run ends.
+
+    A profiler collects a single profile, chosen by its mode, so that no profile measures
+    the overhead of another:
+    - 'stacks': the stack of the calling thread sampled every `sample_interval` seconds,
+      written in the collapsed format of flame graphs (`flamegraph.pl`, speedscope) to
+      `COLLAPSED_STACKS_FILE`. Its overhead is the lowest, so the timings stay realistic.
+    - 'functions': every call of the calling thread, with `cProfile`, ranked into
+      `HOT_FUNCTIONS_FILE` (the raw statistics are kept in `PROFILE_STATS_FILE` for
+      `pstats` or snakeviz).
+    - 'allocations': the allocations of every stage (see `stage`), with `tracemalloc`,
+      written to `ALLOCATIONS_FILE`. `tracemalloc` is only stopped on exit if the profiler
+      started it, so tracing enabled by the caller (e.g. `python -X tracemalloc`) is left running.
+
+    Attributes
+    ----------
+    profile_dir : Path
+        The folder of the report.
+    mode : str
+        The profile collected, one of `PROFILE_MODES`.
+    top_n : int
+        The number of functions, and of allocation sites per stage, in the reports.
+    sample_interval : float
+        The number of seconds between two samples of the stack.
+    allocations : Dict[str, List[tracemalloc.StatisticDiff]]
+        The top allocation sites of every stage, in 'allocations' mode.
+
+    Examples
+    --------
+    >>> with Profiler(Path("profile"), mode="allocations") as profiler:
+    ...     with profiler.stage("ingest"):
+    ...         read_file(Path("pubmed.csv"), "pubmed")
+    """
+
+    def __init__(
+        self,
+        profile_dir: Path,
+        mode: str = config.PROFILE_MODE,
+        top_n: int = config.PROFILE_TOP_N,
+        sample_interval: float = config.PROFILE_SAMPLE_INTERVAL,
+    ):
+        if mode not in PROFILE_MODES:
+            raise ValueError(
+                f"Unknown profile mode {mode}, expected one of {PROFILE_MODES}"
+            )
+        self.profile_dir = profile_dir
+        self.mode = mode
+        self.top_n = top_n
+        self.sample_interval = sample_interval
+        self.allocations = {}
+        self.collector = None
+        self.started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        if self.mode == "stacks":
+            self.collector = StackSampler(threading.get_ident(), self.sample_interval)
+            self.collector.start()
+        elif self.mode == "functions":
+            self.collector = cProfile.Profile()
+            self.collector.enable()
+        else:
+            self.started_tracing = not tracemalloc.is_tracing()
+            if self.started_tracing:
+                tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.mode == "stacks":
+            self.collector.stop()
+        elif self.mode == "functions":
+            self.collector.disable()
+        elif self.started_tracing:
+            tracemalloc.stop()
+        self.write_reports()
+
+    @property
+    def samples(self) -> Counter:
+        """
+        Returns the number of samples of every collapsed stack.
+
+        Returns
+        -------
+        Counter
+            The samples of the last run, empty before the profiler is entered or outside
+            of 'stacks' mode.
+        """
+        if isinstance(self.collector, StackSampler):
+            return self.collector.samples
+        return Counter()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> t.Iterator[None]:
+        """
+        Records the top allocation sites of a stage of the run, in 'allocations' mode.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+
+        Yields
+        ------
+        None
+        """
+        if self.mode != "allocations":
+            yield
+            return
+
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        before = tracemalloc.take_snapshot().filter_traces(filters)
+        try:
+            yield
+        finally:
+            after = tracemalloc.take_snapshot().filter_traces(filters)
+            self.allocations[name] = after.compare_to(before, "lineno")[: self.top_n]
+
+    def write_reports(self) -> None:
+        """
+        Writes the report of the mode of the run in `profile_dir`.
+
+        Returns
+        -------
+        None
+        """
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        if self.mode == "stacks":
+            with (self.profile_dir / COLLAPSED_STACKS_FILE).open("w") as file:
+                for stack, count in sorted(self.samples.items()):
+                    file.write(f"{stack} {count}\n")
+        elif self.mode == "functions":
+            self.collector.dump_stats(self.profile_dir / PROFILE_STATS_FILE)
+            with (self.profile_dir / HOT_FUNCTIONS_FILE).open("w") as file:
+                stats = pstats.Stats(self.collector, stream=file)
+                stats.sort_stats("tottime", "cumulative").print_stats(self.top_n)
+        else:
+            with (self.profile_dir / ALLOCATIONS_FILE).open("w") as file:
+                for name, statistics in self.allocations.items():
+                    file.write(f"## {name}\n")
+                    file.writelines(f"{statistic}\n" for statistic in statistics)
+
+        logger.info(f"Profiling report ({self.mode}) written in {self.profile_dir}")
+
+
+def stage(profiler: t.Optional[Profiler], name: str) -> t.ContextManager[None]:
+    """
+    Returns the context of a stage, which does nothing when profiling is off.
+
+    Parameters
+    ----------
+    profiler : Profiler, optional
+        The profiler of the run, or None when profiling is off.
+    name : str
+        The name of the stage.
+
+    Returns
+    -------
+    ContextManager[None]
+        `profiler.stage(name)`, or an empty context if `profiler` is None.
+    """
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.stage(name)
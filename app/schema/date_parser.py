@@ -0,0 +1,72 @@
+import datetime
+import functools
+
+from app.error import custom_error
+
+DATE_FORMATS = ("%d/%m/%Y", "%d %B %Y", "%Y-%m-%d")
+
+
+@functools.lru_cache(maxsize=None)
+def parse_date(value: str) -> int:
+    """
+    Parses a raw date string into a proleptic Gregorian ordinal.
+
+    Every format of `DATE_FORMATS` is tried in order until one matches. The result
+    is memoized per distinct raw string: the feeds contain few distinct dates repeated
+    over many rows, so each of them is parsed only once per process.
+
+    Parameters
+    ----------
+    value : str
+        The raw date as found in the input file (e.g. '01/01/2019', '1 January 2020').
+
+    Returns
+    -------
+    int
+        The ordinal of the date, where January 1 of year 1 has ordinal 1.
+
+    Raises
+    ------
+    custom_error.DateFormatError
+        If the value matches none of the known formats.
+
+    Examples
+    --------
+    >>> parse_date("1 January 2020") == parse_date("01/01/2020")
+    True
+
+    Notes
+    -----
+    Ordinals are plain integers, so they sort and compare directly and can be used
+    for range scans without converting back to `datetime.date`.
+    """
+    raw_value = value.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(raw_value, date_format).toordinal()
+        except ValueError:
+            continue
+
+    raise custom_error.DateFormatError(message=f"Unknown date format : {value!r}")
+
+
+def ordinal_to_date(ordinal: int) -> datetime.date:
+    """
+    Converts an ordinal produced by `parse_date` back into a date.
+
+    Parameters
+    ----------
+    ordinal : int
+        The ordinal of the date.
+
+    Returns
+    -------
+    datetime.date
+        The corresponding date.
+
+    Examples
+    --------
+    >>> ordinal_to_date(parse_date("25/05/2020"))
+    datetime.date(2020, 5, 25)
+    """
+    return datetime.date.fromordinal(ordinal)
@@ -0,0 +1,92 @@
+import threading
+import typing as t
+
+INTERNER_MAX_VALUES = 2**16
+
+
+class Interner:
+    """
+    Maps repeated string values to one shared object.
+
+    The interner can be shared between threads. When it holds `max_values` values, it is
+    cleared before registering a new one, so a long-lived process does not grow it forever.
+
+    Attributes
+    ----------
+    max_values : int, optional
+        The maximum number of values kept. Default is None (unbounded).
+    """
+
+    def __init__(self, max_values: t.Optional[int] = None):
+        self.max_values = max_values
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def intern(self, value: str) -> str:
+        """
+        Returns the shared object equal to `value`, registering it on first sight.
+
+        Parameters
+        ----------
+        value : str
+            The value to intern.
+
+        Returns
+        -------
+        str
+            The shared object equal to `value`.
+
+        Examples
+        --------
+        >>> journals = Interner()
+        >>> journals.intern("Journal of emergency nursing") is journals.intern("Journal of emergency nursing")
+        True
+        """
+        with self._lock:
+            shared = self._values.get(value)
+            if shared is None:
+                if self.max_values is not None and len(self._values) >= self.max_values:
+                    self._values = {}
+                shared = self._values[value] = value
+            return shared
+
+    def clear(self) -> None:
+        """
+        Forgets every value, e.g. between two runs of a long-lived process.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._values = {}
+
+
+REFERENCE_INTERNER = {
+    "journal": Interner(INTERNER_MAX_VALUES),
+    "date": Interner(INTERNER_MAX_VALUES),
+}
+
+
+def intern_value(field_name: str, value: t.Optional[str]) -> t.Optional[str]:
+    """
+    Interns the value of a field with the interner of `REFERENCE_INTERNER` for that field.
+
+    Parameters
+    ----------
+    field_name : str
+        The name of the field, a key of `REFERENCE_INTERNER`.
+    value : str, optional
+        The value to intern; None is returned as is.
+
+    Returns
+    -------
+    str, optional
+        The shared object equal to `value`.
+    """
+    if value is None:
+        return value
+    return REFERENCE_INTERNER[field_name].intern(value)
@@ -0,0 +1,64 @@
+import functools
+import re
+import unicodedata
+
+NORMALIZATION_CACHE_SIZE = 2**16
+
+HEX_ESCAPE_PATTERN = re.compile(r"\\x[0-9a-fA-F]{2}")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def clean_escapes(value: str) -> str:
+    """
+    Removes the literal hexadecimal escapes (e.g. '\\xc3\\xb1') left in the raw feeds.
+
+    Parameters
+    ----------
+    value : str
+        The raw string.
+
+    Returns
+    -------
+    str
+        The string without its hexadecimal escapes.
+
+    Examples
+    --------
+    >>> clean_escapes("Journal of emergency nursing\\\\xc3\\\\x28")
+    'Journal of emergency nursing'
+    """
+    return HEX_ESCAPE_PATTERN.sub("", value)
+
+
+@functools.lru_cache(maxsize=NORMALIZATION_CACHE_SIZE)
+def normalize_text(value: str) -> str:
+    """
+    Normalizes a text field for matching and grouping.
+
+    The value is cleaned of its hexadecimal escapes, normalized to Unicode NFKC,
+    its whitespace runs are collapsed to a single space and it is casefolded.
+
+    Parameters
+    ----------
+    value : str
+        The raw string.
+
+    Returns
+    -------
+    str
+        The normalized string.
+
+    Examples
+    --------
+    >>> normalize_text("  Hôpitaux   Universitaires de Genève ")
+    'hôpitaux universitaires de genève'
+
+    Notes
+    -----
+    Results are memoized, so repeated values such as journal names or drug names
+    are normalized once per process. The cache is bounded by `NORMALIZATION_CACHE_SIZE`
+    because titles are mostly distinct.
+    """
+    value = unicodedata.normalize("NFKC", clean_escapes(value))
+    return WHITESPACE_PATTERN.sub(" ", value).strip().casefold()
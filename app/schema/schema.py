@@ -1,7 +1,8 @@
-import re
 import typing as t
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, ValidationInfo, field_validator, model_validator
+
+from app.schema import date_parser, interning, normalization
 
 
 class ClinicalTrials(BaseModel):
@@ -18,12 +19,40 @@ class ClinicalTrials(BaseModel):
         The date on which the trial information was published or updated. Should be in a standard date format.
     journal : str
         The name of the journal where the trial findings or details are published.
+    date_ordinal : int
+        The parsed `date` as a proleptic Gregorian ordinal, used for sorting and range scans.
+        Computed at validation time and excluded from dumps.
+    scientific_title_normalized : str
+        The normalized `scientific_title` (see `normalization.normalize_text`), excluded from dumps.
+    journal_normalized : str
+        The normalized `journal` (see `normalization.normalize_text`), excluded from dumps.
     """
 
     id: str = Field(min_length=3, pattern=r"^NCT.*$")
     scientific_title: str
     date: str
     journal: str
+    date_ordinal: t.Optional[int] = Field(default=None, exclude=True)
+    scientific_title_normalized: t.Optional[str] = Field(default=None, exclude=True)
+    journal_normalized: t.Optional[str] = Field(default=None, exclude=True)
+
+    @model_validator(mode="after")
+    def set_date_ordinal(self) -> "ClinicalTrials":
+        """
+        Parses the raw `date` into `date_ordinal`.
+
+        Returns
+        -------
+        ClinicalTrials
+            The validated instance with `date_ordinal` filled.
+
+        Raises
+        ------
+        custom_error.DateFormatError
+            If `date` matches none of the known formats, which rejects the row.
+        """
+        self.date_ordinal = date_parser.parse_date(self.date)
+        return self
 
     @field_validator("scientific_title", "journal")
     @classmethod
@@ -32,8 +61,9 @@ class ClinicalTrials(BaseModel):
         Removes non-alphanumeric characters from the provided string.
 
         This method is designed to clean fields like scientific_title and journal in the ClinicalTrials class.
-        It uses a regular expression to identify and remove characters represented by hexadecimal codes,
-        which are typically non-alphanumeric. This ensures that the fields only contain readable text characters.
+        It uses a precompiled regular expression (see `normalization.clean_escapes`) to identify and remove
+        characters represented by hexadecimal codes, which are typically non-alphanumeric. This ensures that
+        the fields only contain readable text characters.
 
         Parameters
         ----------
@@ -45,9 +75,43 @@ class ClinicalTrials(BaseModel):
         str
             The cleaned string with non-alphanumeric characters removed.
         """
-        pattern = r"\\x[0-9a-fA-F]{2}"
-        value = re.sub(pattern, "", value)
-        return value
+        return normalization.clean_escapes(value)
+
+    @field_validator("journal", "date")
+    @classmethod
+    def intern_repeated_values(cls, value: str, info: ValidationInfo) -> str:
+        """
+        Shares one object per distinct journal and date across every record (see `interning`).
+
+        Parameters
+        ----------
+        value : str
+            The cleaned value of the field.
+        info : ValidationInfo
+            The validation context, giving the name of the field.
+
+        Returns
+        -------
+        str
+            The shared object equal to `value`.
+        """
+        return interning.intern_value(info.field_name, value)
+
+    @model_validator(mode="after")
+    def set_normalized_fields(self) -> "ClinicalTrials":
+        """
+        Stores the normalized forms of `scientific_title` and `journal`.
+
+        Returns
+        -------
+        ClinicalTrials
+            The validated instance with its normalized fields filled.
+        """
+        self.scientific_title_normalized = normalization.normalize_text(
+            self.scientific_title
+        )
+        self.journal_normalized = normalization.normalize_text(self.journal)
+        return self
 
 
 class Drugs(BaseModel):
@@ -60,10 +124,26 @@ class Drugs(BaseModel):
         The Anatomical Therapeutic Chemical (ATC) classification system code, which classifies the drug based on its therapeutic and chemical characteristics.
     drug : str
         The common name or designation of the drug.
+    drug_normalized : str
+        The normalized `drug` (see `normalization.normalize_text`), excluded from dumps.
     """
 
     atccode: str
     drug: str
+    drug_normalized: t.Optional[str] = Field(default=None, exclude=True)
+
+    @model_validator(mode="after")
+    def set_normalized_fields(self) -> "Drugs":
+        """
+        Stores the normalized form of `drug`.
+
+        Returns
+        -------
+        Drugs
+            The validated instance with its normalized fields filled.
+        """
+        self.drug_normalized = normalization.normalize_text(self.drug)
+        return self
 
 
 class PubMed(BaseModel):
@@ -80,12 +160,116 @@ class PubMed(BaseModel):
         The date when the publication was released or last updated. Should be in a standard date format.
     journal : str
         The name of the journal in which the publication appeared.
+    date_ordinal : int
+        The parsed `date` as a proleptic Gregorian ordinal, used for sorting and range scans.
+        Computed at validation time and excluded from dumps.
+    title_normalized : str
+        The normalized `title` (see `normalization.normalize_text`), excluded from dumps.
+    journal_normalized : str
+        The normalized `journal` (see `normalization.normalize_text`), excluded from dumps.
     """
 
     id: int
     title: str
     date: str
     journal: str
+    date_ordinal: t.Optional[int] = Field(default=None, exclude=True)
+    title_normalized: t.Optional[str] = Field(default=None, exclude=True)
+    journal_normalized: t.Optional[str] = Field(default=None, exclude=True)
+
+    @field_validator("title", "journal")
+    @classmethod
+    def check_alphanumeric(cls, value: str) -> str:
+        """
+        Removes non-alphanumeric characters from the provided string.
+
+        Same cleaning as `ClinicalTrials.check_alphanumeric`.
+
+        Parameters
+        ----------
+        value : str
+            The string to be cleaned of non-alphanumeric characters.
+
+        Returns
+        -------
+        str
+            The cleaned string with non-alphanumeric characters removed.
+        """
+        return normalization.clean_escapes(value)
+
+    @field_validator("journal", "date")
+    @classmethod
+    def intern_repeated_values(cls, value: str, info: ValidationInfo) -> str:
+        """
+        Shares one object per distinct journal and date across every record (see `interning`).
+
+        Parameters
+        ----------
+        value : str
+            The cleaned value of the field.
+        info : ValidationInfo
+            The validation context, giving the name of the field.
+
+        Returns
+        -------
+        str
+            The shared object equal to `value`.
+        """
+        return interning.intern_value(info.field_name, value)
+
+    @model_validator(mode="after")
+    def set_normalized_fields(self) -> "PubMed":
+        """
+        Stores the normalized forms of `title` and `journal`.
+
+        Returns
+        -------
+        PubMed
+            The validated instance with its normalized fields filled.
+        """
+        self.title_normalized = normalization.normalize_text(self.title)
+        self.journal_normalized = normalization.normalize_text(self.journal)
+        return self
+
+    @model_validator(mode="after")
+    def set_date_ordinal(self) -> "PubMed":
+        """
+        Parses the raw `date` into `date_ordinal`.
+
+        Returns
+        -------
+        PubMed
+            The validated instance with `date_ordinal` filled.
+
+        Raises
+        ------
+        custom_error.DateFormatError
+            If `date` matches none of the known formats, which rejects the row.
+        """
+        self.date_ordinal = date_parser.parse_date(self.date)
+        return self
+
+
+class Mention(BaseModel):
+    """
+    A model representing a dated mention of a drug in a publication or a clinical trial.
+
+    Attributes
+    ----------
+    source : str
+        The feed the mention comes from, either 'pubmed' or 'clinical_trials'.
+    id : Union[int, str]
+        The identifier of the publication or of the clinical trial.
+    date_ordinal : int
+        The date of the publication or of the clinical trial as a proleptic Gregorian ordinal.
+    journal : str
+        The name of the journal in which the publication or the trial appeared.
+    """
+
+    source: str
+    id: t.Union[int, str]
+    date_ordinal: int
+    journal: str
 
 
 class DrugsReconcilation(BaseModel):
@@ -98,9 +282,50 @@ class DrugsReconcilation(BaseModel):
         The Anatomical Therapeutic Chemical (ATC) classification system code, which classifies the drug based on its therapeutic and chemical characteristics.
     drug : str
         The common name or designation of the drug.
+    mentions : List[Mention], optional
+        Every mention of the drug sorted by date, kept only when requested so that
+        date-range queries can bisect it.
     """
 
     drug: Drugs
     pubmed: t.List[int]
     clinical_trials: t.List[str]
     journals: t.List[str]
+    mentions: t.Optional[t.List[Mention]] = None
+
+    @field_validator("journals")
+    @classmethod
+    def intern_journals(cls, value: t.List[str]) -> t.List[str]:
+        """
+        Shares one object per distinct journal across every record (see `interning`).
+
+        Parameters
+        ----------
+        value : List[str]
+            The names of the journals.
+
+        Returns
+        -------
+        List[str]
+            The shared objects equal to the names.
+        """
+        return [interning.intern_value("journal", journal) for journal in value]
+
+
+class ErrorBudget(BaseModel):
+    """
+    A model representing the share of invalid items tolerated when reading a file.
+
+    Attributes
+    ----------
+    max_invalid_ratio : float, optional
+        The maximum ratio of invalid items, checked once `warmup_rows` items are read.
+    warmup_rows : int
+        The number of items read before `max_invalid_ratio` is checked.
+    max_consecutive_failures : int, optional
+        The maximum number of consecutive invalid items.
+    """
+
+    max_invalid_ratio: t.Optional[float] = Field(default=None, ge=0, le=1)
+    warmup_rows: int = Field(default=100, ge=1)
+    max_consecutive_failures: t.Optional[int] = Field(default=None, ge=1)
@@ -0,0 +1,370 @@
+import http.client
+import json
+import statistics
+import threading
+import time
+import typing as t
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from loguru import logger
+
+from app.config import config
+from app.schema import normalization
+from app.utils import utils
+
+
+class LookupIndex:
+    """
+    In-memory indexes over reconciliation records, answering drug, journal and top-k queries.
+
+    Attributes
+    ----------
+    records : Dict[str, Dict[str, Any]]
+        The records by ATC code.
+    atccodes : Dict[str, str]
+        The ATC code of each drug, by normalized drug name and by ATC code.
+    drugs_by_journal : Dict[str, List[str]]
+        The names of the drugs cited by each journal, by normalized journal name.
+    journal_counts : Counter
+        The number of drugs citing each journal.
+    """
+
+    def __init__(self, drugs_reconcilation: t.List[t.Dict[str, t.Any]]):
+        self.records = {}
+        self.atccodes = {}
+        self.drugs_by_journal = {}
+        self.journal_counts = Counter()
+        for record in drugs_reconcilation:
+            atccode = record["drug"]["atccode"]
+            self.records[atccode] = {
+                field: value for field, value in record.items() if value is not None
+            }
+            self.atccodes[atccode] = atccode
+            self.atccodes[
+                normalization.normalize_text(record["drug"]["drug"])
+            ] = atccode
+            self.journal_counts.update(record["journals"])
+            for journal in record["journals"]:
+                self.drugs_by_journal.setdefault(
+                    normalization.normalize_text(journal), []
+                ).append(record["drug"]["drug"])
+
+    def drug(self, key: str) -> t.Optional[t.Dict[str, t.Any]]:
+        """
+        Returns the record of a drug, by ATC code or by name (case-insensitive).
+
+        Parameters
+        ----------
+        key : str
+            The ATC code or the name of the drug.
+
+        Returns
+        -------
+        Dict[str, Any] or None
+            The record, or None for an unknown drug.
+        """
+        atccode = self.atccodes.get(key) or self.atccodes.get(
+            normalization.normalize_text(key)
+        )
+        return self.records.get(atccode)
+
+    def journal(self, name: str) -> t.List[str]:
+        """
+        Returns the names of the drugs cited by a journal (case-insensitive).
+
+        Parameters
+        ----------
+        name : str
+            The name of the journal.
+
+        Returns
+        -------
+        List[str]
+            The drug names, empty for an unknown journal.
+        """
+        return self.drugs_by_journal.get(normalization.normalize_text(name), [])
+
+    def top(self, k: int) -> t.List[t.Tuple[str, int]]:
+        """
+        Returns the `k` journals citing the most drugs.
+
+        Parameters
+        ----------
+        k : int
+            The number of journals.
+
+        Returns
+        -------
+        List[Tuple[str, int]]
+            The journals and their number of drugs, most cited first.
+        """
+        return self.journal_counts.most_common(k)
+
+    def query(self, query: t.Dict[str, t.Any]) -> t.Any:
+        """
+        Answers one query of a batch.
+
+        Parameters
+        ----------
+        query : Dict[str, Any]
+            {'type': 'drug', 'key': ...}, {'type': 'journal', 'name': ...} or {'type': 'top', 'k': ...}.
+
+        Returns
+        -------
+        Any
+            The answer of the matching method.
+        """
+        if query.get("type") == "drug":
+            return self.drug(query["key"])
+        if query.get("type") == "journal":
+            return self.journal(query["name"])
+        return self.top(int(query.get("k", 10)))
+
+
+class LookupService:
+    """
+    Keeps the `LookupIndex` of an output file warm, and reloads it when the file changes.
+
+    Attributes
+    ----------
+    file_path : Path
+        The JSON output of the reconciliation.
+    """
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._index = None
+        self.index()
+
+    def index(self) -> LookupIndex:
+        """
+        Returns the current index, reloading it first if the output file changed.
+
+        The new index is fully built before it replaces the old one, so concurrent
+        queries always see either the previous or the new data, never a mix. If the
+        reload fails, the error is logged and the previous index is kept until the file
+        changes again.
+
+        Returns
+        -------
+        LookupIndex
+            The index of the last content of the output file that could be loaded.
+
+        Raises
+        ------
+        OSError, ValueError, KeyError, TypeError
+            If the output file cannot be loaded and there is no previous index.
+        """
+        try:
+            self.reload()
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            if self._index is None:
+                raise
+            logger.error(
+                f"Reload of {self.file_path} failed, keeping the previous index : {err}"
+            )
+        return self._index
+
+    def reload(self) -> None:
+        """
+        Builds the index of the output file if its size or modification time changed.
+
+        A failed load is not retried until the file changes again.
+
+        Returns
+        -------
+        None
+        """
+        stat = self.file_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._signature:
+            with self._lock:
+                if signature != self._signature:
+                    self._signature = signature
+                    drugs_reconcilation = utils.read_trusted_output(self.file_path)
+                    self._index = LookupIndex(drugs_reconcilation)
+                    logger.info(f"Lookup index loaded from {self.file_path}")
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler of the lookup service.
+
+    Routes
+    ------
+    GET /drug/<atccode or name>, GET /journal/<name>, GET /top?k=<k>,
+    POST /batch with a JSON list of queries (see `LookupIndex.query`).
+    A malformed request (non-integer k, missing Content-Length, invalid JSON, query
+    without its key) is answered with a 400 error.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Answers the drug, journal and top-k queries."""
+        url = urllib.parse.urlsplit(self.path)
+        route, _, key = url.path.strip("/").partition("/")
+        key = urllib.parse.unquote(key)
+        index = self.server.service.index()
+        if route == "drug":
+            record = index.drug(key)
+            self.send_json(record, found=record is not None)
+        elif route == "journal":
+            self.send_json(index.journal(key))
+        elif route == "top":
+            try:
+                k = int(urllib.parse.parse_qs(url.query).get("k", ["10"])[0])
+            except ValueError as err:
+                self.send_error(400, f"Invalid k : {err}")
+                return
+            self.send_json(index.top(k))
+        else:
+            self.send_json(None, found=False)
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Answers a batch of queries."""
+        if self.path.rstrip("/") != "/batch":
+            self.send_json(None, found=False)
+            return
+
+        index = self.server.service.index()
+        try:
+            queries = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            answers = [index.query(query) for query in queries]
+        except (TypeError, ValueError, KeyError, AttributeError) as err:
+            self.send_error(400, f"Invalid batch : {err!r}")
+            return
+        self.send_json(answers)
+
+    def send_json(self, data: t.Any, found: bool = True) -> None:
+        """
+        Sends a JSON response.
+
+        Parameters
+        ----------
+        data : Any
+            The body of the response.
+        found : bool, optional
+            If False, the status is 404. Default is True.
+        """
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(200 if found else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:  # pylint: disable=redefined-builtin
+        logger.debug(format % args)
+
+
+def start_server(
+    file_path: Path, host: str = config.SERVICE_HOST, port: int = config.SERVICE_PORT
+) -> ThreadingHTTPServer:
+    """
+    Starts the lookup service in a background thread.
+
+    Parameters
+    ----------
+    file_path : Path
+        The JSON output of the reconciliation.
+    host : str, optional
+        The address to listen on. Default is `config.SERVICE_HOST`.
+    port : int, optional
+        The port to listen on, 0 for any free port. Default is `config.SERVICE_PORT`.
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        The running server; call `shutdown()` to stop it.
+
+    Examples
+    --------
+    >>> server = start_server(Path("drugs_reconcilation.json"), port=0)
+    >>> server.server_address
+    """
+    server = ThreadingHTTPServer((host, port), LookupHandler)
+    server.service = LookupService(file_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Lookup service listening on {server.server_address}")
+    return server
+
+
+def serve(
+    file_path: Path, host: str = config.SERVICE_HOST, port: int = config.SERVICE_PORT
+) -> None:
+    """
+    Runs the lookup service until interrupted.
+
+    Parameters
+    ----------
+    file_path : Path
+        The JSON output of the reconciliation.
+    host : str, optional
+        The address to listen on. Default is `config.SERVICE_HOST`.
+    port : int, optional
+        The port to listen on. Default is `config.SERVICE_PORT`.
+
+    Returns
+    -------
+    None
+    """
+    server = ThreadingHTTPServer((host, port), LookupHandler)
+    server.service = LookupService(file_path)
+    logger.info(f"Lookup service listening on {server.server_address}")
+    with server:
+        server.serve_forever()
+
+
+def benchmark_lookup_service(
+    file_path: Path, paths: t.List[str], n_requests: int = 1000
+) -> t.Dict[str, float]:
+    """
+    Measures the latency of the lookup service over a local connection.
+
+    Parameters
+    ----------
+    file_path : Path
+        The JSON output of the reconciliation.
+    paths : List[str]
+        The request paths to cycle through (e.g. '/drug/A04AD', '/top?k=3').
+    n_requests : int, optional
+        The number of requests sent. Default is 1000.
+
+    Returns
+    -------
+    Dict[str, float]
+        The p50 and p99 latencies in milliseconds, and the throughput in requests per second.
+
+    Examples
+    --------
+    >>> benchmark_lookup_service(Path("drugs_reconcilation.json"), ["/drug/A04AD", "/top?k=3"])
+    """
+    server = start_server(file_path, port=0)
+    connection = http.client.HTTPConnection(*server.server_address)
+    latencies = []
+    try:
+        for position in range(n_requests):
+            start = time.perf_counter()
+            connection.request("GET", paths[position % len(paths)])
+            connection.getresponse().read()
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        connection.close()
+        server.shutdown()
+        server.server_close()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    report = {
+        "p50_ms": quantiles[49],
+        "p99_ms": quantiles[98],
+        "requests_per_second": n_requests / (sum(latencies) / 1000),
+    }
+    logger.info(f"Lookup service benchmark : {report}")
+    return report
@@ -0,0 +1,420 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import typing as t
+from pathlib import Path
+
+from loguru import logger
+from pydantic import BaseModel
+
+from app.cache import cache
+from app.config import config
+from app.schema import interning
+
+SNAPSHOT_MAGIC = b"SRVSNAP1"
+SNAPSHOT_VERSION = 3
+SNAPSHOT_SUFFIX = ".snap"
+SNAPSHOT_SCHEMAS = {"pubmed", "clinical_trials", "drugs"}
+
+HEADER_FORMAT = "<8sHHII32s32sI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+INTEGER_SIZE = struct.calcsize("q")
+OFFSET_SIZE = struct.calcsize("I")
+MISSING_VALUE = -(2**63)
+
+FIELD_INTEGER = "i"
+FIELD_STRING = "s"
+
+
+def snapshot_path(snapshot_dir: Path, file_path: Path, type_of_schema: str) -> Path:
+    """
+    Returns the path of the snapshot of a source file.
+
+    Parameters
+    ----------
+    snapshot_dir : Path
+        The folder of the snapshots.
+    file_path : Path
+        The path of the source file.
+    type_of_schema : str
+        Type of schema used for validating the source file's items.
+
+    Returns
+    -------
+    Path
+        The snapshot path, unique per resolved source path and schema.
+    """
+    path_digest = hashlib.sha256(str(file_path.resolve()).encode()).hexdigest()[:16]
+    return (
+        snapshot_dir
+        / f"{file_path.stem}-{path_digest}.{type_of_schema}{SNAPSHOT_SUFFIX}"
+    )
+
+
+def field_types(model: t.Type[BaseModel]) -> t.Dict[str, str]:
+    """
+    Returns the column type of every field of a flat model.
+
+    Parameters
+    ----------
+    model : Type[BaseModel]
+        A model whose fields are integers or strings, optionally None.
+
+    Returns
+    -------
+    Dict[str, str]
+        For each field name, `FIELD_INTEGER` or `FIELD_STRING`.
+    """
+    return {
+        name: FIELD_INTEGER
+        if int in (field.annotation, *t.get_args(field.annotation))
+        else FIELD_STRING
+        for name, field in model.model_fields.items()
+    }
+
+
+def _align(size: int) -> int:
+    return -size % INTEGER_SIZE
+
+
+def build_digest() -> bytes:
+    """
+    Returns the digest of the schemas and of the code that produced a snapshot.
+
+    Returns
+    -------
+    bytes
+        The SHA-256 digest of `cache.schema_digest` and `cache.code_digest`, which changes
+        whenever a model, a validator or a normalizer changes.
+    """
+    return hashlib.sha256(
+        (cache.schema_digest() + cache.code_digest()).encode()
+    ).digest()
+
+
+def encode_columns(
+    valid_items: t.List[BaseModel], types: t.Dict[str, str]
+) -> t.Tuple[t.Dict[str, int], t.Dict[str, t.List[int]]]:
+    """
+    Encodes the fields of the records as int64 columns and a table of distinct strings.
+
+    Parameters
+    ----------
+    valid_items : List[BaseModel]
+        The validated records.
+    types : Dict[str, str]
+        The column type of every field (see `field_types`).
+
+    Returns
+    -------
+    tuple
+        The position of every distinct string, starting with the field names, and the
+        column of every field, where string fields hold positions in the string table.
+    """
+    strings = {name: position for position, name in enumerate(types)}
+    columns = {name: [] for name in types}
+    for item in valid_items:
+        for name, field_type in types.items():
+            value = getattr(item, name)
+            if value is None:
+                value = MISSING_VALUE
+            elif field_type == FIELD_STRING:
+                value = strings.setdefault(value, len(strings))
+            columns[name].append(value)
+    return strings, columns
+
+
+def encode_string_table(strings: t.Iterable[str]) -> bytes:
+    """
+    Encodes the string table: the offsets of the strings, then their UTF-8 bytes.
+
+    Parameters
+    ----------
+    strings : Iterable[str]
+        The distinct strings, in the order of their positions.
+
+    Returns
+    -------
+    bytes
+        The encoded table.
+    """
+    encoded_strings = [string.encode("utf-8") for string in strings]
+    offsets = [0]
+    for encoded_string in encoded_strings:
+        offsets.append(offsets[-1] + len(encoded_string))
+    return struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(encoded_strings)
+
+
+def write_snapshot(
+    file_path: Path,
+    type_of_schema: str,
+    source_digest: str,
+    valid_items: t.List[BaseModel],
+    invalid_items: t.List[t.Any],
+    *,
+    invalid_positions: t.List[int],
+) -> None:
+    """
+    Writes validated records to a binary snapshot.
+
+    The layout is a fixed header, the table of distinct strings (offsets then UTF-8 bytes),
+    one int64 column per field (string fields hold indexes into the string table), and
+    the invalid items with their rows as JSON. Each distinct string is stored once whatever
+    its number of rows.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path of the snapshot, written atomically.
+    type_of_schema : str
+        Type of schema of the records, in `SNAPSHOT_SCHEMAS`.
+    source_digest : str
+        The SHA-256 hexadecimal digest of the source file.
+    valid_items : List[BaseModel]
+        The validated records.
+    invalid_items : List[Any]
+        The items that failed validation.
+    invalid_positions : List[int]
+        The row number (from 1) of each invalid item, to check an error budget on load
+        (see `validation.replay_error_budget`).
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    If a value does not fit its int64 column (e.g. an id of 2**63 or more), no snapshot is
+    written and a warning is logged, so the file is read in full on every run.
+    """
+    types = field_types(config.REFERENCE_SCHEMA[type_of_schema])
+    strings, columns = encode_columns(valid_items, types)
+    string_table = encode_string_table(strings)
+    encoded_invalid = json.dumps(
+        {"positions": invalid_positions, "items": invalid_items}, default=str
+    ).encode("utf-8")
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = file_path.with_suffix(".tmp")
+    try:
+        with temporary_path.open("wb") as file:
+            header = struct.pack(
+                HEADER_FORMAT,
+                SNAPSHOT_MAGIC,
+                SNAPSHOT_VERSION,
+                len(types),
+                len(valid_items),
+                len(strings),
+                bytes.fromhex(source_digest),
+                build_digest(),
+                len(encoded_invalid),
+            )
+            file.write(
+                header + string_table + b"\0" * _align(HEADER_SIZE + len(string_table))
+            )
+            for name in types:
+                file.write(struct.pack(f"<{len(valid_items)}q", *columns[name]))
+            file.write(encoded_invalid)
+    except (struct.error, OverflowError) as err:
+        temporary_path.unlink(missing_ok=True)
+        logger.warning(
+            f"Snapshot {file_path} not written, a value does not fit : {err}"
+        )
+        return
+    os.replace(temporary_path, file_path)
+
+
+def decode_strings(buffer: t.Any, n_strings: int) -> t.Tuple[t.List[str], int]:
+    """
+    Decodes the string table of a snapshot.
+
+    Parameters
+    ----------
+    buffer : Any
+        The content of the snapshot.
+    n_strings : int
+        The number of strings of the table.
+
+    Returns
+    -------
+    tuple
+        The strings, and the position of the first column.
+    """
+    offsets = struct.unpack_from(f"<{n_strings + 1}I", buffer, HEADER_SIZE)
+    strings_start = HEADER_SIZE + (n_strings + 1) * OFFSET_SIZE
+    strings = [
+        str(buffer[strings_start + start : strings_start + end], "utf-8")
+        for start, end in zip(offsets, offsets[1:])
+    ]
+    columns_start = strings_start + offsets[-1]
+    return strings, columns_start + _align(columns_start)
+
+
+def decode_column(
+    buffer: t.Any, start: int, n_records: int, strings: t.List[str], field_type: str
+) -> t.List[t.Any]:
+    """
+    Decodes one int64 column of a snapshot.
+
+    Parameters
+    ----------
+    buffer : Any
+        The content of the snapshot.
+    start : int
+        The position of the column.
+    n_records : int
+        The number of records.
+    strings : List[str]
+        The string table.
+    field_type : str
+        `FIELD_INTEGER` or `FIELD_STRING`.
+
+    Returns
+    -------
+    List[Any]
+        The value of the field for every record.
+    """
+    values = struct.unpack_from(f"<{n_records}q", buffer, start)
+    if field_type == FIELD_INTEGER:
+        return [None if value == MISSING_VALUE else value for value in values]
+    return [None if value == MISSING_VALUE else strings[value] for value in values]
+
+
+def header_matches(
+    header: t.Tuple[t.Any, ...], n_fields: int, source_digest: str
+) -> bool:
+    """
+    Checks that a snapshot header was written by this version, from this source, schemas and code.
+
+    Parameters
+    ----------
+    header : Tuple[Any, ...]
+        The unpacked header (see `HEADER_FORMAT`).
+    n_fields : int
+        The number of fields of the schema.
+    source_digest : str
+        The SHA-256 hexadecimal digest of the current source file.
+
+    Returns
+    -------
+    bool
+        True if the snapshot can be reused.
+    """
+    magic, version, fields, _, _, digest, build, _ = header
+    return (magic, version, fields, digest, build) == (
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        n_fields,
+        bytes.fromhex(source_digest),
+        build_digest(),
+    )
+
+
+def decode_snapshot(
+    buffer: t.Any, type_of_schema: str, source_digest: str
+) -> t.Optional[t.Tuple[t.List[BaseModel], t.List[t.Any], t.List[int]]]:
+    """
+    Decodes the records of a snapshot (see `load_snapshot`).
+
+    Parameters
+    ----------
+    buffer : Any
+        The content of the snapshot.
+    type_of_schema : str
+        Type of schema of the records, in `SNAPSHOT_SCHEMAS`.
+    source_digest : str
+        The SHA-256 hexadecimal digest of the current source file.
+
+    Returns
+    -------
+    tuple or None
+        The validated items, the invalid items and their rows, or None if the snapshot is
+        stale.
+
+    Raises
+    ------
+    struct.error
+        If the snapshot is truncated.
+    KeyError
+        If the invalid items are not stored with their rows.
+    """
+    model = config.REFERENCE_SCHEMA[type_of_schema]
+    types = field_types(model)
+    header = struct.unpack_from(HEADER_FORMAT, buffer)
+    if not header_matches(header, len(types), source_digest):
+        return None
+
+    n_records, n_strings, invalid_size = header[3], header[4], header[7]
+    strings, columns_start = decode_strings(buffer, n_strings)
+    invalid_start = columns_start + len(types) * n_records * INTEGER_SIZE
+    if strings[: len(types)] != list(types) or invalid_start + invalid_size != len(
+        buffer
+    ):
+        return None
+
+    columns = {}
+    for position, (name, field_type) in enumerate(types.items()):
+        columns[name] = decode_column(
+            buffer,
+            columns_start + position * n_records * INTEGER_SIZE,
+            n_records,
+            strings,
+            field_type,
+        )
+        if name in interning.REFERENCE_INTERNER:
+            columns[name] = [
+                interning.intern_value(name, value) for value in columns[name]
+            ]
+
+    invalid = json.loads(bytes(buffer[invalid_start:]))
+    valid_items = [
+        model.model_construct(**dict(zip(columns, values)))
+        for values in zip(*columns.values())
+    ]
+    return valid_items, invalid["items"], invalid["positions"]
+
+
+def load_snapshot(
+    file_path: Path, type_of_schema: str, source_digest: str
+) -> t.Optional[t.Tuple[t.List[BaseModel], t.List[t.Any], t.List[int]]]:
+    """
+    Loads the records of a binary snapshot without validating them.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path of the snapshot.
+    type_of_schema : str
+        Type of schema of the records, in `SNAPSHOT_SCHEMAS`.
+    source_digest : str
+        The SHA-256 hexadecimal digest of the current source file.
+
+    Returns
+    -------
+    tuple or None
+        The validated items and the invalid items, as `utils.read_file` returns them, and
+        the row number of each invalid item, or None if there is no readable snapshot, or if it was written by another version, from another
+        source, or with other schemas or code (see `build_digest`).
+
+    Notes
+    -----
+    Records are built with `model_construct`, which skips validation entirely: the snapshot
+    only ever holds records that were validated when it was written, derived fields included.
+    Journals and dates are interned as validation would have done (see `interning`).
+    """
+    if not file_path.exists():
+        return None
+
+    try:
+        with file_path.open("rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as buffer:
+            items = decode_snapshot(buffer, type_of_schema, source_digest)
+    except (ValueError, IndexError, KeyError, TypeError, struct.error) as err:
+        logger.warning(f"Snapshot {file_path} is unreadable : {err}")
+        return None
+
+    if items is None:
+        logger.info(f"Snapshot {file_path} is stale")
+    return items
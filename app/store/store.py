@@ -0,0 +1,360 @@
+import json
+import os
+import typing as t
+import zlib
+from collections import Counter
+from pathlib import Path
+
+from loguru import logger
+
+from app.config import config
+from app.error import custom_error
+
+INDEX_FILE_NAME = "index.json"
+
+
+def shard_name(atccode: str, n_shards: int) -> str:
+    """
+    Returns the name of the shard holding a drug.
+
+    Parameters
+    ----------
+    atccode : str
+        The ATC code of the drug.
+    n_shards : int
+        The number of shards of the store.
+
+    Returns
+    -------
+    str
+        The name of the shard, stable across processes.
+    """
+    return f"shard-{zlib.crc32(atccode.encode('utf-8')) % n_shards:04d}"
+
+
+def shard_file_name(name: str, generation: int) -> str:
+    """
+    Returns the file name of one version of a shard.
+
+    Each write of a shard goes to a new file, so the shards of the current index are never
+    overwritten before the new index replaces it.
+
+    Parameters
+    ----------
+    name : str
+        The name of the shard, as returned by `shard_name`.
+    generation : int
+        The generation of the store writing the shard.
+
+    Returns
+    -------
+    str
+        The file name of the shard.
+    """
+    return f"{name}.v{generation}.jsonl"
+
+
+def duplicate_atccodes(records: t.List[t.Dict[str, t.Any]]) -> t.List[str]:
+    """
+    Returns the ATC codes held by more than one record.
+
+    Parameters
+    ----------
+    records : List[Dict[str, Any]]
+        The reconciliation records.
+
+    Returns
+    -------
+    List[str]
+        The duplicated ATC codes, sorted.
+    """
+    counts = Counter(record["drug"]["atccode"] for record in records)
+    return sorted(atccode for atccode, count in counts.items() if count > 1)
+
+
+def check_unique(records: t.List[t.Dict[str, t.Any]]) -> None:
+    """
+    Checks that no two records share an ATC code, the key of the index.
+
+    Parameters
+    ----------
+    records : List[Dict[str, Any]]
+        The reconciliation records.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    custom_error.DuplicateRecordError
+        If several records share an ATC code.
+    """
+    duplicates = duplicate_atccodes(records)
+    if duplicates:
+        raise custom_error.DuplicateRecordError(
+            f"Several records share the ATC codes {duplicates}", duplicates
+        )
+
+
+def load_index(store_dir: Path) -> t.Dict[str, t.Any]:
+    """
+    Loads the offset index of a store.
+
+    Parameters
+    ----------
+    store_dir : Path
+        The folder of the store.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The number of shards under 'shards', the generation of the last write under
+        'generation', and under 'records' the location of each drug by ATC code: its 'drug'
+        name, 'shard' name, shard 'file' name, byte 'offset' and 'length'.
+    """
+    with (store_dir / INDEX_FILE_NAME).open("r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def next_generation(store_dir: Path) -> int:
+    """
+    Returns the generation of the next write of a store.
+
+    Parameters
+    ----------
+    store_dir : Path
+        The folder of the store.
+
+    Returns
+    -------
+    int
+        One more than the generation of the current index, or 1 if there is none.
+    """
+    try:
+        return load_index(store_dir).get("generation", 0) + 1
+    except (FileNotFoundError, json.JSONDecodeError):
+        return 1
+
+
+def remove_stale_shards(store_dir: Path, index: t.Dict[str, t.Any]) -> None:
+    """
+    Deletes the shard files the index no longer points to.
+
+    Parameters
+    ----------
+    store_dir : Path
+        The folder of the store.
+    index : Dict[str, Any]
+        The current index, as returned by `load_index`.
+
+    Returns
+    -------
+    None
+    """
+    referenced = {entry["file"] for entry in index["records"].values()}
+    for shard_path in store_dir.glob("shard-*.jsonl"):
+        if shard_path.name not in referenced:
+            shard_path.unlink(missing_ok=True)
+
+
+def write_index(store_dir: Path, index: t.Dict[str, t.Any]) -> None:
+    """
+    Writes the offset index of a store atomically.
+
+    Parameters
+    ----------
+    store_dir : Path
+        The folder of the store.
+    index : Dict[str, Any]
+        The index, as returned by `load_index`.
+
+    Returns
+    -------
+    None
+    """
+    temporary_path = store_dir / f"{INDEX_FILE_NAME}.tmp"
+    with temporary_path.open("w", encoding="utf-8") as file:
+        json.dump(index, file, ensure_ascii=False)
+    os.replace(temporary_path, store_dir / INDEX_FILE_NAME)
+
+
+def write_shard(
+    store_dir: Path, name: str, generation: int, records: t.List[t.Dict[str, t.Any]]
+) -> t.Dict[str, t.Dict[str, t.Any]]:
+    """
+    Writes the records of one shard, one JSON line per drug, and returns their locations.
+
+    Parameters
+    ----------
+    store_dir : Path
+        The folder of the store.
+    name : str
+        The name of the shard.
+    generation : int
+        The generation of the write, which names the new file of the shard.
+    records : List[Dict[str, Any]]
+        The reconciliation records of the shard.
+
+    Returns
+    -------
+    Dict[str, Dict[str, Any]]
+        The index entries of the records, by ATC code.
+    """
+    entries = {}
+    offset = 0
+    file_name = shard_file_name(name, generation)
+    temporary_path = store_dir / f"{file_name}.tmp"
+    with temporary_path.open("wb") as file:
+        for record in records:
+            line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+            file.write(line)
+            entries[record["drug"]["atccode"]] = {
+                "drug": record["drug"]["drug"],
+                "shard": name,
+                "file": file_name,
+                "offset": offset,
+                "length": len(line),
+            }
+            offset += len(line)
+    os.replace(temporary_path, store_dir / file_name)
+    return entries
+
+
+def write_store(
+    records: t.List[t.Dict[str, t.Any]],
+    store_dir: Path,
+    n_shards: int = config.STORE_SHARDS,
+) -> None:
+    """
+    Writes reconciliation records to a sharded store with an offset index.
+
+    Each drug is one JSON line in the shard chosen by its ATC code, and the index maps each
+    ATC code to its shard and byte offset, so one drug is read with a single seek
+    (see `read_record`) and updated by rewriting its shard only (see `update_records`).
+    Shards are written under new file names and the index is replaced last, so a reader
+    sees either the previous store or the new one; the previous shards are deleted after.
+
+    Parameters
+    ----------
+    records : List[Dict[str, Any]]
+        The reconciliation records, as returned by `utils.reconciliation_data`.
+    store_dir : Path
+        The folder of the store, created if needed. Existing shards are replaced.
+    n_shards : int, optional
+        The number of shards. Default is `config.STORE_SHARDS`.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    custom_error.DuplicateRecordError
+        If several records share an ATC code, before anything is written.
+
+    Examples
+    --------
+    >>> write_store(drugs_reconcilation, Path("output/drugs_reconcilation"))
+    """
+    check_unique(records)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    generation = next_generation(store_dir)
+
+    shards = {}
+    for record in records:
+        name = shard_name(record["drug"]["atccode"], n_shards)
+        shards.setdefault(name, []).append(record)
+
+    index = {"shards": n_shards, "generation": generation, "records": {}}
+    for name, shard_records in shards.items():
+        index["records"].update(write_shard(store_dir, name, generation, shard_records))
+    write_index(store_dir, index)
+    remove_stale_shards(store_dir, index)
+
+
+def read_record(
+    store_dir: Path, atccode: str, index: t.Optional[t.Dict[str, t.Any]] = None
+) -> t.Optional[t.Dict[str, t.Any]]:
+    """
+    Reads the record of one drug with a single seek.
+
+    Parameters
+    ----------
+    store_dir : Path
+        The folder of the store.
+    atccode : str
+        The ATC code of the drug.
+    index : Dict[str, Any], optional
+        The index of the store, to avoid loading it at each read. Default is None (loaded).
+
+    Returns
+    -------
+    Dict[str, Any] or None
+        The reconciliation record, or None if the drug is not in the store.
+
+    Examples
+    --------
+    >>> read_record(Path("output/drugs_reconcilation"), "A04AD")
+    """
+    index = index if index is not None else load_index(store_dir)
+    entry = index["records"].get(atccode)
+    if entry is None:
+        return None
+
+    with (store_dir / entry["file"]).open("rb") as file:
+        file.seek(entry["offset"])
+        return json.loads(file.read(entry["length"]))
+
+
+def update_records(store_dir: Path, records: t.List[t.Dict[str, t.Any]]) -> None:
+    """
+    Adds or replaces records, rewriting only the shards holding them.
+
+    The rewritten shards go to new files and the index is replaced last, as in
+    `write_store`.
+
+    Parameters
+    ----------
+    store_dir : Path
+        The folder of the store.
+    records : List[Dict[str, Any]]
+        The new reconciliation records.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    custom_error.DuplicateRecordError
+        If several new records share an ATC code, before anything is written.
+
+    Examples
+    --------
+    >>> update_records(Path("output/drugs_reconcilation"), [record_diphenhydramine])
+    """
+    check_unique(records)
+    index = load_index(store_dir)
+    index["generation"] = index.get("generation", 0) + 1
+    updates = {}
+    for record in records:
+        name = shard_name(record["drug"]["atccode"], index["shards"])
+        updates.setdefault(name, {})[record["drug"]["atccode"]] = record
+
+    for name, shard_updates in updates.items():
+        shard_records = {
+            atccode: read_record(store_dir, atccode, index)
+            for atccode, entry in index["records"].items()
+            if entry["shard"] == name
+        }
+        shard_records.update(shard_updates)
+        index["records"].update(
+            write_shard(
+                store_dir, name, index["generation"], list(shard_records.values())
+            )
+        )
+
+    write_index(store_dir, index)
+    remove_stale_shards(store_dir, index)
+    logger.info(f"Store updated, {len(updates)} shards rewritten")
@@ -1,23 +1,34 @@
+# pylint: disable=too-many-lines
 import csv
+import io
 import json
 import typing as t
+import uuid
 from collections import Counter
+from operator import attrgetter
 from pathlib import Path
 
 import charset_normalizer
 from google.cloud import storage
 from loguru import logger
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel
 
+from app.cache import cache
+from app.compression import compression
 from app.config import config
 from app.error import custom_error
-from app.schema import schema
-
-REFERENCE_EXTENTION_FILE = {".csv": csv.DictReader, ".json": json.load}
+from app.manifest import manifest
+from app.matching import matching
+from app.schema import interning, schema
+from app.snapshot import snapshot
+from app.store import store
+from app.validation import validation
+
+REFERENCE_EXTENTION_FILE = {".csv": csv.reader, ".json": json.load}
 REFERENCE_SAVE_FILE = {".csv": csv.DictReader, ".json": json.load}
 
 
-def check_encoding(file_path: Path):
+def check_encoding(file_path: t.Union[Path, t.BinaryIO]):
     """
     Determines the encoding of a file by examining its contents.
 
@@ -26,8 +37,9 @@ def check_encoding(file_path: Path):
 
     Parameters
     ----------
-    file_path : Path
-        The path to the file whose encoding needs to be determined.
+    file_path : Path or BinaryIO
+        The path to the file whose encoding needs to be determined, or a seekable binary
+        stream, which is rewound after being read.
 
     Returns
     -------
@@ -47,15 +59,24 @@ def check_encoding(file_path: Path):
     The function reads only the first 10000 bytes of the file. This is usually sufficient
     to determine the encoding but may not work correctly for files with mixed encodings
     or unusual character sets.
+
+    Compressed files (see `compression.REFERENCE_COMPRESSION`) are detected on their
+    decompressed bytes.
     """
-    with file_path.open("rb") as file:
-        result = charset_normalizer.detect(file.read(10000))
+    if isinstance(file_path, Path):
+        with compression.open_binary(file_path) as file:
+            result = charset_normalizer.detect(file.read(10000))
+    else:
+        result = charset_normalizer.detect(file_path.read(10000))
+        file_path.seek(0)
 
     encoding = result["encoding"]
     return encoding
 
 
-def json_handler_error_character(file_path: Path, error_position: int) -> json:
+def json_handler_error_character(
+    file_path: t.Union[Path, t.TextIO], error_position: int
+) -> json:
     """
     Handles and corrects a JSON decoding error by removing a problematic character in a JSON file.
 
@@ -65,8 +86,9 @@ def json_handler_error_character(file_path: Path, error_position: int) -> json:
 
     Parameters
     ----------
-    file_path : Path
-        Path of the JSON file to be processed.
+    file_path : Path or TextIO
+        Path of the JSON file to be processed, or the text stream of the file, read from
+        its current position.
     error_position : int
         Position of the problematic character in the file.
 
@@ -88,18 +110,216 @@ def json_handler_error_character(file_path: Path, error_position: int) -> json:
     >>> corrected_json = json_handler_error_character(file_path, error_position)
     >>> print(corrected_json)
     """
-    with file_path.open("r", encoding="utf-8") as file:
-        content_file = file.read()
-        modify_content = (
-            content_file[: error_position - 2] + content_file[error_position:]
-        )
+    if isinstance(file_path, Path):
+        with compression.open_binary(file_path) as file:
+            content_file = file.read().decode("utf-8")
+    else:
+        content_file = file_path.read()
+    modify_content = content_file[: error_position - 2] + content_file[error_position:]
 
     jsonify_modify_content = json.loads(modify_content)
     return jsonify_modify_content
 
 
+def check_extention(file_path: Path) -> None:
+    """
+    Checks that the extention of a file is supported by `read_file`.
+
+    Parameters
+    ----------
+    file_path : Path
+        Path of the file to read.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    custom_error.ExtentionError
+        If the extention of the file, once its compression is removed (see
+        `compression.file_format`), is not in `REFERENCE_EXTENTION_FILE`.
+    """
+    if compression.file_format(file_path)[0] not in REFERENCE_EXTENTION_FILE:
+        message = "Extention of file must be in csv or json"
+        logger.error(message)
+        raise custom_error.ExtentionError(message=message)
+
+
+def iter_csv_fields(
+    reader_file: t.Iterator[t.List[str]],
+    header: t.List[str],
+    model: t.Type[BaseModel],
+) -> t.Iterator[t.Tuple[t.Dict[str, t.Optional[str]], t.List[str]]]:
+    """
+    Maps the rows of a `csv.reader` to the fields of a model, by position.
+
+    The position of every field of the model is resolved once from the header, so each
+    row only costs one small mapping of the model's fields instead of a mapping of the
+    whole row followed by a keyword-argument call.
+
+    Parameters
+    ----------
+    reader_file : Iterator[List[str]]
+        The rows of the file, header excluded.
+    header : List[str]
+        The header of the file.
+    model : Type[BaseModel]
+        The model the rows are validated against.
+
+    Yields
+    ------
+    tuple
+        The values of the model's fields present in the header, and the raw row. Like
+        `csv.DictReader`, missing trailing values are None and blank rows are skipped.
+
+    Examples
+    --------
+    >>> reader_file = csv.reader(file)
+    >>> header = next(reader_file)
+    >>> fields, values = next(iter_csv_fields(reader_file, header, schema.Drugs))
+    """
+    positions = {
+        name: header.index(name) for name in model.model_fields if name in header
+    }
+    for values in reader_file:
+        if not values:
+            continue
+
+        yield {
+            name: values[position] if position < len(values) else None
+            for name, position in positions.items()
+        }, values
+
+
+def iter_file(
+    file_path: Path,
+    type_of_schema: str,
+    error_budget: t.Optional[schema.ErrorBudget] = None,
+) -> t.Iterator[t.Tuple[t.Optional[BaseModel], t.Any]]:
+    """
+    Reads a file and validates its items one at a time.
+
+    Parameters
+    ----------
+    file_path : Path
+        Path of the file to read.
+    type_of_schema : str
+        Type of schema to use for validating the file's items.
+    error_budget : schema.ErrorBudget, optional
+        If given, reading stops as soon as the failures exceed the budget
+        (see `validation.check_error_budget`). Default is None (every item is read).
+
+    Yields
+    ------
+    tuple
+        The validated item and None, or None and the raw item if it failed validation.
+
+    Raises
+    ------
+    custom_error.ExtentionError
+        If the extention of the file is not supported.
+    custom_error.ErrorBudgetExceeded
+        If the failures exceed `error_budget`.
+
+    Examples
+    --------
+    >>> for row_validated, row in iter_file(Path('pubmed.csv'), 'pubmed'):
+    ...     print(row_validated or row)
+
+    Notes
+    -----
+    CSV files are streamed row by row with `csv.reader` (see `iter_csv_fields`); the raw
+    mapping of a row is only built when it fails validation. JSON files are decoded as a
+    whole before their items are validated one at a time.
+
+    Compressed files (e.g. 'pubmed.csv.gz', see `compression.REFERENCE_COMPRESSION`) are
+    decompressed on the fly, without writing the decompressed content to disk.
+    """
+    check_extention(file_path)
+
+    with compression.open_binary(file_path) as file:
+        yield from iter_stream(file, file_path, type_of_schema, error_budget)
+
+
+def iter_stream(
+    file: t.BinaryIO,
+    file_path: Path,
+    type_of_schema: str,
+    error_budget: t.Optional[schema.ErrorBudget] = None,
+) -> t.Iterator[t.Tuple[t.Optional[BaseModel], t.Any]]:
+    """
+    Validates the items of an open binary stream one at a time (see `iter_file`).
+
+    Parameters
+    ----------
+    file : BinaryIO
+        The seekable stream of the decompressed content (see `compression.open_binary`).
+    file_path : Path
+        The path or the name of the file, giving its format and used in the errors.
+    type_of_schema : str
+        Type of schema to use for validating the file's items.
+    error_budget : schema.ErrorBudget, optional
+        The error budget of the file (see `iter_file`). Default is None.
+
+    Yields
+    ------
+    tuple
+        The validated item and None, or None and the raw item if it failed validation.
+    """
+    file_suffix, _ = compression.file_format(file_path)
+    encoding = check_encoding(file)
+    model = config.REFERENCE_SCHEMA[type_of_schema]
+    with io.TextIOWrapper(file, encoding=encoding, newline="") as file_text:
+        header, records = parse_records(file_text, file_suffix, model)
+        yield from validation.validate_records(
+            records, model, header, file_path, error_budget
+        )
+
+
+def parse_records(
+    file_text: t.TextIO, file_suffix: str, model: t.Type[BaseModel]
+) -> t.Tuple[t.Optional[t.List[str]], t.Iterator[t.Tuple[t.Any, t.Any]]]:
+    """
+    Parses the items of a CSV or JSON text stream, before validation.
+
+    Parameters
+    ----------
+    file_text : TextIO
+        The text stream of the file.
+    file_suffix : str
+        The extention of the format of the file, in `REFERENCE_EXTENTION_FILE`.
+    model : Type[BaseModel]
+        The model validating the items.
+
+    Returns
+    -------
+    tuple
+        The header of a CSV file (None for JSON), and an iterator of the fields to validate
+        and the raw row of every item (see `iter_csv_fields`).
+
+    Notes
+    -----
+    In case of a JSON decoding error, `json_handler_error_character` corrects the error.
+    """
+    try:
+        reader_file = REFERENCE_EXTENTION_FILE[file_suffix](file_text)
+    except json.JSONDecodeError as err:
+        logger.error(f"Error message :{err}")
+        file_text.seek(0)
+        reader_file = json_handler_error_character(file_text, err.pos)
+
+    if file_suffix == ".csv":
+        header = next(reader_file, [])
+        return header, iter_csv_fields(reader_file, header, model)
+    return None, ((row, row) for row in reader_file)
+
+
 def read_file(
-    file_path: Path, type_of_schema: str
+    file_path: Path,
+    type_of_schema: str,
+    snapshot_dir: t.Optional[Path] = None,
+    error_budget: t.Optional[schema.ErrorBudget] = None,
 ) -> t.Tuple[t.List[str], t.List[str]]:
     """
     Reads a file and validates its content according to a specified schema.
@@ -114,6 +334,12 @@ def read_file(
         Path of the file to read.
     type_of_schema : str
         Type of schema to use for validating the file's items.
+    snapshot_dir : Path, optional
+        If given, and the schema is in `snapshot.SNAPSHOT_SCHEMAS`, the result of the parse
+        is written to a binary snapshot in this folder, and the next reads of the unchanged
+        file load the snapshot instead of decoding and validating the file. Default is None.
+    error_budget : schema.ErrorBudget, optional
+        If given, reading stops as soon as the failures exceed the budget. Default is None.
 
     Returns
     -------
@@ -121,11 +347,21 @@ def read_file(
         A tuple of two lists: the first containing the validated items, and the second
         containing the items that failed validation.
 
+    Raises
+    ------
+    custom_error.ErrorBudgetExceeded
+        If the failures exceed `error_budget`, with the statistics of the aborted read.
+
     Notes
     -----
     In case of a JSON decoding error, this function uses `json_handler_error_character`
     to correct the error before continuing with reading and validation.
 
+    A snapshot is reused only when the SHA-256 digest of the file matches the one recorded
+    in the snapshot, so any change of the source triggers a full read. The rows that failed
+    validation are kept in the snapshot, so `error_budget` is checked on a snapshot as on
+    a full read (see `validation.replay_error_budget`).
+
     Examples
     --------
     >>> from pathlib import Path
@@ -134,36 +370,110 @@ def read_file(
     >>> valid_items, invalid_items = read_file(file_path, type_of_schema)
     >>> print(f"Valid items: {len(valid_items)}, Invalid items: {len(invalid_items)}")
     """
-    if file_path.suffix not in REFERENCE_EXTENTION_FILE:
-        message = "Extention of file must be in csv or json"
-        logger.error(message)
-        raise custom_error.ExtentionError(message=message)
+    check_extention(file_path)
 
-    valid_items = []
-    invalid_items = []
-
-    encoding = check_encoding(file_path=file_path)
-    with file_path.open(newline="", encoding=encoding) as file:
-        try:
-            reader_file = REFERENCE_EXTENTION_FILE[file_path.suffix](file)
-        except json.JSONDecodeError as err:
-            logger.error(f"Error message :{err}")
-            reader_file = json_handler_error_character(file_path, err.pos)
-
-        for row in reader_file:
-            try:
-                row_validated = config.REFERENCE_SCHEMA[type_of_schema](**row)
-                valid_items.append(row_validated)
-            except ValidationError as err:
-                logger.error(f"Error for one element : {err}")
-                invalid_items.append(row)
+    use_snapshot = (
+        snapshot_dir is not None and type_of_schema in snapshot.SNAPSHOT_SCHEMAS
+    )
+    if use_snapshot:
+        path_snapshot = snapshot.snapshot_path(snapshot_dir, file_path, type_of_schema)
+        source_digest = cache.file_digest(file_path)
+        items = snapshot.load_snapshot(path_snapshot, type_of_schema, source_digest)
+        if items is not None:
+            valid_items, invalid_items, invalid_positions = items
+            if error_budget is not None:
+                validation.replay_error_budget(
+                    error_budget,
+                    file_path,
+                    len(valid_items) + len(invalid_items),
+                    invalid_positions,
+                )
+            return valid_items, invalid_items
+
+    valid_items, invalid_items, invalid_positions = validation.split_positions(
+        iter_file(file_path, type_of_schema, error_budget)
+    )
+
+    if use_snapshot:
+        snapshot.write_snapshot(
+            path_snapshot,
+            type_of_schema,
+            source_digest,
+            valid_items,
+            invalid_items,
+            invalid_positions=invalid_positions,
+        )
     return valid_items, invalid_items
 
 
+def drug_mentions(
+    drug: schema.Drugs,
+    elements_pubmed: t.List[schema.PubMed],
+    elements_clinical_trials: t.List[schema.ClinicalTrials],
+    titles_fuzzy: t.AbstractSet[str] = frozenset(),
+) -> t.List[schema.Mention]:
+    """
+    Collects every dated mention of a drug in PubMed and ClinicalTrials titles, sorted by date.
+
+    Parameters
+    ----------
+    drug : schema.Drugs
+        The drug information object.
+    elements_pubmed : List[schema.PubMed]
+        A list of PubMed data entries.
+    elements_clinical_trials : List[schema.ClinicalTrials]
+        A list of ClinicalTrials data entries.
+    titles_fuzzy : AbstractSet[str], optional
+        Normalized titles matched by fuzzy matching (see `matching.fuzzy_titles`), counted
+        as mentions in addition to the exact matches. Default is empty.
+
+    Returns
+    -------
+    List[schema.Mention]
+        The mentions of the drug sorted by `date_ordinal`.
+
+    Examples
+    --------
+    >>> mentions = drug_mentions(drug, elements_pubmed, elements_clinical_trials)
+    >>> [mention.id for mention in mentions]
+    """
+    mentions_pubmed = [
+        schema.Mention(
+            source="pubmed",
+            id=element_pubmed.id,
+            date_ordinal=element_pubmed.date_ordinal,
+            journal=element_pubmed.journal,
+        )
+        for element_pubmed in elements_pubmed
+        if drug.drug_normalized in element_pubmed.title_normalized
+        or element_pubmed.title_normalized in titles_fuzzy
+    ]
+
+    mentions_clinical_trials = [
+        schema.Mention(
+            source="clinical_trials",
+            id=element_clinical_trials.id,
+            date_ordinal=element_clinical_trials.date_ordinal,
+            journal=element_clinical_trials.journal,
+        )
+        for element_clinical_trials in elements_clinical_trials
+        if drug.drug_normalized in element_clinical_trials.scientific_title_normalized
+        or element_clinical_trials.scientific_title_normalized in titles_fuzzy
+    ]
+
+    return sorted(
+        mentions_pubmed + mentions_clinical_trials, key=attrgetter("date_ordinal")
+    )
+
+
 def reconciliation_data(
     drug: schema.Drugs,
     elements_pubmed: t.List[schema.PubMed],
     elements_clinical_trials: t.List[schema.ClinicalTrials],
+    *,
+    with_mentions: bool = False,
+    trigram_index: t.Optional[matching.TrigramIndex] = None,
+    max_distance: int = matching.DEFAULT_MAX_DISTANCE,
 ) -> json:
     """
     Performs data reconciliation between drug information and publications from PubMed and ClinicalTrials.
@@ -181,6 +491,15 @@ def reconciliation_data(
         A list of PubMed data entries.
     elements_clinical_trials : List[schema.ClinicalTrials]
         A list of ClinicalTrials data entries.
+    with_mentions : bool, optional
+        If True, also keeps the mentions of the drug sorted by date (see `drug_mentions`),
+        which `build_mention_index` uses to answer date-range queries. Default is False.
+    trigram_index : matching.TrigramIndex, optional
+        If given, titles containing a token within `max_distance` edits of the drug name
+        also count as mentions (see `matching.fuzzy_titles`). The index is built once with
+        `matching.build_trigram_index` and shared by every drug. Default is None (exact matching).
+    max_distance : int, optional
+        The maximum edit distance of fuzzy matching. Default is `matching.DEFAULT_MAX_DISTANCE`.
 
     Returns
     -------
@@ -198,30 +517,41 @@ def reconciliation_data(
     Notes
     -----
     The function expects that the `title` attribute in PubMed entries and `scientific_title` in ClinicalTrials
-    entries are present. It performs a case-insensitive search for the drug's name in these titles.
+    entries are present. It performs a case-insensitive search for the drug's name in these titles, using
+    the normalized forms computed once at validation time.
     """
+    titles_fuzzy = (
+        matching.fuzzy_titles(trigram_index, drug.drug_normalized, max_distance)
+        if trigram_index is not None
+        else set()
+    )
+
     elements_pubmed_filtred_id = {
         element_pubmed.id
         for element_pubmed in elements_pubmed
-        if drug.drug.lower() in element_pubmed.title.lower()
+        if drug.drug_normalized in element_pubmed.title_normalized
+        or element_pubmed.title_normalized in titles_fuzzy
     }
 
     elements_clinical_trials_filtred_id = {
         element_clinical_trials.id
         for element_clinical_trials in elements_clinical_trials
-        if drug.drug.lower() in element_clinical_trials.scientific_title.lower()
+        if drug.drug_normalized in element_clinical_trials.scientific_title_normalized
+        or element_clinical_trials.scientific_title_normalized in titles_fuzzy
     }
 
     elements_journals_from_pubmed = {
         element_journal.journal
         for element_journal in elements_pubmed
-        if drug.drug.lower() in element_journal.title.lower()
+        if drug.drug_normalized in element_journal.title_normalized
+        or element_journal.title_normalized in titles_fuzzy
     }
 
     elements_journals_from_clinical_trial = {
         element_journal.journal
         for element_journal in elements_clinical_trials
-        if drug.drug.lower() in element_journal.scientific_title.lower()
+        if drug.drug_normalized in element_journal.scientific_title_normalized
+        or element_journal.scientific_title_normalized in titles_fuzzy
     }
 
     elements_journals = (
@@ -233,9 +563,14 @@ def reconciliation_data(
         pubmed=elements_pubmed_filtred_id,
         clinical_trials=elements_clinical_trials_filtred_id,
         journals=elements_journals,
+        mentions=(
+            drug_mentions(drug, elements_pubmed, elements_clinical_trials, titles_fuzzy)
+            if with_mentions
+            else None
+        ),
     )
 
-    return drug_reconciliation.model_dump()
+    return drug_reconciliation.model_dump(exclude_none=True)
 
 
 def save_json(data, file_path: Path):
@@ -271,7 +606,35 @@ def save_json(data, file_path: Path):
         json.dump(data, file, ensure_ascii=False, indent=4)
 
 
-def save_file(data, file_path: Path, returned_format: str = "json") -> None:
+def standardize_data(data) -> t.List[t.Any]:
+    """
+    Converts the instances of BaseModel of a list into dictionaries (see `save_file`).
+
+    Parameters
+    ----------
+    data : list
+        A list of data, including instances of BaseModel.
+
+    Returns
+    -------
+    List[Any]
+        The data, with every instance of BaseModel replaced by its `model_dump()`.
+    """
+    data_standardized = []
+    for element in data:
+        if isinstance(element, BaseModel):
+            element = element.model_dump()
+        data_standardized.append(element)
+    return data_standardized
+
+
+def save_file(
+    data,
+    file_path: Path,
+    returned_format: str = "json",
+    *,
+    type_of_schema: t.Optional[str] = None,
+) -> None:
     """
     Save given data to a specified file in a specified format.
 
@@ -287,8 +650,13 @@ def save_file(data, file_path: Path, returned_format: str = "json") -> None:
     file_path : Path
         The file path where the data should be saved. Should be a Path object from pathlib.
     returned_format : str, optional
-        The file format for saving the data. Currently supported options are limited to 'json'.
-        Default is 'json'.
+        The file format for saving the data: 'json' for one JSON array, or 'store' for a
+        sharded store of reconciliation records with an offset index, in which case
+        `file_path` is the folder of the store (see `store.write_store`). Default is 'json'.
+    type_of_schema : str, optional
+        The type of schema of the records, a key of `config.REFERENCE_SCHEMA`. If given, a
+        JSON file is written with a manifest of its digest and schema (see `manifest`), which
+        lets `read_trusted_output` load it back without validation. Default is None.
 
     Returns
     -------
@@ -305,14 +673,14 @@ def save_file(data, file_path: Path, returned_format: str = "json") -> None:
     standardization before saving. Ensure that this method is properly defined in
     the BaseModel definition.
     """
-    data_standardized = []
-    for element in data:
-        if isinstance(element, BaseModel):
-            element = element.model_dump()
-        data_standardized.append(element)
+    data_standardized = standardize_data(data)
 
     if returned_format == "json":
         save_json(data_standardized, file_path)
+        if type_of_schema is not None:
+            manifest.write_manifest(file_path, type_of_schema)
+    elif returned_format == "store":
+        store.write_store(data_standardized, file_path)
 
 
 def upload_blob(bucket_name: str, local_file_name: str, gcs_file_name: str) -> None:
@@ -381,34 +749,166 @@ def download_blob(bucket_name: str, local_file_name: str, gcs_file_name: str) ->
     blob.download_to_filename(local_file_name)
 
 
-REFERENCE_GCS = {"push": upload_blob, "pull": download_blob}
+def read_blob(
+    bucket_name: str,
+    gcs_file_name: str,
+    type_of_schema: str,
+    error_budget: t.Optional[schema.ErrorBudget] = None,
+) -> t.Tuple[t.List[BaseModel], t.List[t.Any]]:
+    """
+    Reads a blob of Google Cloud Storage and validates its content, like `read_file`.
+
+    Parameters
+    ----------
+    bucket_name : str
+        The name of the Google Cloud Storage bucket.
+    gcs_file_name : str
+        The source blob name in the bucket; its extention gives the format and the
+        compression (e.g. 'input/pubmed.json.gz').
+    type_of_schema : str
+        Type of schema to use for validating the blob's items.
+    error_budget : schema.ErrorBudget, optional
+        The error budget of the blob (see `iter_file`). Default is None.
+
+    Returns
+    -------
+    tuple
+        A tuple of two lists: the validated items and the items that failed validation.
+
+    Examples
+    --------
+    >>> valid_items, invalid_items = read_blob("my-bucket", "input/pubmed.csv.gz", "pubmed")
+
+    Notes
+    -----
+    The blob is downloaded in chunks and decompressed while it is parsed, so neither the
+    compressed nor the decompressed content is written to disk.
+    """
+    check_extention(Path(gcs_file_name))
+
+    storage_client = storage.Client()
+    bucket = storage_client.bucket(bucket_name)
+    blob = bucket.blob(gcs_file_name)
+    with blob.open("rb") as blob_file, compression.open_binary(
+        blob_file, gcs_file_name
+    ) as file:
+        return validation.split_items(
+            iter_stream(file, Path(gcs_file_name), type_of_schema, error_budget)
+        )
 
 
-def gcs_handler_blob(type_of_operation: str, *args, **kwargs) -> None:
+def encode_json(data, file: t.BinaryIO, file_name: str) -> None:
     """
-    Handle blob operations (upload or download) for Google Cloud Storage.
+    Writes data as JSON, like `save_file`, into a binary stream left open.
+
+    Parameters
+    ----------
+    data : list
+        A list of data to be saved, including instances of BaseModel.
+    file : BinaryIO
+        The stream written to.
+    file_name : str
+        The name giving the compression of the content (see `compression.file_format`).
 
-    This function serves as a centralized handler to perform either upload or download operations
-    on Google Cloud Storage, based on the specified operation type. It utilizes a mapping dictionary
-    'REFERENCE_GCS' to call the appropriate function ('upload_blob' or 'download_blob').
+    Returns
+    -------
+    None
+    """
+    compressed_file = compression.open_binary(file, file_name, "wb")
+    file_text = io.TextIOWrapper(compressed_file, encoding="utf-8")
+    json.dump(standardize_data(data), file_text, ensure_ascii=False, indent=4)
+    file_text.flush()
+    file_text.detach()
+    if compressed_file is not file:
+        compressed_file.close()
+
+
+def write_blob(
+    data,
+    bucket_name: str,
+    gcs_file_name: str,
+    chunk_size: int = config.GCS_CHUNK_SIZE,
+) -> None:
+    """
+    Saves data as JSON into a blob of Google Cloud Storage, like `save_file`.
+
+    Parameters
+    ----------
+    data : list
+        A list of data to be saved, including instances of BaseModel (see `save_file`).
+    bucket_name : str
+        The name of the Google Cloud Storage bucket.
+    gcs_file_name : str
+        The destination blob name in the bucket. A compression extention (e.g.
+        'output/drugs_reconcilation.json.gz') compresses the content while it is encoded.
+    chunk_size : int, optional
+        The size of the chunks uploaded, a multiple of 256 KiB. Default is `config.GCS_CHUNK_SIZE`.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> write_blob(drugs_reconcilation, "my-bucket", "output/drugs_reconcilation.json")
+
+    Notes
+    -----
+    The content is uploaded in chunks while it is encoded, so at most one chunk is held in
+    memory and nothing is written to disk. It goes to a temporary blob, copied over the
+    destination in the bucket once complete, so an encoding or upload error leaves the
+    previous blob.
+    """
+    storage_client = storage.Client()
+    bucket = storage_client.bucket(bucket_name)
+    temporary_blob = bucket.blob(f"{gcs_file_name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with temporary_blob.open(
+            "wb", chunk_size=chunk_size, ignore_flush=True
+        ) as blob_file:
+            encode_json(data, blob_file, gcs_file_name)
+        bucket.copy_blob(temporary_blob, bucket, gcs_file_name)
+    finally:
+        temporary_blob.delete()
+
+
+REFERENCE_GCS = {
+    "push": upload_blob,
+    "pull": download_blob,
+    "read": read_blob,
+    "write": write_blob,
+}
+
+
+def gcs_handler_blob(type_of_operation: str, *args, **kwargs) -> t.Any:
+    """
+    Handle blob operations for Google Cloud Storage.
+
+    This function serves as a centralized handler to perform operations on Google Cloud
+    Storage, based on the specified operation type. It utilizes a mapping dictionary
+    'REFERENCE_GCS' to call the appropriate function.
 
     Parameters
     ----------
     type_of_operation : str
-        The type of operation to perform. Acceptable values are 'push' for upload and 'pull' for download.
+        The type of operation to perform: 'push' to upload a local file, 'pull' to download
+        a blob to a local file, 'read' to parse a blob as a stream (see `read_blob`) and
+        'write' to save data into a blob (see `write_blob`).
     *args
-        Positional arguments to pass to the chosen upload or download function.
+        Positional arguments to pass to the chosen function.
     **kwargs
-        Keyword arguments to pass to the chosen upload or download function.
+        Keyword arguments to pass to the chosen function.
 
     Returns
     -------
-    None
+    Any
+        The result of the operation: the validated and invalid items for 'read', None otherwise.
 
     Examples
     --------
     >>> gcs_handler_blob("push", "my-bucket", "local/path/to/file.txt", "destination/path/in/bucket.txt")
     >>> gcs_handler_blob("pull", "my-bucket", "local/path/to/save/file.txt", "path/in/bucket/file.txt")
+    >>> valid_items, invalid_items = gcs_handler_blob("read", "my-bucket", "path/in/bucket/pubmed.csv", "pubmed")
 
     Notes
     -----
@@ -419,7 +919,113 @@ def gcs_handler_blob(type_of_operation: str, *args, **kwargs) -> None:
     - Ensure that Google Cloud credentials are properly set up and the specified bucket exists and is accessible.
     - For downloading, the user must have read permissions on the specified blob.
     """
-    REFERENCE_GCS[type_of_operation](*args, **kwargs)
+    return REFERENCE_GCS[type_of_operation](*args, **kwargs)
+
+
+def top_journals(all_journal: t.List[str]) -> t.List[str]:
+    """
+    Returns the journals with the highest number of occurrences.
+
+    Parameters
+    ----------
+    all_journal : List[str]
+        Journal names, one entry per citation.
+
+    Returns
+    -------
+    List[str]
+        The journals cited the most, in order of first appearance.
+        Empty if `all_journal` is empty.
+
+    Examples
+    --------
+    >>> top_journals(["Journal A", "Journal B", "Journal A"])
+    ['Journal A']
+    """
+    counter_occurrences = dict(Counter(all_journal))
+    if not counter_occurrences:
+        return []
+
+    max_occurences = max(counter_occurrences.values())
+
+    return [
+        element
+        for element in counter_occurrences
+        if counter_occurrences[element] == max_occurences
+    ]
+
+
+def write_top_journals(
+    drugs_reconcilation: t.List[t.Dict[str, t.Any]], file_path: Path
+) -> None:
+    """
+    Saves the journals citing the most drugs, as `journal_most_cited` reports them.
+
+    Parameters
+    ----------
+    drugs_reconcilation : List[Dict[str, Any]]
+        The reconciliation records, as saved by `save_file`.
+    file_path : Path
+        The path of the JSON report.
+
+    Returns
+    -------
+    None
+
+    Examples
+    --------
+    >>> write_top_journals(drugs_reconcilation, Path("output/journal_most_cited.json"))
+    """
+    save_json(
+        top_journals(
+            [
+                journal
+                for record in drugs_reconcilation
+                for journal in record["journals"]
+            ]
+        ),
+        file_path,
+    )
+
+
+def read_trusted_output(file_path: Path) -> t.List[t.Dict[str, t.Any]]:
+    """
+    Loads the reconciliation output written by `save_file`, skipping validation when it is trusted.
+
+    Parameters
+    ----------
+    file_path : Path
+        The JSON output of the reconciliation.
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+        The reconciliation records as plain dicts, as `save_file` writes them. No model is
+        built from a trusted file, so no record can skip the validators of the schema.
+
+    Examples
+    --------
+    >>> drugs_reconcilation = read_trusted_output(Path("output/drugs_reconcilation.json"))
+
+    Notes
+    -----
+    The output is trusted when it was saved as reconciliation records (see `save_file`) and
+    its manifest matches its size, SHA-256 digest and schema (see `manifest.read_verified`): the file is then read and decoded once, without charset
+    detection nor validation. Any other file is validated with `read_file`.
+    """
+    content = manifest.read_verified(file_path, "drugs_reconcilation")
+    if content is None:
+        drugs_reconcilation, _ = read_file(
+            file_path=file_path, type_of_schema="drugs_reconcilation"
+        )
+        return standardize_data(drugs_reconcilation)
+
+    drugs_reconcilation = json.loads(content)
+    for record in drugs_reconcilation:
+        record["journals"] = [
+            interning.intern_value("journal", journal) for journal in record["journals"]
+        ]
+    return drugs_reconcilation
 
 
 def journal_most_cited(file_path: Path) -> t.List[str]:
@@ -450,26 +1056,16 @@ def journal_most_cited(file_path: Path) -> t.List[str]:
 
     Notes
     -----
-    This function depends on the `read_file` function for reading and parsing the JSON file.
-    The structure of the JSON file and the schema 'drugs_reconcilation' should be
-    predefined and compatible with the `read_file` function.
+    This function depends on the `read_trusted_output` function for reading and parsing the
+    JSON file: an output written by `save_file` is loaded without validation, any other file
+    is validated against the schema 'drugs_reconcilation' by `read_file`.
     """
 
     all_journal = []
-    top_journal = []
-
-    drugs_reconcilation, _ = read_file(
-        file_path=file_path, type_of_schema="drugs_reconcilation"
-    )
-
-    for element in drugs_reconcilation:
-        all_journal.extend(element.journals)
 
-    counter_occurrences = dict(Counter(all_journal))
-    max_occurences = max(counter_occurrences.values())
+    drugs_reconcilation = read_trusted_output(file_path)
 
-    for element in counter_occurrences:
-        if counter_occurrences[element] == max_occurences:
-            top_journal.append(element)
+    for record in drugs_reconcilation:
+        all_journal.extend(record["journals"])
 
-    return top_journal
+    return top_journals(all_journal)
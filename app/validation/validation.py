@@ -0,0 +1,264 @@
+import typing as t
+from pathlib import Path
+
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+
+from app.error import custom_error
+from app.schema import schema
+
+
+def check_error_budget(
+    error_budget: schema.ErrorBudget,
+    file_path: Path,
+    rows_read: int,
+    invalid_rows: int,
+    consecutive_failures: int,
+    *,
+    end_of_file: bool = False,
+) -> None:
+    """
+    Checks the validation failures of a file against its error budget.
+
+    Parameters
+    ----------
+    error_budget : schema.ErrorBudget
+        The error budget of the file.
+    file_path : Path
+        Path of the file being read.
+    rows_read : int
+        The number of items read so far.
+    invalid_rows : int
+        The number of items that failed validation so far.
+    consecutive_failures : int
+        The number of consecutive items that failed validation, up to the last one read.
+    end_of_file : bool, optional
+        True once every item is read: the invalid ratio is then checked on the whole file,
+        even if it is shorter than the warm-up sample. Default is False.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    custom_error.ErrorBudgetExceeded
+        If the invalid ratio exceeds `max_invalid_ratio` after the warm-up sample or at the
+        end of the file, or if `max_consecutive_failures` items in a row failed validation.
+    """
+    exceeded_ratio = (
+        error_budget.max_invalid_ratio is not None
+        and (rows_read >= error_budget.warmup_rows or end_of_file)
+        and invalid_rows > error_budget.max_invalid_ratio * rows_read
+    )
+    exceeded_consecutive = (
+        error_budget.max_consecutive_failures is not None
+        and consecutive_failures >= error_budget.max_consecutive_failures
+    )
+    if exceeded_ratio or exceeded_consecutive:
+        message = (
+            f"Error budget exceeded for {file_path} : {invalid_rows}/{rows_read} invalid items, "
+            f"{consecutive_failures} consecutive failures"
+        )
+        logger.error(message)
+        raise custom_error.ErrorBudgetExceeded(
+            message=message,
+            file_path=str(file_path),
+            rows_read=rows_read,
+            invalid_rows=invalid_rows,
+            consecutive_failures=consecutive_failures,
+        )
+
+
+def csv_row(header: t.List[str], values: t.List[str]) -> t.Dict[t.Any, t.Any]:
+    """
+    Builds the mapping `csv.DictReader` would have returned for a row.
+
+    Parameters
+    ----------
+    header : List[str]
+        The header of the file.
+    values : List[str]
+        The values of the row.
+
+    Returns
+    -------
+    Dict[Any, Any]
+        The values by column name; missing values are None and extra values are
+        listed under the None key.
+    """
+    row = dict(zip(header, values))
+    for name in header[len(values) :]:
+        row[name] = None
+    if len(values) > len(header):
+        row[None] = values[len(header) :]
+    return row
+
+
+def validate_records(
+    records: t.Iterator[t.Tuple[t.Any, t.Any]],
+    model: t.Type[BaseModel],
+    header: t.Optional[t.List[str]],
+    file_path: Path,
+    error_budget: t.Optional[schema.ErrorBudget] = None,
+) -> t.Iterator[t.Tuple[t.Optional[BaseModel], t.Any]]:
+    """
+    Validates parsed items one at a time, within an error budget.
+
+    Parameters
+    ----------
+    records : Iterator[tuple]
+        The fields to validate and the raw row of every item (see `utils.parse_records`).
+    model : Type[BaseModel]
+        The model validating the items.
+    header : List[str], optional
+        The header of a CSV file, used to build the mapping of an invalid row (see `csv_row`).
+    file_path : Path
+        The path or the name of the file, used in the errors.
+    error_budget : schema.ErrorBudget, optional
+        The error budget of the file (see `check_error_budget`). Default is None.
+
+    Yields
+    ------
+    tuple
+        The validated item and None, or None and the raw item if it failed validation.
+
+    Raises
+    ------
+    custom_error.ErrorBudgetExceeded
+        If the failures exceed `error_budget`, while reading or once the whole file is read.
+    """
+    rows_read = 0
+    invalid_rows = 0
+    consecutive_failures = 0
+    for rows_read, (fields, row) in enumerate(records, start=1):
+        try:
+            row_validated = model.model_validate(fields)
+        except ValidationError as err:
+            logger.error(f"Error for one element : {err}")
+            invalid_rows += 1
+            consecutive_failures += 1
+            if error_budget is not None:
+                check_error_budget(
+                    error_budget,
+                    file_path,
+                    rows_read,
+                    invalid_rows,
+                    consecutive_failures,
+                )
+            yield None, csv_row(header, row) if header is not None else row
+        else:
+            consecutive_failures = 0
+            yield row_validated, None
+
+    if error_budget is not None:
+        check_error_budget(
+            error_budget,
+            file_path,
+            rows_read,
+            invalid_rows,
+            consecutive_failures,
+            end_of_file=True,
+        )
+
+
+def split_positions(
+    items: t.Iterable[t.Tuple[t.Optional[BaseModel], t.Any]]
+) -> t.Tuple[t.List[BaseModel], t.List[t.Any], t.List[int]]:
+    """
+    Splits the items yielded by `utils.iter_file`, keeping the rows of the invalid ones.
+
+    Parameters
+    ----------
+    items : Iterable[tuple]
+        The validated item and None, or None and the raw item, for every item of a file.
+
+    Returns
+    -------
+    tuple
+        The validated items, the items that failed validation, and the row number (from 1)
+        of each item that failed validation.
+    """
+    valid_items = []
+    invalid_items = []
+    invalid_positions = []
+    for position, (row_validated, row) in enumerate(items, start=1):
+        if row_validated is None:
+            invalid_items.append(row)
+            invalid_positions.append(position)
+        else:
+            valid_items.append(row_validated)
+    return valid_items, invalid_items, invalid_positions
+
+
+def split_items(
+    items: t.Iterable[t.Tuple[t.Optional[BaseModel], t.Any]]
+) -> t.Tuple[t.List[BaseModel], t.List[t.Any]]:
+    """
+    Splits the items yielded by `utils.iter_file` into the validated and the invalid ones.
+
+    Parameters
+    ----------
+    items : Iterable[tuple]
+        The validated item and None, or None and the raw item, for every item of a file.
+
+    Returns
+    -------
+    tuple
+        A tuple of two lists: the validated items and the items that failed validation.
+    """
+    valid_items, invalid_items, _ = split_positions(items)
+    return valid_items, invalid_items
+
+
+def replay_error_budget(
+    error_budget: schema.ErrorBudget,
+    file_path: Path,
+    rows_read: int,
+    invalid_positions: t.List[int],
+) -> None:
+    """
+    Checks a file read earlier against an error budget, from the rows that failed validation.
+
+    The checks of `validate_records` are run again at the same rows, so a file is accepted
+    or rejected exactly as if it was read again.
+
+    Parameters
+    ----------
+    error_budget : schema.ErrorBudget
+        The error budget of the file.
+    file_path : Path
+        Path of the file, used in the errors.
+    rows_read : int
+        The number of items of the file.
+    invalid_positions : List[int]
+        The row number (from 1) of each item that failed validation, in increasing order.
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    custom_error.ErrorBudgetExceeded
+        If the failures exceed `error_budget`.
+    """
+    consecutive_failures = 0
+    previous_position = 0
+    for invalid_rows, position in enumerate(invalid_positions, start=1):
+        consecutive_failures = (
+            consecutive_failures + 1 if position == previous_position + 1 else 1
+        )
+        previous_position = position
+        check_error_budget(
+            error_budget, file_path, position, invalid_rows, consecutive_failures
+        )
+
+    check_error_budget(
+        error_budget,
+        file_path,
+        rows_read,
+        len(invalid_positions),
+        consecutive_failures if previous_position == rows_read else 0,
+        end_of_file=True,
+    )
@@ -0,0 +1,279 @@
+import time
+import typing as t
+from pathlib import Path
+
+from loguru import logger
+
+from app.compression import compression
+from app.config import config
+from app.error import custom_error
+from app.pipeline import pipeline
+from app.utils import utils
+
+
+def classify_input(file_path: Path) -> t.Optional[str]:
+    """
+    Returns the schema of an input file from the start of its name.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path of the input file (e.g. 'pubmed.csv', 'clinical_trials_2020.csv.gz').
+
+    Returns
+    -------
+    str or None
+        The first schema of `config.WATCH_SCHEMAS` the name starts with, or None if the
+        file is not an input of the pipeline.
+    """
+    if compression.file_format(file_path)[0] not in utils.REFERENCE_EXTENTION_FILE:
+        return None
+
+    for type_of_schema in config.WATCH_SCHEMAS:
+        if file_path.name.startswith(type_of_schema):
+            return type_of_schema
+    return None
+
+
+class PipelineWatcher:
+    """
+    Keeps the stages of the pipeline in memory and re-runs only those affected by changed inputs.
+
+    A changed input file is re-ingested alone. Records are re-reconciled for every drug when
+    a publication file changed, and only for new or modified drugs when only drugs changed.
+    The output and the `journal_most_cited` report are then rewritten. A file that cannot be
+    ingested is logged, keeps its previous items, and is retried at the next refresh.
+
+    Attributes
+    ----------
+    input_dir : Path
+        The folder of the input files.
+    output_path : Path
+        The path of the JSON output.
+    report_path : Path
+        The path of the JSON report of the most cited journals.
+    ingested : Dict[Path, Tuple[Tuple[int, int], List[Any]]]
+        The signature (see `scan`) and the validated items of each ingested file.
+    """
+
+    def __init__(
+        self,
+        input_dir: Path,
+        output_path: Path,
+        report_path: Path,
+        snapshot_dir: t.Optional[Path] = None,
+        **kwargs,
+    ):
+        self.input_dir = input_dir
+        self.output_path = output_path
+        self.report_path = report_path
+        self.snapshot_dir = snapshot_dir
+        self.kwargs = kwargs
+        self.ingested = {}
+        self.records = {}
+
+    @property
+    def signatures(self) -> t.Dict[Path, t.Tuple[int, int]]:
+        """
+        Returns the signature of every ingested file, as it was when it was ingested.
+
+        Returns
+        -------
+        Dict[Path, Tuple[int, int]]
+            The signatures, by file path.
+        """
+        return {
+            file_path: signature for file_path, (signature, _) in self.ingested.items()
+        }
+
+    def scan(self) -> t.Dict[Path, t.Tuple[int, int]]:
+        """
+        Returns the modification time and size of every input file.
+
+        Returns
+        -------
+        Dict[Path, Tuple[int, int]]
+            The signature of each input file of the folder.
+        """
+        signatures = {}
+        for file_path in sorted(self.input_dir.iterdir()):
+            if file_path.is_file() and classify_input(file_path):
+                stat = file_path.stat()
+                signatures[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def refresh(self, signatures: t.Dict[Path, t.Tuple[int, int]]) -> t.Set[Path]:
+        """
+        Re-runs the stages affected by the files whose signature changed.
+
+        Parameters
+        ----------
+        signatures : Dict[Path, Tuple[int, int]]
+            The current signatures, as returned by `scan`.
+
+        Returns
+        -------
+        Set[Path]
+            The input files that changed, were added or were removed, and were ingested.
+        """
+        ingested_signatures = self.signatures
+        refreshed = {
+            file_path
+            for file_path in signatures.keys() | ingested_signatures.keys()
+            if signatures.get(file_path) != ingested_signatures.get(file_path)
+            and self.ingest(file_path, signatures.get(file_path))
+        }
+        if not refreshed:
+            return refreshed
+
+        if any(classify_input(file_path) != "drugs" for file_path in refreshed):
+            self.records = {}
+        self.reconcile()
+        logger.info(f"Pipeline refreshed for {len(refreshed)} changed inputs")
+        return refreshed
+
+    def ingest(self, file_path: Path, signature: t.Optional[t.Tuple[int, int]]) -> bool:
+        """
+        Re-ingests one input file, or forgets it if it was removed.
+
+        Parameters
+        ----------
+        file_path : Path
+            The input file.
+        signature : Tuple[int, int] or None
+            The current signature of the file, None if it was removed.
+
+        Returns
+        -------
+        bool
+            False if the file could not be ingested: its previous items and signature are
+            kept, so it is retried at the next refresh.
+        """
+        if signature is None:
+            del self.ingested[file_path]
+            return True
+
+        try:
+            elements = pipeline.ingest(
+                [file_path], classify_input(file_path), self.snapshot_dir
+            )[0]
+        except (OSError, ValueError, custom_error.ExtentionError) as err:
+            logger.error(f"Ingestion of {file_path} failed, will retry : {err}")
+            return False
+        self.ingested[file_path] = (signature, elements)
+        return True
+
+    def elements(self, type_of_schema: str) -> t.List[t.Any]:
+        """
+        Returns the validated items of every ingested file of a schema.
+
+        Parameters
+        ----------
+        type_of_schema : str
+            The schema of the files.
+
+        Returns
+        -------
+        List[Any]
+            The validated items, in the order of the file names.
+        """
+        return [
+            element
+            for file_path, (_, elements) in sorted(self.ingested.items())
+            if classify_input(file_path) == type_of_schema
+            for element in elements
+        ]
+
+    def reconcile(self) -> None:
+        """
+        Reconciles the drugs missing from the records, then saves the output and the report.
+
+        Returns
+        -------
+        None
+        """
+        drugs = self.elements("drugs")
+        missing = [
+            drug for drug in drugs if (drug.atccode, drug.drug) not in self.records
+        ]
+        for drug, record in zip(
+            missing,
+            pipeline.reconcile(
+                missing,
+                self.elements("pubmed"),
+                self.elements("clinical_trials"),
+                **self.kwargs,
+            ),
+        ):
+            self.records[(drug.atccode, drug.drug)] = record
+
+        drugs_reconcilation = [
+            self.records[(drug.atccode, drug.drug)] for drug in drugs
+        ]
+        utils.save_file(
+            drugs_reconcilation, self.output_path, type_of_schema="drugs_reconcilation"
+        )
+        utils.write_top_journals(drugs_reconcilation, self.report_path)
+
+
+def watch(
+    input_dir: Path,
+    output_path: Path,
+    report_path: Path,
+    *,
+    poll_interval: float = config.WATCH_POLL_INTERVAL,
+    debounce: float = config.WATCH_DEBOUNCE,
+    max_iterations: t.Optional[int] = None,
+    **kwargs,
+) -> PipelineWatcher:
+    """
+    Polls the input folder and refreshes the pipeline when inputs change.
+
+    A burst of writes is handled once: the refresh only runs when the inputs stayed
+    unchanged for `debounce` seconds.
+
+    Parameters
+    ----------
+    input_dir : Path
+        The folder of the input files.
+    output_path : Path
+        The path of the JSON output.
+    report_path : Path
+        The path of the JSON report of the most cited journals.
+    poll_interval : float, optional
+        The number of seconds between two polls. Default is `config.WATCH_POLL_INTERVAL`.
+    debounce : float, optional
+        The number of seconds the inputs must stay unchanged. Default is `config.WATCH_DEBOUNCE`.
+    max_iterations : int, optional
+        The number of polls before returning. Default is None (runs until interrupted).
+    **kwargs
+        Keyword arguments passed to `PipelineWatcher` (e.g. `snapshot_dir`, `with_mentions`).
+
+    Returns
+    -------
+    PipelineWatcher
+        The watcher, once `max_iterations` polls are done.
+
+    Examples
+    --------
+    >>> watch(Path("file"), Path("output/drugs_reconcilation.json"), Path("output/journal_most_cited.json"))
+    """
+    watcher = PipelineWatcher(input_dir, output_path, report_path, **kwargs)
+    last_signatures = None
+    last_change = time.monotonic()
+    iteration = 0
+    while max_iterations is None or iteration < max_iterations:
+        signatures = watcher.scan()
+        if signatures != last_signatures:
+            last_signatures = signatures
+            last_change = time.monotonic()
+        elif (
+            signatures != watcher.signatures
+            and time.monotonic() - last_change >= debounce
+        ):
+            watcher.refresh(signatures)
+
+        iteration += 1
+        time.sleep(poll_interval)
+
+    return watcher
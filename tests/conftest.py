@@ -1,8 +1,77 @@
+import io
 from pathlib import Path
 
 import pytest
+from google.cloud import storage
 
 from app.schema import schema
+from app.utils import utils
+
+
+class FakeBlob:
+    def __init__(self, blobs, name, chunk_size=None):
+        self.blobs = blobs
+        self.name = name
+        self.chunk_size = chunk_size
+
+    def open(self, mode="rb", chunk_size=None, ignore_flush=False):
+        if mode == "wb":
+            return FakeBlobWriter(self, ignore_flush)
+        return io.BytesIO(self.blobs[self.name])
+
+    def upload_from_file(self, file_obj, rewind=False):
+        if rewind:
+            file_obj.seek(0)
+        self.blobs[self.name] = file_obj.read()
+
+    def delete(self):
+        del self.blobs[self.name]
+
+    def upload_from_filename(self, file_name):
+        self.blobs[self.name] = Path(file_name).read_bytes()
+
+    def download_to_filename(self, file_name):
+        Path(file_name).write_bytes(self.blobs[self.name])
+
+
+class FakeBlobWriter(io.BytesIO):
+    """Finalizes the upload on close only, like `google.cloud.storage.fileio.BlobWriter`."""
+
+    def __init__(self, blob, ignore_flush):
+        super().__init__()
+        self.blob = blob
+        self.ignore_flush = ignore_flush
+
+    def flush(self):
+        if not self.ignore_flush:
+            raise io.UnsupportedOperation("Cannot flush without finalizing upload")
+
+    def close(self):
+        if not self.closed:
+            self.blob.blobs[self.blob.name] = self.getvalue()
+        super().close()
+
+
+class FakeBucket:
+    def __init__(self, blobs):
+        self.blobs = blobs
+
+    def blob(self, name, chunk_size=None):
+        return FakeBlob(self.blobs, name, chunk_size)
+
+    def copy_blob(self, blob, destination_bucket, new_name):
+        destination_bucket.blobs[new_name] = self.blobs[blob.name]
+
+
+@pytest.fixture
+def fake_storage(mocker):
+    """Replaces the Google Cloud Storage client with buckets held in memory."""
+    buckets = {}
+    client = mocker.patch.object(storage, "Client")
+    client.return_value.bucket.side_effect = lambda name: FakeBucket(
+        buckets.setdefault(name, {})
+    )
+    return buckets
 
 
 @pytest.fixture
@@ -0,0 +1,109 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.cache import cache
+from app.pipeline import pipeline
+from app.schema import schema
+
+
+def test_cache_key_changes_with_inputs(tmp_path, path_file_drugs):
+    path_copy = tmp_path / "drugs.csv"
+    path_copy.write_bytes(path_file_drugs.read_bytes())
+    key = cache.cache_key([path_copy])
+
+    assert key == cache.cache_key([path_file_drugs])
+    assert key != cache.cache_key([path_copy], with_mentions=True)
+
+    path_copy.write_text("atccode,drug\nA04AD,DIPHENHYDRAMINE\n")
+    assert key != cache.cache_key([path_copy])
+
+
+def test_cache_key_canonical_parameters(path_file_drugs):
+    titles = {f"title {position}" for position in range(100)}
+    key = cache.cache_key([path_file_drugs], titles=titles)
+
+    assert key == cache.cache_key([path_file_drugs], titles=set(sorted(titles)))
+    assert key != cache.cache_key([path_file_drugs], titles=titles - {"title 0"})
+    with pytest.raises(TypeError):
+        cache.cache_key([path_file_drugs], callback=print)
+
+
+def test_cache_key_stable_across_processes(path_file_drugs):
+    code = (
+        "import sys; from pathlib import Path; from app.cache import cache; "
+        "print(cache.cache_key([Path(sys.argv[1])], titles={'a', 'b', 'c', 'd'}))"
+    )
+    keys = {
+        subprocess.run(
+            [sys.executable, "-c", code, str(path_file_drugs)],
+            env={**os.environ, "PYTHONHASHSEED": str(seed)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        for seed in range(4)
+    }
+
+    assert len(keys) == 1
+
+
+def test_store_entry_evicts_least_recently_used(tmp_path):
+    for position, key in enumerate(["first", "second", "third"]):
+        cache.store_entry(tmp_path, key, {"position": position}, max_entries=5)
+        entry_path = tmp_path / f"{key}{cache.CACHE_SUFFIX}"
+        os.utime(entry_path, (position, position))
+
+    assert cache.load_entry(tmp_path, "first") == {"position": 0}
+    cache.store_entry(tmp_path, "fourth", {"position": 3}, max_entries=3)
+
+    assert cache.load_entry(tmp_path, "second") is None
+    assert cache.load_entry(tmp_path, "first") == {"position": 0}
+    assert cache.load_entry(tmp_path, "fourth") == {"position": 3}
+
+
+def test_run_pipeline_cache_hit(
+    mocker,
+    tmp_path,
+    path_file_drugs,
+    path_file_pubmed_csv,
+    path_file_pubmed_json,
+    path_file_clinical_trials,
+):
+    output_path = tmp_path / "output" / "drugs_reconcilation.json"
+    arguments = {
+        "path_drugs": path_file_drugs,
+        "paths_pubmed": [path_file_pubmed_csv, path_file_pubmed_json],
+        "paths_clinical_trials": [path_file_clinical_trials],
+        "output_path": output_path,
+        "cache_dir": tmp_path / "cache",
+    }
+    drugs_reconcilation = pipeline.run_pipeline(**arguments)
+    output = output_path.read_bytes()
+    output_path.unlink()
+
+    spy_ingest = mocker.spy(pipeline, "ingest")
+    assert pipeline.run_pipeline(**arguments) == drugs_reconcilation
+    assert spy_ingest.call_count == 0
+    assert output_path.read_bytes() == output
+
+
+def test_run_pipeline_cache_key_error_budget(
+    tmp_path, path_file_drugs, path_file_pubmed_csv, path_file_clinical_trials
+):
+    arguments = {
+        "path_drugs": path_file_drugs,
+        "paths_pubmed": [path_file_pubmed_csv],
+        "paths_clinical_trials": [path_file_clinical_trials],
+        "output_path": tmp_path / "output.json",
+        "cache_dir": tmp_path / "cache",
+    }
+    pipeline.run_pipeline(
+        error_budget=schema.ErrorBudget(max_invalid_ratio=0.0, warmup_rows=1),
+        **arguments,
+    )
+    pipeline.run_pipeline(**arguments)
+
+    assert len(list((tmp_path / "cache").glob(f"*{cache.CACHE_SUFFIX}"))) == 2
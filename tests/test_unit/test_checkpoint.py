@@ -0,0 +1,53 @@
+import pytest
+
+from app.checkpoint import checkpoint
+from app.utils import utils
+
+
+def test_reconcile_with_checkpoint_resume(
+    mocker,
+    tmp_path,
+    read_file_drugs,
+    read_file_pubmed_csv,
+    read_file_clinical_trials,
+):
+    journal_path = tmp_path / "run.jsonl"
+    arguments = {
+        "drugs": read_file_drugs,
+        "elements_pubmed": read_file_pubmed_csv,
+        "elements_clinical_trials": read_file_clinical_trials,
+        "journal_path": journal_path,
+        "run_key": "run",
+        "checkpoint_interval": 2,
+    }
+    expected = checkpoint.reconcile_with_checkpoint(**arguments)
+    journal_path.unlink()
+
+    reconciliation_data = utils.reconciliation_data
+
+    def interrupted(drug, **kwargs):
+        if drug == read_file_drugs[3]:
+            raise KeyboardInterrupt
+        return reconciliation_data(drug=drug, **kwargs)
+
+    mocker.patch("app.utils.utils.reconciliation_data", side_effect=interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        checkpoint.reconcile_with_checkpoint(**arguments)
+    with journal_path.open("a", encoding="utf-8") as file:
+        file.write('{"position": 2, "rec')
+
+    assert sorted(checkpoint.load_journal(journal_path, "run")) == [0, 1]
+
+    spy = mocker.patch(
+        "app.utils.utils.reconciliation_data", side_effect=reconciliation_data
+    )
+    assert checkpoint.reconcile_with_checkpoint(**arguments) == expected
+    assert spy.call_count == len(read_file_drugs) - 2
+
+
+def test_load_journal_other_run(tmp_path):
+    journal_path = tmp_path / "run.jsonl"
+    checkpoint.write_entries(
+        journal_path, [{"run_key": "old"}, {"position": 0, "record": {}}], mode="w"
+    )
+    assert checkpoint.load_journal(journal_path, "new") == {}
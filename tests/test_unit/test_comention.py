@@ -0,0 +1,80 @@
+from itertools import combinations
+
+import pytest
+
+from app.comention import comention
+from app.utils import utils
+
+
+@pytest.fixture
+def drugs_reconcilation(read_file_drugs_reconciliated):
+    return utils.standardize_data(read_file_drugs_reconciliated)
+
+
+def test_build_comention_matrix_same_as_pairwise(drugs_reconcilation):
+    matrix = comention.build_comention_matrix(drugs_reconcilation)
+
+    for first, second in combinations(drugs_reconcilation, 2):
+        first_id = matrix.drugs.index(first["drug"]["drug"])
+        second_id = matrix.drugs.index(second["drug"]["drug"])
+        for source in comention.MATRIX_SOURCES:
+            shared = len(set(first[source]) & set(second[source]))
+            assert matrix.rows[source].get(first_id, {}).get(second_id, 0) == shared
+            assert matrix.rows[source].get(second_id, {}).get(first_id, 0) == shared
+
+
+def test_top_neighbors(drugs_reconcilation):
+    matrix = comention.build_comention_matrix(drugs_reconcilation)
+
+    assert comention.top_neighbors(matrix, "TETRACYCLINE", source="pubmed") == [
+        ("ETHANOL", 1)
+    ]
+    assert comention.top_neighbors(matrix, "TETRACYCLINE", n=1) == [("ETHANOL", 2)]
+    assert comention.top_neighbors(matrix, "ATROPINE") == []
+    assert comention.top_neighbors(matrix, "UNKNOWN") == []
+
+
+def test_write_and_load_matrix(tmp_path, drugs_reconcilation):
+    matrix = comention.build_comention_matrix(drugs_reconcilation)
+    matrix_path = tmp_path / f"drugs{comention.MATRIX_SUFFIX}"
+
+    comention.write_matrix(matrix, matrix_path)
+
+    assert comention.load_matrix(matrix_path) == matrix
+
+
+def test_load_matrix_bad_file(tmp_path):
+    matrix_path = tmp_path / "drugs.comat"
+    matrix_path.write_bytes(b"\0" * comention.HEADER_SIZE)
+
+    with pytest.raises(ValueError):
+        comention.load_matrix(matrix_path)
+
+
+@pytest.mark.parametrize("size", [0, 4, comention.HEADER_SIZE + 2, -1])
+def test_load_matrix_truncated(tmp_path, drugs_reconcilation, size):
+    matrix_path = tmp_path / "drugs.comat"
+    comention.write_matrix(
+        comention.build_comention_matrix(drugs_reconcilation), matrix_path
+    )
+    matrix_path.write_bytes(matrix_path.read_bytes()[:size])
+
+    with pytest.raises(ValueError):
+        comention.load_matrix(matrix_path)
+
+
+def test_comention_stage(mocker, tmp_path, drugs_reconcilation):
+    file_path = tmp_path / "drugs_reconcilation.json"
+    utils.save_file(
+        drugs_reconcilation,
+        file_path,
+        type_of_schema="drugs_reconcilation",
+    )
+
+    spy_read_file = mocker.spy(utils, "read_file")
+
+    matrix = comention.comention_stage(file_path, tmp_path / "drugs.comat")
+
+    assert spy_read_file.call_count == 0
+    assert matrix == comention.build_comention_matrix(drugs_reconcilation)
+    assert (tmp_path / "drugs.comat").exists()
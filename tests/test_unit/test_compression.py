@@ -0,0 +1,21 @@
+import gzip
+import io
+from pathlib import Path
+
+from app.compression import compression
+
+
+def test_file_format():
+    assert compression.file_format(Path("pubmed.csv")) == (".csv", None)
+    assert compression.file_format("input/pubmed.json.gz") == (".json", ".gz")
+    assert compression.file_format(Path("pubmed.csv.bz2")) == (".csv", ".bz2")
+    assert compression.file_format(Path("pubmed.gz")) == ("", ".gz")
+
+
+def test_open_binary_stream():
+    stream = io.BytesIO(gzip.compress(b"id,title\n"))
+
+    with compression.open_binary(stream, "pubmed.csv.gz") as file:
+        assert file.read() == b"id,title\n"
+    assert not stream.closed
+    assert compression.open_binary(stream, "pubmed.csv") is stream
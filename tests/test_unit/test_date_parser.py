@@ -0,0 +1,46 @@
+import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from app.error import custom_error
+from app.schema import date_parser, schema
+
+
+@pytest.mark.parametrize(
+    "raw_date, expected",
+    [
+        ("01/01/2019", datetime.date(2019, 1, 1)),
+        ("1 January 2020", datetime.date(2020, 1, 1)),
+        ("25/05/2020", datetime.date(2020, 5, 25)),
+        ("27 April 2020", datetime.date(2020, 4, 27)),
+        ("2020-01-01", datetime.date(2020, 1, 1)),
+    ],
+)
+def test_parse_date(raw_date, expected):
+    ordinal = date_parser.parse_date(raw_date)
+    assert ordinal == expected.toordinal()
+    assert date_parser.ordinal_to_date(ordinal) == expected
+
+
+def test_parse_date_memoized():
+    date_parser.parse_date.cache_clear()
+    date_parser.parse_date("01/03/2020")
+    date_parser.parse_date("01/03/2020")
+    assert date_parser.parse_date.cache_info().hits == 1
+
+
+def test_parse_date_unknown_format():
+    with pytest.raises(custom_error.DateFormatError, match=r"Unknown date format"):
+        date_parser.parse_date("March the first")
+
+
+def test_schema_rejects_unparseable_date():
+    with pytest.raises(ValidationError):
+        schema.PubMed(id=1, title="title", date="not a date", journal="journal")
+
+
+def test_schema_date_ordinal_not_dumped(read_file_pubmed_csv):
+    element = read_file_pubmed_csv[0]
+    assert element.date_ordinal == datetime.date(2019, 1, 1).toordinal()
+    assert "date_ordinal" not in element.model_dump()
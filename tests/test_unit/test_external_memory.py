@@ -0,0 +1,79 @@
+from app.external_memory import external_memory
+from app.pipeline import pipeline
+from app.schema import schema
+
+
+def test_reconcile_out_of_core(
+    tmp_path,
+    read_file_drugs,
+    path_file_pubmed_csv,
+    path_file_pubmed_json,
+    path_file_clinical_trials,
+):
+    paths_pubmed = [path_file_pubmed_csv, path_file_pubmed_json]
+    paths_clinical_trials = [path_file_clinical_trials]
+    elements_pubmed, _ = pipeline.ingest(paths_pubmed, "pubmed")
+    elements_clinical_trials, _ = pipeline.ingest(
+        paths_clinical_trials, "clinical_trials"
+    )
+    expected = pipeline.reconcile(
+        read_file_drugs, elements_pubmed, elements_clinical_trials, with_mentions=True
+    )
+
+    output = external_memory.reconcile_out_of_core(
+        read_file_drugs,
+        paths_pubmed,
+        paths_clinical_trials,
+        memory_budget=512,
+        spill_dir=tmp_path,
+        with_mentions=True,
+    )
+
+    assert len(output) == len(expected)
+    for record, record_expected in zip(output, expected):
+        assert record["drug"] == record_expected["drug"]
+        assert sorted(record["pubmed"]) == sorted(record_expected["pubmed"])
+        assert sorted(record["clinical_trials"]) == sorted(
+            record_expected["clinical_trials"]
+        )
+        assert sorted(record["journals"]) == sorted(record_expected["journals"])
+        assert [mention["date_ordinal"] for mention in record["mentions"]] == [
+            mention["date_ordinal"] for mention in record_expected["mentions"]
+        ]
+    assert not list(tmp_path.iterdir())
+
+
+def test_spill_run_sorted(tmp_path):
+    run_path = external_memory.spill_run(
+        [(1, "pubmed", 2, 0, "b"), (0, "pubmed", 1, 0, "a")], tmp_path
+    )
+    assert list(external_memory.read_run(run_path)) == [
+        (0, "pubmed", 1, 0, "a"),
+        (1, "pubmed", 2, 0, "b"),
+    ]
+
+
+def test_reconcile_out_of_core_error_budget(
+    path_file_drugs,
+    path_file_pubmed_csv,
+    path_file_pubmed_json,
+    path_file_clinical_trials,
+):
+    arguments = {
+        "path_drugs": path_file_drugs,
+        "paths_pubmed": [path_file_pubmed_csv, path_file_pubmed_json],
+        "paths_clinical_trials": [path_file_clinical_trials],
+        "error_budget": schema.ErrorBudget(max_invalid_ratio=0.0, warmup_rows=1),
+    }
+    in_memory = pipeline.run_stages(**arguments)["reconciliation"]
+    out_of_core = pipeline.run_stages(memory_budget=512, **arguments)["reconciliation"]
+
+    assert [sorted(record["pubmed"]) for record in out_of_core] == [
+        sorted(record["pubmed"]) for record in in_memory
+    ]
+    assert [sorted(record["clinical_trials"]) for record in out_of_core] == [
+        sorted(record["clinical_trials"]) for record in in_memory
+    ]
+    assert [sorted(record["journals"]) for record in out_of_core] == [
+        sorted(record["journals"]) for record in in_memory
+    ]
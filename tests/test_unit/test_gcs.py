@@ -0,0 +1,51 @@
+import gzip
+
+import pytest
+
+from app.utils import utils
+
+
+def test_read_blob_compressed(fake_storage, path_file_pubmed_json):
+    fake_storage["bucket"] = {
+        "input/pubmed.json.gz": gzip.compress(path_file_pubmed_json.read_bytes())
+    }
+
+    assert utils.gcs_handler_blob(
+        "read", "bucket", "input/pubmed.json.gz", "pubmed"
+    ) == utils.read_file(path_file_pubmed_json, "pubmed")
+
+
+@pytest.mark.parametrize("gcs_file_name", ["output/drugs.json", "output/drugs.json.gz"])
+def test_write_blob_same_as_save_file(
+    tmp_path, fake_storage, read_file_drugs_reconciliated, gcs_file_name
+):
+    utils.gcs_handler_blob(
+        "write", read_file_drugs_reconciliated, "bucket", gcs_file_name
+    )
+    utils.save_file(read_file_drugs_reconciliated, tmp_path / "drugs.json")
+
+    assert list(fake_storage["bucket"]) == [gcs_file_name]
+    content = fake_storage["bucket"][gcs_file_name]
+    if gcs_file_name.endswith(".gz"):
+        content = gzip.decompress(content)
+    assert content == (tmp_path / "drugs.json").read_bytes()
+
+
+def test_push_and_pull_blob(tmp_path, fake_storage, path_file_drugs):
+    utils.gcs_handler_blob("push", "bucket", str(path_file_drugs), "input/drugs.csv")
+    utils.gcs_handler_blob(
+        "pull", "bucket", str(tmp_path / "drugs.csv"), "input/drugs.csv"
+    )
+
+    assert (tmp_path / "drugs.csv").read_bytes() == path_file_drugs.read_bytes()
+
+
+def test_write_blob_failure_keeps_previous_blob(fake_storage):
+    fake_storage["bucket"] = {"output/drugs.json": b"previous"}
+
+    with pytest.raises(TypeError):
+        utils.write_blob(
+            [{"drug": "A"}, {"drug": object()}], "bucket", "output/drugs.json"
+        )
+
+    assert fake_storage["bucket"] == {"output/drugs.json": b"previous"}
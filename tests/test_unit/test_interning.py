@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app.schema import interning, schema
+from app.utils import utils
+
+
+def test_interner():
+    journals = interning.Interner()
+    first = "".join(["Journal of ", "emergency nursing"])
+    second = "".join(["Journal of emergency ", "nursing"])
+
+    assert first is not second
+    assert journals.intern(first) is journals.intern(second)
+    assert journals.intern("The Journal of pediatrics") == "The Journal of pediatrics"
+    assert len(journals) == 2
+
+
+def test_read_file_shares_repeated_values(path_file_pubmed_csv):
+    elements_pubmed, _ = utils.read_file(path_file_pubmed_csv, "pubmed")
+
+    assert elements_pubmed[0].journal is elements_pubmed[1].journal
+    assert elements_pubmed[0].date is elements_pubmed[1].date
+
+
+def test_reconciliation_shares_journals(read_file_drugs, read_file_pubmed_csv):
+    output = [
+        schema.DrugsReconcilation(
+            **utils.reconciliation_data(drug, read_file_pubmed_csv, [])
+        )
+        for drug in read_file_drugs[:2]
+    ]
+    journal = "".join(["Psycho", "pharmacology"])
+    (shared,) = [name for name in output[1].journals if name == journal]
+
+    assert shared is interning.intern_value("journal", journal)
+
+
+def test_interner_bounded():
+    journals = interning.Interner(max_values=2)
+    journals.intern("first")
+    journals.intern("second")
+    assert len(journals) == 2
+
+    assert journals.intern("third") == "third"
+    assert len(journals) == 1
+
+
+def test_interner_threads():
+    journals = interning.Interner()
+    names = [f"Journal {position % 50}" for position in range(2000)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        shared = list(executor.map(journals.intern, names))
+
+    assert len(journals) == 50
+    assert all(value == name for value, name in zip(shared, names))
+    assert len({id(value) for value in shared}) == 50
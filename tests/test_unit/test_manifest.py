@@ -0,0 +1,59 @@
+import json
+
+from app.cache import cache
+from app.manifest import manifest
+from app.utils import utils
+
+
+def test_read_verified(tmp_path):
+    file_path = tmp_path / "output.json"
+    file_path.write_text("[]")
+
+    assert manifest.read_verified(file_path, "drugs_reconcilation") is None
+
+    manifest.write_manifest(file_path, "drugs_reconcilation")
+    assert manifest.read_verified(file_path, "drugs_reconcilation") == b"[]"
+
+    file_path.write_text("[1]")
+    assert manifest.read_verified(file_path, "drugs_reconcilation") is None
+
+
+def test_read_verified_other_version(tmp_path):
+    file_path = tmp_path / "output.json"
+    file_path.write_text("[]")
+    manifest.write_manifest(file_path, "drugs_reconcilation")
+    path_manifest = manifest.manifest_path(file_path)
+    content = json.loads(path_manifest.read_text())
+    path_manifest.write_text(json.dumps({**content, "version": 0}))
+
+    assert manifest.read_verified(file_path, "drugs_reconcilation") is None
+
+
+def test_read_verified_other_schema(mocker, tmp_path):
+    file_path = tmp_path / "output.json"
+    file_path.write_text("[]")
+    manifest.write_manifest(file_path, "drugs_reconcilation")
+    mocker.patch.object(cache, "schema_digest", return_value="other")
+
+    assert manifest.read_verified(file_path, "drugs_reconcilation") is None
+
+
+def test_read_verified_other_type_of_schema(tmp_path):
+    file_path = tmp_path / "output.json"
+    file_path.write_text("[]")
+    manifest.write_manifest(file_path, "drugs")
+
+    assert manifest.read_verified(file_path, "drugs_reconcilation") is None
+
+
+def test_save_file_manifest_only_for_schema(tmp_path, read_file_clinical_trials):
+    file_path = tmp_path / "clinical_trials.json"
+    utils.save_file(read_file_clinical_trials, file_path)
+
+    assert not manifest.manifest_path(file_path).exists()
+
+    utils.save_file(
+        read_file_clinical_trials, file_path, type_of_schema="clinical_trials"
+    )
+    assert manifest.load_manifest(file_path, "clinical_trials") is not None
+    assert manifest.read_verified(file_path, "drugs_reconcilation") is None
@@ -0,0 +1,157 @@
+import json
+
+import pytest
+
+from app.error import custom_error
+from app.mapreduce import mapreduce
+from app.pipeline import pipeline
+from app.utils import utils
+
+
+def as_sets(drugs_reconcilation):
+    return [
+        {
+            field: set(value) if field != "drug" else value["atccode"]
+            for field, value in record.items()
+            if field != "mentions"
+        }
+        for record in drugs_reconcilation
+    ]
+
+
+@pytest.fixture
+def job_arguments(
+    path_file_drugs,
+    path_file_pubmed_csv,
+    path_file_pubmed_json,
+    path_file_clinical_trials,
+):
+    return {
+        "path_drugs": path_file_drugs,
+        "paths_pubmed": [path_file_pubmed_csv, path_file_pubmed_json],
+        "paths_clinical_trials": [path_file_clinical_trials],
+    }
+
+
+def test_run_job_same_as_pipeline(tmp_path, job_arguments):
+    expected = pipeline.run_pipeline(
+        output_path=tmp_path / "expected.json", with_mentions=True, **job_arguments
+    )
+
+    drugs_reconcilation = mapreduce.run_job(
+        tmp_path / "job",
+        output_path=tmp_path / "output.json",
+        n_workers=3,
+        report_path=tmp_path / "report.json",
+        with_mentions=True,
+        **job_arguments,
+    )
+
+    assert as_sets(drugs_reconcilation) == as_sets(expected)
+    assert [record["mentions"] for record in drugs_reconcilation] == [
+        record["mentions"] for record in expected
+    ]
+    assert json.loads((tmp_path / "output.json").read_text()) == drugs_reconcilation
+    assert json.loads(
+        (tmp_path / "report.json").read_text()
+    ) == utils.journal_most_cited(tmp_path / "expected.json")
+
+
+def test_workers_share_tasks(tmp_path, job_arguments):
+    work_dir = tmp_path / "job"
+    task_paths = mapreduce.create_job(work_dir, **job_arguments)
+
+    assert mapreduce.claim_task(task_paths[0], "other", lease=60)
+    assert mapreduce.run_worker(work_dir, "first", max_passes=1) == 2
+    assert mapreduce.run_worker(work_dir, "second", max_passes=1) == 0
+    with pytest.raises(custom_error.IncompleteJobError) as err:
+        mapreduce.reduce_job(work_dir, tmp_path / "output.json")
+    assert err.value.missing_tasks == [task_paths[0].stem]
+
+    assert mapreduce.run_worker(work_dir, "second", lease=0) == 1
+    assert len(mapreduce.reduce_job(work_dir, tmp_path / "output.json")) > 0
+
+
+def test_run_worker_waits_for_abandoned_lock(tmp_path, job_arguments):
+    work_dir = tmp_path / "job"
+    task_paths = mapreduce.create_job(work_dir, **job_arguments)
+    assert mapreduce.claim_task(task_paths[0], "other", lease=60)
+
+    assert mapreduce.run_worker(work_dir, "first", lease=0.2, poll_interval=0.05) == 3
+    assert len(mapreduce.reduce_job(work_dir, tmp_path / "output.json")) > 0
+
+
+def test_create_job_separates_jobs(tmp_path, job_arguments):
+    first_task = mapreduce.create_job(tmp_path, **job_arguments)[0]
+    second_task = mapreduce.create_job(tmp_path, **job_arguments)[0]
+
+    assert first_task.name == second_task.name
+    assert first_task.parent != second_task.parent
+
+
+def test_claim_task(tmp_path, job_arguments):
+    task_path = mapreduce.create_job(tmp_path, **job_arguments)[0]
+
+    assert mapreduce.claim_task(task_path, "first", lease=60)
+    assert not mapreduce.claim_task(task_path, "second", lease=60)
+    assert mapreduce.claim_task(task_path, "second", lease=0)
+    assert task_path.with_suffix(mapreduce.LOCK_SUFFIX).read_text() == "second"
+
+
+def test_create_job_ignores_previous_job(
+    tmp_path, job_arguments, path_file_drugs, path_file_pubmed_csv
+):
+    work_dir = tmp_path / "job"
+    mapreduce.create_job(work_dir, **job_arguments)
+    mapreduce.run_worker(work_dir, "first")
+
+    mapreduce.create_job(
+        work_dir,
+        path_drugs=path_file_drugs,
+        paths_pubmed=[path_file_pubmed_csv],
+        paths_clinical_trials=[],
+    )
+    assert mapreduce.run_worker(work_dir, "first") == 1
+
+    expected = pipeline.run_pipeline(
+        path_file_drugs, [path_file_pubmed_csv], [], tmp_path / "expected.json"
+    )
+    assert as_sets(mapreduce.reduce_job(work_dir, tmp_path / "output.json")) == as_sets(
+        expected
+    )
+
+
+def test_release_task_keeps_other_lock(tmp_path, job_arguments):
+    task_path = mapreduce.create_job(tmp_path, **job_arguments)[0]
+    lock_path = task_path.with_suffix(mapreduce.LOCK_SUFFIX)
+    assert mapreduce.claim_task(task_path, "first", lease=60)
+    lock_path.write_text("second")
+
+    mapreduce.release_task(task_path, "first")
+    assert lock_path.read_text() == "second"
+
+    mapreduce.release_task(task_path, "second")
+    assert not lock_path.exists()
+
+
+def test_break_abandoned_lock_renewed_meanwhile(mocker, tmp_path, job_arguments):
+    task_path = mapreduce.create_job(tmp_path, **job_arguments)[0]
+    lock_path = task_path.with_suffix(mapreduce.LOCK_SUFFIX)
+    assert mapreduce.claim_task(task_path, "first", lease=60)
+    mocker.patch.object(
+        mapreduce, "read_lock", side_effect=[("first", 0), ("second", 1)]
+    )
+
+    assert not mapreduce.break_abandoned_lock(lock_path, "third", lease=60)
+    assert lock_path.read_text() == "first"
+    assert list(task_path.parent.glob("*.lock.*")) == []
+
+
+def test_run_job_worker_failure(mocker, tmp_path, job_arguments):
+    mocker.patch.object(mapreduce, "run_worker", side_effect=RuntimeError("crash"))
+
+    with pytest.raises(custom_error.WorkerError) as err:
+        mapreduce.run_job(
+            tmp_path / "job", output_path=tmp_path / "output.json", **job_arguments
+        )
+    assert err.value.exit_codes == [1, 1]
@@ -0,0 +1,66 @@
+import pytest
+
+from app.matching import matching
+from app.schema import schema
+from app.utils import utils
+
+
+@pytest.mark.parametrize(
+    "source, target, expected",
+    [
+        ("ethanol", "ethanol", 0),
+        ("ethanol", "etanol", 1),
+        ("tetracycline", "tetracyclin", 1),
+        ("epinephrine", "epinefrine", 2),
+        ("ethanol", "atropine", 3),
+    ],
+)
+def test_bounded_edit_distance(source, target, expected):
+    assert matching.bounded_edit_distance(source, target, 2) == expected
+
+
+def test_fuzzy_titles():
+    titles = [
+        "use of diphenhydramin as an adjunctive sedative",
+        "tetracycline resistance patterns",
+        "the high cost of epinephrine autoinjectors",
+    ]
+    trigram_index = matching.build_trigram_index(titles)
+
+    assert matching.fuzzy_titles(trigram_index, "diphenhydramine") == {titles[0]}
+    assert matching.fuzzy_titles(trigram_index, "atropine") == set()
+
+
+def test_reconciliation_data_fuzzy(read_file_pubmed_csv, read_file_clinical_trials):
+    drug = schema.Drugs(atccode="A04AD", drug="DIPHENHYDRAMINE")
+    misspelled = schema.PubMed(
+        id=99,
+        title="Diphenhydramin overdose in adults",
+        date="01/01/2019",
+        journal="Journal of emergency nursing",
+    )
+    elements_pubmed = read_file_pubmed_csv + [misspelled]
+    trigram_index = matching.build_trigram_index(
+        element.title_normalized for element in elements_pubmed
+    )
+
+    output_exact = utils.reconciliation_data(
+        drug, elements_pubmed, read_file_clinical_trials
+    )
+    output_fuzzy = utils.reconciliation_data(
+        drug, elements_pubmed, read_file_clinical_trials, trigram_index=trigram_index
+    )
+
+    assert sorted(output_exact["pubmed"]) == [1, 2, 3]
+    assert sorted(output_fuzzy["pubmed"]) == [1, 2, 3, 99]
+
+
+def test_benchmark_fuzzy_matching(
+    read_file_drugs, read_file_pubmed_csv, read_file_clinical_trials
+):
+    report = matching.benchmark_fuzzy_matching(
+        read_file_drugs, read_file_pubmed_csv, read_file_clinical_trials
+    )
+    assert report["exact_recall"] == 1.0
+    assert report["fuzzy_matches"] >= report["exact_matches"]
+    assert report["drugs_per_second"] > 0
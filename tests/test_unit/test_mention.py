@@ -0,0 +1,55 @@
+import datetime
+
+import pytest
+
+from app.error import custom_error
+from app.mention import mention
+from app.utils import utils
+
+
+def test_journal_most_cited_time_window(
+    read_file_drugs,
+    read_file_pubmed_csv,
+    read_file_pubmed_json,
+    read_file_clinical_trials,
+):
+    drugs_reconcilation = [
+        utils.reconciliation_data(
+            drug=drug,
+            elements_pubmed=read_file_pubmed_csv + read_file_pubmed_json,
+            elements_clinical_trials=read_file_clinical_trials,
+            with_mentions=True,
+        )
+        for drug in read_file_drugs
+    ]
+    mention_index = mention.build_mention_index(drugs_reconcilation)
+
+    mentions = mention.mentions_between(
+        mention_index,
+        "A04AD",
+        datetime.date(2019, 1, 1),
+        datetime.date(2019, 12, 31),
+    )
+    assert [mention["id"] for mention in mentions] == [1, 2, 3]
+    assert mention.journal_most_cited_by_year(mention_index) == {
+        2019: ["Journal of emergency nursing", "The Journal of pediatrics"],
+        2020: ["Journal of emergency nursing", "Psychopharmacology"],
+    }
+
+
+def test_build_mention_index_without_mentions(read_file_drugs_reconciliated):
+    with pytest.raises(custom_error.MentionIndexError):
+        mention.build_mention_index(
+            utils.standardize_data(read_file_drugs_reconciliated)
+        )
+
+
+def test_build_mention_index_duplicate_atccode(read_file_drugs_reconciliated):
+    drugs_reconcilation = utils.standardize_data(read_file_drugs_reconciliated[:1])
+    drugs_reconcilation = [
+        {**record, "mentions": []} for record in drugs_reconcilation * 2
+    ]
+
+    with pytest.raises(custom_error.DuplicateRecordError) as err:
+        mention.build_mention_index(drugs_reconcilation)
+    assert err.value.atccodes == [drugs_reconcilation[0]["drug"]["atccode"]]
@@ -0,0 +1,32 @@
+import pytest
+
+from app.schema import normalization, schema
+
+
+@pytest.mark.parametrize(
+    "raw_value, expected",
+    [
+        ("Journal of emergency nursing\\xc3\\x28", "journal of emergency nursing"),
+        ("  Laminoplasty or  \\xc3\\xb1 Laminectomy ", "laminoplasty or laminectomy"),
+        ("Hôpitaux Universitaires de Genève", "hôpitaux universitaires de genève"),
+        ("QUZYTTIR™", "quzyttirtm"),
+        ("DIPHENHYDRAMINE", "diphenhydramine"),
+    ],
+)
+def test_normalize_text(raw_value, expected):
+    assert normalization.normalize_text(raw_value) == expected
+
+
+def test_normalize_text_memoized():
+    normalization.normalize_text.cache_clear()
+    for _ in range(3):
+        normalization.normalize_text("The Journal of pediatrics")
+    assert normalization.normalize_text.cache_info().hits == 2
+
+
+def test_schema_normalized_fields(read_file_clinical_trials, read_file_drugs):
+    element = read_file_clinical_trials[-1]
+    assert element.scientific_title_normalized == element.scientific_title.casefold()
+    assert element.journal_normalized == "journal of emergency nursing"
+    assert read_file_drugs[0].drug_normalized == "diphenhydramine"
+    assert "journal_normalized" not in element.model_dump()
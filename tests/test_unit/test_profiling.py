@@ -0,0 +1,110 @@
+import contextlib
+import pstats
+import time
+import tracemalloc
+
+import pytest
+
+from app.pipeline import pipeline
+from app.profiling import profiling
+
+
+def busy(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+def test_profiler_stacks(tmp_path):
+    with profiling.Profiler(tmp_path, sample_interval=0.001):
+        busy(0.05)
+
+    stacks = (tmp_path / profiling.COLLAPSED_STACKS_FILE).read_text().splitlines()
+    assert any(";test_profiling.busy " in line for line in stacks)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        profiling.COLLAPSED_STACKS_FILE
+    ]
+
+
+def test_profiler_functions(tmp_path):
+    with profiling.Profiler(tmp_path, mode="functions") as profiler:
+        busy(0.01)
+
+    assert profiler.samples == {}
+    assert "busy" in (tmp_path / profiling.HOT_FUNCTIONS_FILE).read_text()
+    assert (tmp_path / profiling.PROFILE_STATS_FILE).exists()
+    assert not (tmp_path / profiling.COLLAPSED_STACKS_FILE).exists()
+
+
+def test_profiler_allocations(tmp_path):
+    with profiling.Profiler(tmp_path, mode="allocations") as profiler:
+        with profiler.stage("allocate"):
+            data = [str(number) for number in range(10000)]
+
+    assert len(data) == 10000
+    allocations = (tmp_path / profiling.ALLOCATIONS_FILE).read_text()
+    assert allocations.startswith("## allocate\n")
+    assert "test_profiling.py" in allocations
+    assert not (tmp_path / profiling.PROFILE_STATS_FILE).exists()
+
+
+def test_profiler_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        profiling.Profiler(tmp_path, mode="everything")
+
+
+def test_profiler_keeps_caller_tracing(tmp_path):
+    tracemalloc.start()
+    try:
+        with profiling.Profiler(tmp_path, mode="allocations") as profiler:
+            with profiler.stage("allocate"):
+                pass
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    with profiling.Profiler(tmp_path, mode="allocations"):
+        pass
+    assert not tracemalloc.is_tracing()
+
+
+def test_stage_without_profiler():
+    assert isinstance(profiling.stage(None, "ingest"), contextlib.nullcontext)
+
+
+def test_run_pipeline_profiled(
+    tmp_path, path_file_drugs, path_file_pubmed_csv, path_file_clinical_trials
+):
+    arguments = {
+        "path_drugs": path_file_drugs,
+        "paths_pubmed": [path_file_pubmed_csv],
+        "paths_clinical_trials": [path_file_clinical_trials],
+    }
+    expected = pipeline.run_pipeline(
+        output_path=tmp_path / "expected.json", **arguments
+    )
+
+    drugs_reconcilation = pipeline.run_pipeline(
+        output_path=tmp_path / "output.json",
+        profiler=profiling.Profiler(tmp_path / "profile", mode="allocations"),
+        **arguments,
+    )
+    pipeline.run_pipeline(
+        output_path=tmp_path / "output.json",
+        profiler=profiling.Profiler(tmp_path / "profile", mode="functions"),
+        **arguments,
+    )
+
+    assert drugs_reconcilation == expected
+    allocations = (tmp_path / "profile" / profiling.ALLOCATIONS_FILE).read_text()
+    stages = [line[3:] for line in allocations.splitlines() if line.startswith("## ")]
+    assert stages == [
+        "ingest_drugs",
+        "ingest_pubmed",
+        "ingest_clinical_trials",
+        "reconcile",
+        "save",
+    ]
+    stats = pstats.Stats(str(tmp_path / "profile" / profiling.PROFILE_STATS_FILE))
+    assert "reconciliation_data" in {function for _, _, function in stats.stats}
@@ -0,0 +1,111 @@
+import http.client
+import json
+import os
+
+import pytest
+
+from app.service import service
+from app.utils import utils
+
+
+@pytest.fixture
+def path_file_drugs_reconciliated(tmp_path, read_file_drugs_reconciliated):
+    file_path = tmp_path / "drugs_reconcilation.json"
+    utils.save_file(
+        read_file_drugs_reconciliated, file_path, type_of_schema="drugs_reconcilation"
+    )
+    return file_path
+
+
+def request(server, method, path, body=None):
+    connection = http.client.HTTPConnection(*server.server_address)
+    connection.request(method, path, body=body)
+    response = connection.getresponse()
+    data = json.loads(response.read())
+    connection.close()
+    return response.status, data
+
+
+def test_lookup_service(path_file_drugs_reconciliated):
+    server = service.start_server(path_file_drugs_reconciliated, port=0)
+    try:
+        status, record = request(server, "GET", "/drug/diphenhydramine")
+        assert status == 200
+        assert record["drug"]["atccode"] == "A04AD"
+        assert request(server, "GET", "/drug/UNKNOWN")[0] == 404
+
+        _, drugs = request(server, "GET", "/journal/Psychopharmacology")
+        assert drugs == ["TETRACYCLINE", "ETHANOL"]
+
+        _, top = request(server, "GET", "/top?k=2")
+        assert top == [
+            ["Journal of emergency nursing", 2],
+            ["Psychopharmacology", 2],
+        ]
+
+        queries = [{"type": "drug", "key": "S03AA"}, {"type": "top", "k": 1}]
+        _, answers = request(server, "POST", "/batch", json.dumps(queries))
+        assert answers[0]["drug"]["drug"] == "TETRACYCLINE"
+        assert len(answers[1]) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_lookup_service_reload(
+    path_file_drugs_reconciliated, read_file_drugs_reconciliated
+):
+    lookup_service = service.LookupService(path_file_drugs_reconciliated)
+    assert lookup_service.index().drug("ATROPINE") is not None
+
+    utils.save_file(
+        read_file_drugs_reconciliated[:1],
+        path_file_drugs_reconciliated,
+        type_of_schema="drugs_reconcilation",
+    )
+    os.utime(path_file_drugs_reconciliated, ns=(0, 0))
+
+    assert lookup_service.index().drug("ATROPINE") is None
+
+
+def test_lookup_service_reload_failure_keeps_index(path_file_drugs_reconciliated):
+    lookup_service = service.LookupService(path_file_drugs_reconciliated)
+    previous_index = lookup_service.index()
+
+    path_file_drugs_reconciliated.write_text('[{"drug": ')
+
+    assert lookup_service.index() is previous_index
+    assert lookup_service.index().drug("ATROPINE") is not None
+
+
+@pytest.mark.parametrize(
+    "method, path, body",
+    [
+        ("GET", "/top?k=abc", None),
+        ("POST", "/batch", None),
+        ("POST", "/batch", b"[{"),
+        ("POST", "/batch", b'[{"type": "drug"}]'),
+    ],
+)
+def test_lookup_service_bad_request(path_file_drugs_reconciliated, method, path, body):
+    server = service.start_server(path_file_drugs_reconciliated, port=0)
+    try:
+        connection = http.client.HTTPConnection(*server.server_address)
+        connection.putrequest(method, path)
+        if body is not None:
+            connection.putheader("Content-Length", str(len(body)))
+        connection.endheaders(body)
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        assert response.status == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_benchmark_lookup_service(path_file_drugs_reconciliated):
+    report = service.benchmark_lookup_service(
+        path_file_drugs_reconciliated, ["/drug/A04AD", "/top?k=3"], n_requests=50
+    )
+    assert 0 < report["p50_ms"] <= report["p99_ms"]
@@ -0,0 +1,107 @@
+import pytest
+
+from app.cache import cache
+from app.error import custom_error
+from app.schema import schema
+from app.snapshot import snapshot
+from app.utils import utils
+
+
+@pytest.mark.parametrize(
+    "fixture_path, type_of_schema",
+    [
+        ("path_file_clinical_trials", "clinical_trials"),
+        ("path_file_pubmed_csv", "pubmed"),
+        ("path_file_pubmed_json", "pubmed"),
+        ("path_file_drugs", "drugs"),
+    ],
+)
+def test_read_file_snapshot_round_trip(
+    request, mocker, tmp_path, fixture_path, type_of_schema
+):
+    file_path = request.getfixturevalue(fixture_path)
+    expected = utils.read_file(file_path, type_of_schema, snapshot_dir=tmp_path)
+    assert list(tmp_path.glob(f"*{snapshot.SNAPSHOT_SUFFIX}"))
+
+    spy_check_encoding = mocker.spy(utils, "check_encoding")
+    valid_items, invalid_items = utils.read_file(
+        file_path, type_of_schema, snapshot_dir=tmp_path
+    )
+
+    assert spy_check_encoding.call_count == 0
+    assert valid_items == expected[0]
+    assert invalid_items == expected[1]
+
+
+def test_load_snapshot_stale(tmp_path, path_file_drugs, read_file_drugs):
+    path_snapshot = snapshot.snapshot_path(tmp_path, path_file_drugs, "drugs")
+    snapshot.write_snapshot(
+        path_snapshot, "drugs", "00" * 32, read_file_drugs, [], invalid_positions=[]
+    )
+
+    digest = cache.file_digest(path_file_drugs)
+    assert snapshot.load_snapshot(path_snapshot, "drugs", digest) is None
+    assert snapshot.load_snapshot(path_snapshot, "drugs", "00" * 32) == (
+        read_file_drugs,
+        [],
+        [],
+    )
+
+
+def test_load_snapshot_other_code(mocker, tmp_path, path_file_drugs, read_file_drugs):
+    path_snapshot = snapshot.snapshot_path(tmp_path, path_file_drugs, "drugs")
+    snapshot.write_snapshot(
+        path_snapshot, "drugs", "00" * 32, read_file_drugs, [], invalid_positions=[]
+    )
+
+    mocker.patch.object(cache, "code_digest", return_value="changed")
+    assert snapshot.load_snapshot(path_snapshot, "drugs", "00" * 32) is None
+
+
+@pytest.mark.parametrize("size", [0, 10, snapshot.HEADER_SIZE + 4, -1])
+def test_read_file_truncated_snapshot(tmp_path, path_file_drugs, size):
+    expected = utils.read_file(path_file_drugs, "drugs", snapshot_dir=tmp_path)
+    path_snapshot = snapshot.snapshot_path(tmp_path, path_file_drugs, "drugs")
+    path_snapshot.write_bytes(path_snapshot.read_bytes()[:size])
+
+    assert utils.read_file(path_file_drugs, "drugs", snapshot_dir=tmp_path) == expected
+
+
+@pytest.mark.parametrize(
+    "error_budget",
+    [
+        schema.ErrorBudget(max_consecutive_failures=3),
+        schema.ErrorBudget(max_invalid_ratio=0.5, warmup_rows=5),
+    ],
+)
+def test_read_file_snapshot_checks_error_budget(tmp_path, error_budget):
+    file_path = tmp_path / "pubmed.csv"
+    rows = "1,title,01/01/2020,journal\n" + "".join(
+        f"{position},title,not a date,journal\n" for position in range(2, 12)
+    )
+    file_path.write_text("id,title,date,journal\n" + rows)
+    snapshot_dir = tmp_path / "snapshots"
+    utils.read_file(file_path, "pubmed", snapshot_dir=snapshot_dir)
+
+    with pytest.raises(custom_error.ErrorBudgetExceeded) as err_snapshot:
+        utils.read_file(
+            file_path, "pubmed", snapshot_dir=snapshot_dir, error_budget=error_budget
+        )
+    with pytest.raises(custom_error.ErrorBudgetExceeded) as err_file:
+        utils.read_file(file_path, "pubmed", error_budget=error_budget)
+
+    assert (err_snapshot.value.rows_read, err_snapshot.value.invalid_rows) == (
+        err_file.value.rows_read,
+        err_file.value.invalid_rows,
+    )
+
+
+def test_read_file_snapshot_skipped_on_overflow(tmp_path):
+    file_path = tmp_path / "pubmed.csv"
+    file_path.write_text(f"id,title,date,journal\n{2**63},title,01/01/2020,journal\n")
+    snapshot_dir = tmp_path / "snapshots"
+
+    valid_items, _ = utils.read_file(file_path, "pubmed", snapshot_dir=snapshot_dir)
+
+    assert [element.id for element in valid_items] == [2**63]
+    assert list(snapshot_dir.iterdir()) == []
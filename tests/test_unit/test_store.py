@@ -0,0 +1,81 @@
+import pytest
+
+from app.error import custom_error
+from app.store import store
+from app.utils import utils
+
+
+def test_store_read_record(tmp_path, read_file_drugs_reconciliated):
+    store_dir = tmp_path / "drugs_reconcilation"
+    utils.save_file(read_file_drugs_reconciliated, store_dir, returned_format="store")
+    index = store.load_index(store_dir)
+
+    for element in read_file_drugs_reconciliated:
+        record = store.read_record(store_dir, element.drug.atccode, index)
+        assert record == element.model_dump()
+    assert store.read_record(store_dir, "unknown", index) is None
+
+
+def test_store_update_records_rewrites_one_shard(
+    tmp_path, read_file_drugs_reconciliated
+):
+    store_dir = tmp_path / "drugs_reconcilation"
+    records = [
+        element.model_dump(exclude_none=True)
+        for element in read_file_drugs_reconciliated
+    ]
+    store.write_store(records, store_dir, n_shards=4)
+    updated = dict(records[0], pubmed=[1, 2, 3, 42])
+    name = store.shard_name(updated["drug"]["atccode"], 4)
+    previous_file = store.load_index(store_dir)["records"][updated["drug"]["atccode"]][
+        "file"
+    ]
+    untouched = {
+        shard_path.name: shard_path.stat().st_mtime_ns
+        for shard_path in store_dir.glob("shard-*.jsonl")
+        if shard_path.name != previous_file
+    }
+
+    store.update_records(store_dir, [updated])
+
+    assert store.read_record(store_dir, updated["drug"]["atccode"]) == updated
+    for record in records[1:]:
+        assert store.read_record(store_dir, record["drug"]["atccode"]) == record
+    assert not (store_dir / previous_file).exists()
+    assert (store_dir / store.shard_file_name(name, 2)).exists()
+    for shard_path in store_dir.glob("shard-*.jsonl"):
+        if not shard_path.name.startswith(name):
+            assert shard_path.stat().st_mtime_ns == untouched[shard_path.name]
+
+
+def test_store_write_keeps_previous_store_until_index_swap(
+    tmp_path, mocker, read_file_drugs_reconciliated
+):
+    store_dir = tmp_path / "drugs_reconcilation"
+    records = [
+        element.model_dump(exclude_none=True)
+        for element in read_file_drugs_reconciliated
+    ]
+    store.write_store(records, store_dir, n_shards=4)
+    mocker.patch.object(store, "write_index", side_effect=OSError("disk full"))
+    changed = [dict(record, pubmed=[42]) for record in records]
+
+    with pytest.raises(OSError):
+        store.write_store(changed, store_dir, n_shards=4)
+
+    for record in records:
+        assert store.read_record(store_dir, record["drug"]["atccode"]) == record
+
+
+def test_store_rejects_duplicate_atccodes(tmp_path, read_file_drugs_reconciliated):
+    store_dir = tmp_path / "drugs_reconcilation"
+    records = [
+        element.model_dump(exclude_none=True)
+        for element in read_file_drugs_reconciliated
+    ]
+
+    with pytest.raises(custom_error.DuplicateRecordError) as err:
+        store.write_store(records + records[:1], store_dir)
+
+    assert err.value.atccodes == [records[0]["drug"]["atccode"]]
+    assert not store_dir.exists()
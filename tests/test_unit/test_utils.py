@@ -1,8 +1,17 @@
+import csv
+import datetime
+import gzip
+import io
 from pathlib import Path
 
 import pytest
+from pydantic import ValidationError
 
 import app
+from app.compression import compression
+from app.config import config
+from app.error import custom_error
+from app.schema import schema
 from app.utils import utils
 
 
@@ -31,3 +40,125 @@ def test_journal_most_cited(mocker, read_file_drugs_reconciliated):
     top_journal = utils.journal_most_cited(file_path_not_exist)
 
     assert top_journal == ["Journal of emergency nursing", "Psychopharmacology"]
+
+
+def test_read_file_error_budget_consecutive(tmp_path):
+    file_path = tmp_path / "pubmed.csv"
+    rows = "".join(f"{position},title,not a date,journal\n" for position in range(50))
+    file_path.write_text("id,title,date,journal\n" + rows)
+    error_budget = schema.ErrorBudget(max_consecutive_failures=5)
+
+    with pytest.raises(custom_error.ErrorBudgetExceeded) as err:
+        utils.read_file(file_path, "pubmed", error_budget=error_budget)
+
+    assert err.value.rows_read == 5
+    assert err.value.invalid_rows == 5
+
+
+def test_read_file_error_budget_ratio(path_file_clinical_trials):
+    error_budget = schema.ErrorBudget(max_invalid_ratio=0.1, warmup_rows=3)
+    with pytest.raises(custom_error.ErrorBudgetExceeded, match=r"1/7 invalid items"):
+        utils.read_file(
+            path_file_clinical_trials, "clinical_trials", error_budget=error_budget
+        )
+
+    error_budget = schema.ErrorBudget(max_invalid_ratio=0.5, warmup_rows=3)
+    valid_items, invalid_items = utils.read_file(
+        path_file_clinical_trials, "clinical_trials", error_budget=error_budget
+    )
+    assert len(valid_items) == 7
+    assert len(invalid_items) == 1
+
+
+def test_read_file_error_budget_ratio_end_of_file(tmp_path):
+    file_path = tmp_path / "pubmed.csv"
+    rows = [f"{position},title,not a date,journal\n" for position in range(2)] + [
+        f"{position},title,01/01/2020,journal\n" for position in range(2, 12)
+    ]
+    file_path.write_text("id,title,date,journal\n" + "".join(rows))
+    error_budget = schema.ErrorBudget(max_invalid_ratio=0.1, warmup_rows=10)
+
+    with pytest.raises(custom_error.ErrorBudgetExceeded) as err:
+        utils.read_file(file_path, "pubmed", error_budget=error_budget)
+
+    assert (err.value.rows_read, err.value.invalid_rows) == (12, 2)
+
+
+@pytest.mark.parametrize(
+    "fixture_path, type_of_schema",
+    [
+        ("path_file_clinical_trials", "clinical_trials"),
+        ("path_file_pubmed_csv", "pubmed"),
+        ("path_file_drugs", "drugs"),
+    ],
+)
+def test_read_file_csv_same_as_dict_reader(request, fixture_path, type_of_schema):
+    file_path = request.getfixturevalue(fixture_path)
+    model = config.REFERENCE_SCHEMA[type_of_schema]
+    expected_valid, expected_invalid = [], []
+    with file_path.open(newline="", encoding=utils.check_encoding(file_path)) as file:
+        for row in csv.DictReader(file):
+            try:
+                expected_valid.append(model(**row))
+            except ValidationError:
+                expected_invalid.append(row)
+
+    assert utils.read_file(file_path, type_of_schema) == (
+        expected_valid,
+        expected_invalid,
+    )
+
+
+def test_check_extention_compressed():
+    utils.check_extention(Path("pubmed.csv.gz"))
+    with pytest.raises(custom_error.ExtentionError):
+        utils.check_extention(Path("pubmed.txt.xz"))
+
+
+@pytest.mark.parametrize("compression_suffix", [".gz", ".bz2", ".xz"])
+@pytest.mark.parametrize(
+    "fixture_path, type_of_schema",
+    [
+        ("path_file_clinical_trials", "clinical_trials"),
+        ("path_file_pubmed_json", "pubmed"),
+    ],
+)
+def test_read_file_compressed(
+    request, tmp_path, compression_suffix, fixture_path, type_of_schema
+):
+    file_path = request.getfixturevalue(fixture_path)
+    compressed_path = tmp_path / (file_path.name + compression_suffix)
+    with compression.REFERENCE_COMPRESSION[compression_suffix](
+        compressed_path, "wb"
+    ) as file:
+        file.write(file_path.read_bytes())
+
+    assert utils.check_encoding(compressed_path) == utils.check_encoding(file_path)
+    assert utils.read_file(compressed_path, type_of_schema) == utils.read_file(
+        file_path, type_of_schema
+    )
+
+
+def test_read_trusted_output(mocker, tmp_path, read_file_drugs_reconciliated):
+    file_path = tmp_path / "drugs_reconcilation.json"
+    utils.save_file(
+        read_file_drugs_reconciliated, file_path, type_of_schema="drugs_reconcilation"
+    )
+    spy_read_file = mocker.spy(utils, "read_file")
+
+    drugs_reconcilation = utils.read_trusted_output(file_path)
+
+    assert spy_read_file.call_count == 0
+    assert drugs_reconcilation == [
+        record.model_dump() for record in read_file_drugs_reconciliated
+    ]
+    assert utils.journal_most_cited(file_path) == [
+        "Journal of emergency nursing",
+        "Psychopharmacology",
+    ]
+
+    file_path.write_text(file_path.read_text().replace("ETHANOL", "ETHANOX"))
+    drugs_reconcilation = utils.read_trusted_output(file_path)
+
+    assert spy_read_file.call_count == 1
+    assert drugs_reconcilation[2]["drug"]["drug"] == "ETHANOX"
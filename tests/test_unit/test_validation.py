@@ -0,0 +1,34 @@
+import pytest
+
+from app.error import custom_error
+from app.schema import schema
+from app.validation import validation
+
+
+def test_csv_row_like_dict_reader():
+    header = ["id", "title", "date", "journal"]
+    assert validation.csv_row(header, ["1", "title"]) == {
+        "id": "1",
+        "title": "title",
+        "date": None,
+        "journal": None,
+    }
+    assert validation.csv_row(header, ["1", "t", "d", "j", "extra"])[None] == ["extra"]
+
+
+@pytest.mark.parametrize(
+    "error_budget, invalid_positions, exceeded",
+    [
+        (schema.ErrorBudget(max_consecutive_failures=3), [2, 3, 5, 6], False),
+        (schema.ErrorBudget(max_consecutive_failures=3), [2, 3, 4], True),
+        (schema.ErrorBudget(max_consecutive_failures=3), [8, 9, 10], True),
+        (schema.ErrorBudget(max_invalid_ratio=0.2, warmup_rows=20), [1, 2, 3], True),
+        (schema.ErrorBudget(max_invalid_ratio=0.5, warmup_rows=20), [1, 2, 3], False),
+    ],
+)
+def test_replay_error_budget(error_budget, invalid_positions, exceeded):
+    if exceeded:
+        with pytest.raises(custom_error.ErrorBudgetExceeded):
+            validation.replay_error_budget(error_budget, "file", 10, invalid_positions)
+    else:
+        validation.replay_error_budget(error_budget, "file", 10, invalid_positions)
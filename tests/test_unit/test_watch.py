@@ -0,0 +1,136 @@
+import json
+import shutil
+
+from app.pipeline import pipeline
+from app.utils import utils
+from app.watch import watch
+
+
+def copy_inputs(tmp_path, *paths):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir(exist_ok=True)
+    for path in paths:
+        shutil.copy(path, input_dir / path.name)
+    return input_dir
+
+
+def test_classify_input(tmp_path):
+    assert watch.classify_input(tmp_path / "pubmed_2020.json") == "pubmed"
+    assert watch.classify_input(tmp_path / "clinical_trials.csv") == "clinical_trials"
+    assert watch.classify_input(tmp_path / "drugs.csv") == "drugs"
+    assert watch.classify_input(tmp_path / "drugs.txt") is None
+    assert watch.classify_input(tmp_path / "notes.csv") is None
+
+
+def test_refresh_matches_full_run(
+    tmp_path, path_file_drugs, path_file_pubmed_csv, path_file_clinical_trials
+):
+    input_dir = copy_inputs(
+        tmp_path, path_file_drugs, path_file_pubmed_csv, path_file_clinical_trials
+    )
+    watcher = watch.PipelineWatcher(
+        input_dir, tmp_path / "output.json", tmp_path / "report.json"
+    )
+    assert len(watcher.refresh(watcher.scan())) == 3
+
+    expected = pipeline.run_pipeline(
+        path_file_drugs,
+        [path_file_pubmed_csv],
+        [path_file_clinical_trials],
+        tmp_path / "expected.json",
+    )
+    assert json.loads((tmp_path / "output.json").read_text()) == expected
+    assert json.loads(
+        (tmp_path / "report.json").read_text()
+    ) == utils.journal_most_cited(tmp_path / "expected.json")
+    assert watcher.refresh(watcher.scan()) == set()
+
+
+def test_refresh_only_changed_source(
+    mocker,
+    tmp_path,
+    path_file_drugs,
+    path_file_pubmed_csv,
+    path_file_pubmed_json,
+    path_file_clinical_trials,
+):
+    input_dir = copy_inputs(
+        tmp_path, path_file_drugs, path_file_pubmed_csv, path_file_clinical_trials
+    )
+    watcher = watch.PipelineWatcher(
+        input_dir, tmp_path / "output.json", tmp_path / "report.json"
+    )
+    watcher.refresh(watcher.scan())
+
+    spy_ingest = mocker.spy(pipeline, "ingest")
+    spy_reconcile = mocker.spy(pipeline, "reconcile")
+    shutil.copy(path_file_pubmed_json, input_dir)
+    changed = watcher.refresh(watcher.scan())
+
+    assert changed == {input_dir / path_file_pubmed_json.name}
+    assert spy_ingest.call_count == 1
+    assert len(spy_reconcile.call_args.args[0]) == len(watcher.elements("drugs"))
+
+    with open(input_dir / "drugs.csv", "a") as file:
+        file.write("\nA01AD,NEWDRUG\n")
+    spy_reconcile.reset_mock()
+    watcher.refresh(watcher.scan())
+
+    assert [drug.drug for drug in spy_reconcile.call_args.args[0]] == ["NEWDRUG"]
+
+
+def test_refresh_retries_failed_ingest(
+    mocker, tmp_path, path_file_drugs, path_file_pubmed_csv, path_file_clinical_trials
+):
+    input_dir = copy_inputs(
+        tmp_path, path_file_drugs, path_file_pubmed_csv, path_file_clinical_trials
+    )
+    watcher = watch.PipelineWatcher(
+        input_dir, tmp_path / "output.json", tmp_path / "report.json"
+    )
+    ingest = pipeline.ingest
+    failing_path = input_dir / path_file_pubmed_csv.name
+
+    def flaky_ingest(file_paths, *args):
+        if file_paths == [failing_path]:
+            raise OSError("locked")
+        return ingest(file_paths, *args)
+
+    mocker.patch.object(pipeline, "ingest", side_effect=flaky_ingest)
+    signatures = watcher.scan()
+
+    assert failing_path not in watcher.refresh(signatures)
+    assert failing_path not in watcher.signatures
+    assert (tmp_path / "output.json").exists()
+
+    mocker.patch.object(pipeline, "ingest", side_effect=ingest)
+    assert watcher.refresh(signatures) == {failing_path}
+    assert watcher.signatures == signatures
+
+
+def test_watch_debounces_writes(mocker, tmp_path, path_file_drugs):
+    input_dir = copy_inputs(tmp_path, path_file_drugs)
+    spy_refresh = mocker.spy(watch.PipelineWatcher, "refresh")
+
+    watcher = watch.watch(
+        input_dir,
+        tmp_path / "output.json",
+        tmp_path / "report.json",
+        poll_interval=0,
+        debounce=0,
+        max_iterations=3,
+    )
+
+    assert spy_refresh.call_count == 1
+    assert len(watcher.elements("drugs")) > 0
+
+    spy_refresh.reset_mock()
+    watch.watch(
+        input_dir,
+        tmp_path / "output.json",
+        tmp_path / "report.json",
+        poll_interval=0,
+        debounce=60,
+        max_iterations=3,
+    )
+    assert spy_refresh.call_count == 0